@@ -0,0 +1,83 @@
+"""Time parse_action_plan over the example plans and synthetic large plans.
+
+Each plan is parsed with the stdlib `json` backend and, when installed, with
+`orjson`; "decode" is the JSON decode alone, so "parse - decode" is the
+validation and Action-building cost.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_action_plan.py --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from hexi.core import schemas
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples" / "action_plans"
+
+
+def _synthetic(writes: int, content_kb: int) -> str:
+    content = ("def f():\n    return 42\n" * (content_kb * 1024 // 24 + 1))[: content_kb * 1024]
+    actions: list[dict[str, Any]] = [
+        {"kind": "write", "path": f"src/mod_{i}.py", "content": content} for i in range(writes)
+    ]
+    actions.append({"kind": "run", "command": "pytest -q"})
+    return json.dumps({"summary": f"{writes} writes of {content_kb} KB", "actions": actions})
+
+
+def _plans() -> dict[str, str]:
+    plans = {path.stem: path.read_text(encoding="utf-8") for path in sorted(EXAMPLES.glob("*.json"))}
+    plans["synthetic_1x100kb"] = _synthetic(1, 100)
+    plans["synthetic_10x100kb"] = _synthetic(10, 100)
+    plans["synthetic_19x500kb"] = _synthetic(19, 500)
+    return plans
+
+
+def _median_us(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+    args = parser.parse_args()
+
+    orjson = schemas._orjson
+    backends: dict[str, Any] = {"json": None}
+    if orjson is not None:
+        backends["orjson"] = orjson
+
+    rows = []
+    for name, raw in _plans().items():
+        row: dict[str, Any] = {"plan": name, "bytes": len(raw.encode("utf-8"))}
+        for backend, module in backends.items():
+            schemas._orjson = module
+            row[f"{backend}_decode_us"] = round(_median_us(lambda: schemas._loads(raw), args.repeat), 1)
+            row[f"{backend}_parse_us"] = round(_median_us(lambda: schemas.parse_action_plan(raw), args.repeat), 1)
+        schemas._orjson = orjson
+        if "orjson" in backends:
+            row["speedup"] = round(row["json_parse_us"] / max(row["orjson_parse_us"], 0.1), 2)
+        rows.append(row)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    columns = list(rows[0])
+    print("  ".join(f"{column:>18}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{row[column]!s:>18}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
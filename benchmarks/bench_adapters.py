@@ -0,0 +1,39 @@
+"""Drive the HTTP model adapters against the bundled mock LLM server.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_adapters.py --requests 200 --concurrency 1,4,16 --latency-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import asdict
+
+from hexi.devtools.bench import bench_adapters, format_results
+from hexi.devtools.mock_llm import MockLLMConfig, MockLLMServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels.")
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--adapter", action="append", default=None, help="Limit to one adapter (repeatable).")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+    args = parser.parse_args()
+
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    config = MockLLMConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=0)
+    with MockLLMServer(config) as server:
+        results = bench_adapters(server, levels, args.requests, adapters=args.adapter)
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,44 @@
-from .event_log_jsonl import JsonlRunlogEventSink
-from .events_console import ConsoleEventSink
-from .exec_local import LocalExec
-from .memory_file import FileMemory
-from .model_anthropic_compat import AnthropicCompatModel
-from .model_openai_compat import OpenAICompatModel
-from .model_openrouter_http import OpenRouterHTTPModel
-from .model_openrouter_sdk import OpenRouterSDKModel
-from .workspace_local_git import LocalGitWorkspace
-
-__all__ = [
-    "JsonlRunlogEventSink",
-    "ConsoleEventSink",
-    "LocalExec",
-    "FileMemory",
-    "AnthropicCompatModel",
-    "OpenAICompatModel",
-    "OpenRouterHTTPModel",
-    "OpenRouterSDKModel",
-    "LocalGitWorkspace",
-]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .event_log_jsonl import JsonlRunlogEventSink
+    from .events_console import ConsoleEventSink
+    from .exec_local import LocalExec
+    from .memory_file import FileMemory
+    from .model_anthropic_compat import AnthropicCompatModel
+    from .model_openai_compat import OpenAICompatModel
+    from .model_openrouter_http import OpenRouterHTTPModel
+    from .model_openrouter_sdk import OpenRouterSDKModel
+    from .workspace_local_git import LocalGitWorkspace
+
+# Adapters are imported on first attribute access so that importing one adapter
+# module does not pull in every HTTP client and renderer.
+_EXPORTS = {
+    "JsonlRunlogEventSink": ".event_log_jsonl",
+    "ConsoleEventSink": ".events_console",
+    "LocalExec": ".exec_local",
+    "FileMemory": ".memory_file",
+    "AnthropicCompatModel": ".model_anthropic_compat",
+    "OpenAICompatModel": ".model_openai_compat",
+    "OpenRouterHTTPModel": ".model_openrouter_http",
+    "OpenRouterSDKModel": ".model_openrouter_sdk",
+    "LocalGitWorkspace": ".workspace_local_git",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
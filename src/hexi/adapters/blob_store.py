@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+BLOB_KEY = "$blob"
+DEFAULT_BLOB_THRESHOLD = 4096
+_DIGEST = re.compile(r"^sha256:([0-9a-f]{64})$")
+REFERENCE_PATTERN = re.compile(rb'"\$blob":\s*"sha256:([0-9a-f]{64})"')
+
+
+def is_blob_reference(value: Any) -> bool:
+    """True only for `{"$blob": "sha256:<hex>", "bytes": n}` exactly, not for payload data that looks similar."""
+    return (
+        isinstance(value, dict)
+        and value.keys() == {BLOB_KEY, "bytes"}
+        and isinstance(value[BLOB_KEY], str)
+        and _DIGEST.match(value[BLOB_KEY]) is not None
+        and type(value["bytes"]) is int
+    )
+
+
+@dataclass(frozen=True)
+class BlobGcResult:
+    kept: int
+    removed: int
+    freed_bytes: int
+
+
+class BlobStore:
+    """Content-addressed store for large runlog payload strings under `.hexi/blobs/`.
+
+    `externalize` swaps every payload string of at least `threshold` UTF-8 bytes for
+    `{"$blob": "sha256:<hex>", "bytes": n}`; identical content is stored once.
+    `resolve` reverses it, leaving references to missing blobs untouched.
+    """
+
+    def __init__(self, root: Path, threshold: int = DEFAULT_BLOB_THRESHOLD) -> None:
+        self.root = root
+        self.threshold = threshold
+
+    def _path(self, hex_digest: str) -> Path:
+        return self.root / hex_digest[:2] / hex_digest[2:]
+
+    def put(self, data: bytes) -> str:
+        hex_digest = hashlib.sha256(data).hexdigest()
+        path = self._path(hex_digest)
+        try:
+            # A dedup hit is a fresh reference: restart gc's grace window for it.
+            os.utime(path)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return f"sha256:{hex_digest}"
+
+    def get(self, digest: str) -> bytes:
+        match = _DIGEST.match(digest)
+        if not match:
+            raise ValueError(f"invalid blob digest: {digest!r}")
+        return self._path(match.group(1)).read_bytes()
+
+    def externalize(self, record: dict[str, Any]) -> dict[str, Any]:
+        if self.threshold <= 0 or not isinstance(record.get("payload"), dict):
+            return record
+        return {**record, "payload": self._externalize(record["payload"])}
+
+    def _externalize(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) * 4 < self.threshold:
+                return value  # cannot reach the threshold even as 4-byte UTF-8
+            data = value.encode("utf-8")
+            if len(data) < self.threshold:
+                return value
+            return {BLOB_KEY: self.put(data), "bytes": len(data)}
+        if isinstance(value, dict):
+            return {key: self._externalize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._externalize(item) for item in value]
+        return value
+
+    def resolve(self, record: dict[str, Any]) -> dict[str, Any]:
+        if not isinstance(record.get("payload"), dict):
+            return record
+        return {**record, "payload": self._resolve(record["payload"])}
+
+    def _resolve(self, value: Any) -> Any:
+        if is_blob_reference(value):
+            try:
+                return self.get(value[BLOB_KEY]).decode("utf-8")
+            except (OSError, ValueError):
+                return value
+        if isinstance(value, dict):
+            return {key: self._resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        return value
+
+    def gc(self, referenced: Iterable[str], grace_s: float = 3600.0, now: float | None = None) -> BlobGcResult:
+        """Delete blobs that no runlog record references.
+
+        Blobs younger than `grace_s` are kept: a writer stores the blob before the
+        record that references it reaches the runlog.
+        """
+        keep = {digest.removeprefix("sha256:") for digest in referenced}
+        cutoff = (time.time() if now is None else now) - grace_s
+        kept = removed = freed = 0
+        if not self.root.exists():
+            return BlobGcResult(kept=0, removed=0, freed_bytes=0)
+        for path in self.root.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            stat = path.stat()
+            if path.parent.name + path.name in keep or stat.st_mtime > cutoff:
+                kept += 1
+                continue
+            path.unlink()
+            removed += 1
+            freed += stat.st_size
+        return BlobGcResult(kept=kept, removed=removed, freed_bytes=freed)
+
+
+def referenced_digests(lines: Iterable[bytes]) -> set[str]:
+    """Blob digests referenced by raw runlog lines (no JSON parsing needed)."""
+    found: set[str] = set()
+    for line in lines:
+        if b"$blob" in line:
+            found.update(match.decode("ascii") for match in REFERENCE_PATTERN.findall(line))
+    return found
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
 from hexi.core.domain import Event
-from hexi.core.schemas import event_to_dict
+
+from .runlog_writer import BufferedRunlogWriter, FlushPolicy, runlog_record
 
 
 class JsonlRunlogEventSink:
-    def __init__(self, runlog_path: Path) -> None:
+    def __init__(self, runlog_path: Path, policy: FlushPolicy | None = None) -> None:
         self.runlog_path = runlog_path
+        self._writer = BufferedRunlogWriter(runlog_path, policy)
 
     def emit(self, event: Event) -> None:
-        self.runlog_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.runlog_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(event_to_dict(event), ensure_ascii=True) + "\n")
+        self._writer.write(runlog_record(event))
+
+    def flush(self, fsync: bool | None = None) -> None:
+        self._writer.flush(self._writer.policy.fsync_on_step_end if fsync is None else fsync)
+
+    def close(self) -> None:
+        self._writer.close()
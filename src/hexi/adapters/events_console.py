@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import atexit
 import json
-
-from rich.console import Console, Group
-from rich.panel import Panel
-from rich.syntax import Syntax
-from rich.text import Text
+import queue
+import sys
+import threading
+import weakref
+from typing import TYPE_CHECKING, TextIO
 
 from hexi.core.domain import Event
+from hexi.core.schemas import event_to_dict
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+CONSOLE_MODES = ("auto", "rich", "plain", "ndjson")
+_TRUNCATE_CHARS = 2200
 
 _EVENT_STYLES: dict[str, tuple[str, str]] = {
     "progress": ("cyan", "⏳"),
@@ -18,23 +26,130 @@ _EVENT_STYLES: dict[str, tuple[str, str]] = {
     "done": ("bright_blue", "✔"),
 }
 
+_LIVE_SINKS: "weakref.WeakSet[ConsoleEventSink]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_sinks() -> None:
+    for sink in list(_LIVE_SINKS):
+        sink.close()
+
 
 class ConsoleEventSink:
-    def __init__(self, verbose: int = 0) -> None:
-        self.console = Console()
+    """Render events to the terminal.
+
+    Modes: `rich` (panels, rendered on a background thread so a slow terminal never
+    blocks the step), `plain` (one line per event) and `ndjson` (one JSON object per
+    line). `auto` picks `rich` when the stream is a TTY and `plain` otherwise. `flush` waits
+    until every emitted event has been written. `rich` is only imported when a
+    rich console is actually needed.
+    """
+
+    def __init__(self, verbose: int = 0, mode: str = "auto", stream: TextIO | None = None) -> None:
+        if mode not in CONSOLE_MODES:
+            raise ValueError(f"console mode must be one of: {', '.join(CONSOLE_MODES)}")
         self.verbose = verbose
+        self._stream = stream
+        self._console: Console | None = None
+        if mode == "auto":
+            # Decided from the stream itself so plain/ndjson output never imports rich.
+            out = self._out()
+            mode = "rich" if out is not None and out.isatty() else "plain"
+        self.mode = mode
+        self._queue: queue.Queue[Event | None] | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        _LIVE_SINKS.add(self)
 
     def emit(self, event: Event) -> None:
+        if self.mode == "ndjson":
+            self._write(json.dumps(event_to_dict(event), ensure_ascii=False) + "\n")
+        elif self.mode == "plain":
+            self._write(self._plain_line(event))
+        else:
+            self._renderer().put(event)
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.join()
+        self._out().flush()
+
+    def close(self) -> None:
+        with self._lock:
+            q, thread = self._queue, self._thread
+            self._queue, self._thread = None, None
+        if q is not None and thread is not None:
+            q.put(None)
+            thread.join()
+        _LIVE_SINKS.discard(self)
+
+    @property
+    def console(self) -> Console:
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console(file=self._stream) if self._stream is not None else Console()
+        return self._console
+
+    def _out(self) -> TextIO:
+        # Resolved per write so redirected/captured stdout is honoured.
+        return self._stream if self._stream is not None else sys.stdout
+
+    def _write(self, text: str) -> None:
+        self._out().write(text)
+
+    def _payload_text(self, event: Event, indent: int | None) -> str | None:
+        if not event.payload or (self.verbose < 1 and event.type not in {"error", "review"}):
+            return None
+        payload_str = json.dumps(event.payload, ensure_ascii=True, indent=indent)
+        if self.verbose == 1 and len(payload_str) > _TRUNCATE_CHARS:
+            payload_str = payload_str[:_TRUNCATE_CHARS] + "\n... (truncated; use -vv for full payload)"
+        return payload_str
+
+    def _plain_line(self, event: Event) -> str:
+        flag = " [blocking]" if event.blocking else ""
+        line = f"[{event.type.upper()}]{flag} {event.one_line_summary}\n"
+        payload_str = self._payload_text(event, indent=None)
+        if payload_str is not None:
+            line += f"  payload: {payload_str}\n"
+        return line
+
+    def _renderer(self) -> queue.Queue[Event | None]:
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._render_loop, args=(self._queue,), name="hexi-console", daemon=True
+                )
+                self._thread.start()
+            return self._queue
+
+    def _render_loop(self, q: queue.Queue[Event | None]) -> None:
+        while True:
+            event = q.get()
+            try:
+                if event is None:
+                    return
+                try:
+                    self._render(event)
+                except Exception:  # pragma: no cover - keep the step going if rich fails
+                    self._write(self._plain_line(event))
+            finally:
+                q.task_done()
+
+    def _render(self, event: Event) -> None:
+        from rich.console import Group
+        from rich.panel import Panel
+        from rich.syntax import Syntax
+        from rich.text import Text
+
         color, icon = _EVENT_STYLES.get(event.type, ("white", "•"))
         title = Text(f"{icon} {event.type.upper()}", style=f"bold {color}")
         subtitle = "blocking" if event.blocking else "non-blocking"
 
         lines = [Text(event.one_line_summary, style="bold")]
-        if event.payload and (self.verbose >= 1 or event.type in {"error", "review"}):
-            payload_obj = event.payload
-            payload_str = json.dumps(payload_obj, ensure_ascii=True, indent=2)
-            if self.verbose == 1 and len(payload_str) > 2200:
-                payload_str = payload_str[:2200] + "\n... (truncated; use -vv for full payload)"
+        payload_str = self._payload_text(event, indent=2)
+        if payload_str is not None:
             lines.append(Text(""))
             lines.append(Syntax(payload_str, "json", word_wrap=True))
 
@@ -4,13 +4,14 @@ import shlex
 import subprocess
 
 from hexi.core.domain import Policy
-from hexi.core.policy import command_allowed
+from hexi.core.policy import compile_policy
 
 
 class LocalExec:
     def run(self, command: str, policy: Policy) -> tuple[int, str, str]:
-        if not command_allowed(command, policy):
-            raise PermissionError(f"command is not allowlisted: {command}")
+        decision = compile_policy(policy).decide(command)
+        if not decision.allowed:
+            raise PermissionError(f"command is not allowlisted: {command} ({decision.reason})")
         args = shlex.split(command)
         proc = subprocess.run(args, capture_output=True, text=True, check=False)
         return proc.returncode, proc.stdout[-8000:], proc.stderr[-8000:]
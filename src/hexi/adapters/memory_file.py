@@ -2,19 +2,39 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 try:
     import tomllib  # py310+
 except ModuleNotFoundError:  # pragma: no cover
     import tomli as tomllib
 
-from hexi.core.domain import Event, ModelConfig, Policy
+from hexi.core.domain import Event, ModelConfig, Policy, RateLimits
+from hexi.core.schemas import STRUCTURED_OUTPUT_MODES
+
+from .blob_store import DEFAULT_BLOB_THRESHOLD, BlobGcResult, BlobStore, referenced_digests
+from .runlog_follow import RunlogFollower
+from .runlog_index import IndexedEvent, RunlogIndex
+from .runlog_store import (
+    COMPRESSION_MODES,
+    RUNLOG_STORAGE_MODES,
+    SegmentedRunlogWriter,
+    SegmentPolicy,
+    blob_dir_for,
+    iter_runlog,
+    iter_runlog_lines,
+    segment_dir_for,
+)
+from .runlog_writer import BufferedRunlogWriter, FlushPolicy, runlog_record
 
 DEFAULT_CONFIG = """[model]
 provider = "openai_compat"
 model = "gpt-4o-mini"
+# Constrain plans to the ActionPlan contract: "json_object" | "json_schema" | "tools".
+# structured_output = "json_schema"
 
 [providers.openrouter_http]
 base_url = "https://openrouter.ai/api/v1"
@@ -28,11 +48,40 @@ base_url = "https://api.openai.com/v1"
 
 [providers.anthropic_compat]
 base_url = "https://api.anthropic.com"
+# Optional per-provider budgets (any provider block):
+# requests_per_minute = 60
+# tokens_per_minute = 90000
+# max_in_flight = 4
+
+[ratelimit]
+# Share request/token budgets across Hexi processes via .hexi/ratelimit/.
+shared = false
 
 [policy]
 allow_commands = ["git status", "git diff", "pytest", "python -m pytest"]
 max_diff_chars = 4000
 max_file_read_chars = 4000
+# Repository map added to each run prompt (0 disables).
+max_repo_map_chars = 2000
+
+[memory]
+# "file" keeps the runlog as JSONL; "sqlite" stores it in .hexi/runlog.sqlite3.
+backend = "file"
+
+[runlog]
+# Events are written by a background thread and flushed every N events or T ms,
+# and always at the end of each step.
+flush_every_events = 64
+flush_interval_ms = 200
+fsync_on_step_end = false
+# Payload strings of at least this many bytes go to .hexi/blobs/ (0 disables).
+blob_threshold_bytes = 4096
+# "plain" appends to runlog.jsonl; "segmented" rotates .hexi/runlog/ segments
+# and compresses closed ones ("auto" = zstd when installed, else gzip).
+storage = "plain"
+# segment_max_mb = 16
+# segment_max_age_hours = 24
+# compression = "auto"
 """
 
 EMPTY_LOCAL_CONFIG = """# Local, machine-specific overrides for Hexi.
@@ -54,6 +103,9 @@ EMPTY_LOCAL_CONFIG = """# Local, machine-specific overrides for Hexi.
 """
 
 
+MEMORY_BACKENDS = ("file", "sqlite")
+
+
 def _merge_dicts(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
     out = dict(base)
     for key, value in override.items():
@@ -64,6 +116,37 @@ def _merge_dicts(base: dict[str, Any], override: dict[str, Any]) -> dict[str, An
     return out
 
 
+CONFIG_CACHE_ENV = "HEXI_CONFIG_CACHE"
+CONFIG_CACHE_VERSION = 1
+
+# (mtime_ns, size) of config.toml and of local.toml; None when a file is missing.
+_StatKey = tuple[tuple[int, int] | None, tuple[int, int] | None]
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Parsed `config.toml` + `local.toml`, valid while both files keep the same `key`.
+
+    The dicts are shared between callers and must be treated as read-only.
+    """
+
+    key: _StatKey
+    merged: dict[str, Any]
+    local: dict[str, Any]
+
+
+_SNAPSHOTS: dict[Path, ConfigSnapshot] = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 class FileMemory:
     def __init__(self, repo_root: Path) -> None:
         self.repo_root = repo_root
@@ -71,6 +154,11 @@ class FileMemory:
         self.config_path = self.hexi_dir / "config.toml"
         self.local_config_path = self.hexi_dir / "local.toml"
         self.runlog_path = self.hexi_dir / "runlog.jsonl"
+        self.runlog_dir = segment_dir_for(self.hexi_dir)
+        self.config_cache_path = self.hexi_dir / "cache" / "config.json"
+        self._runlog_writer: BufferedRunlogWriter | None = None
+        # API keys this instance copied from local.toml into the environment.
+        self._env_from_local: dict[str, str] = {}
 
     def ensure_initialized(self) -> None:
         self.hexi_dir.mkdir(parents=True, exist_ok=True)
@@ -91,12 +179,16 @@ class FileMemory:
 
         base_url = provider_cfg.get("base_url", model.get("base_url"))
         api_style = provider_cfg.get("api_style", model.get("openrouter_api_style"))
+        structured_output = provider_cfg.get("structured_output", model.get("structured_output"))
+        if structured_output is not None and structured_output not in STRUCTURED_OUTPUT_MODES:
+            raise ValueError(f"structured_output must be one of: {', '.join(STRUCTURED_OUTPUT_MODES)}")
 
         return ModelConfig(
             provider=provider,
             model=str(model.get("model", "gpt-4o-mini")),
             base_url=str(base_url) if isinstance(base_url, str) else None,
             api_style=str(api_style) if isinstance(api_style, str) else None,
+            structured_output=structured_output,
         )
 
     def load_policy(self) -> Policy:
@@ -109,6 +201,94 @@ class FileMemory:
             allow_commands=[str(x) for x in allow_commands],
             max_diff_chars=int(pol.get("max_diff_chars", 4000)),
             max_file_read_chars=int(pol.get("max_file_read_chars", 4000)),
+            max_repo_map_chars=int(pol.get("max_repo_map_chars", 2000)),
+        )
+
+    def load_rate_limits(self, provider: str) -> RateLimits:
+        cfg = self._load_merged_toml()
+        provider_cfg = cfg.get("providers", {}).get(provider, {})
+        if not isinstance(provider_cfg, dict):
+            provider_cfg = {}
+        shared_cfg = cfg.get("ratelimit", {})
+        if not isinstance(shared_cfg, dict):
+            shared_cfg = {}
+
+        def _number(key: str) -> float | None:
+            value = provider_cfg.get(key)
+            if value is None:
+                return None
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"providers.{provider}.{key} must be a positive number")
+            return float(value)
+
+        max_in_flight = _number("max_in_flight")
+        return RateLimits(
+            requests_per_minute=_number("requests_per_minute"),
+            tokens_per_minute=_number("tokens_per_minute"),
+            max_in_flight=int(max_in_flight) if max_in_flight is not None else None,
+            shared=bool(shared_cfg.get("shared", False)),
+        )
+
+    def load_flush_policy(self) -> FlushPolicy:
+        cfg = self._load_merged_toml() if self.config_path.exists() else {}
+        runlog = cfg.get("runlog", {})
+        if not isinstance(runlog, dict):
+            runlog = {}
+        defaults = FlushPolicy()
+        every_events = runlog.get("flush_every_events", defaults.every_events)
+        interval_ms = runlog.get("flush_interval_ms", defaults.interval_ms)
+        if isinstance(every_events, bool) or not isinstance(every_events, int) or every_events <= 0:
+            raise ValueError("runlog.flush_every_events must be a positive integer")
+        if isinstance(interval_ms, bool) or not isinstance(interval_ms, (int, float)) or interval_ms <= 0:
+            raise ValueError("runlog.flush_interval_ms must be a positive number")
+        return FlushPolicy(
+            every_events=every_events,
+            interval_ms=float(interval_ms),
+            fsync_on_step_end=bool(runlog.get("fsync_on_step_end", defaults.fsync_on_step_end)),
+        )
+
+    def load_blob_store(self) -> BlobStore:
+        cfg = self._load_merged_toml() if self.config_path.exists() else {}
+        runlog = cfg.get("runlog", {})
+        if not isinstance(runlog, dict):
+            runlog = {}
+        threshold = runlog.get("blob_threshold_bytes", DEFAULT_BLOB_THRESHOLD)
+        if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 0:
+            raise ValueError("runlog.blob_threshold_bytes must be a non-negative integer (0 disables blobs)")
+        return BlobStore(blob_dir_for(self.hexi_dir), threshold)
+
+    def load_memory_backend(self) -> str:
+        cfg = self._load_merged_toml() if self.config_path.exists() else {}
+        memory = cfg.get("memory", {})
+        backend = memory.get("backend", "file") if isinstance(memory, dict) else "file"
+        if backend not in MEMORY_BACKENDS:
+            raise ValueError(f"memory.backend must be one of: {', '.join(MEMORY_BACKENDS)}")
+        return str(backend)
+
+    def load_segment_policy(self) -> SegmentPolicy | None:
+        """Segment rotation settings, or None when the runlog uses plain storage."""
+        cfg = self._load_merged_toml() if self.config_path.exists() else {}
+        runlog = cfg.get("runlog", {})
+        if not isinstance(runlog, dict):
+            runlog = {}
+        storage = runlog.get("storage", "plain")
+        if storage not in RUNLOG_STORAGE_MODES:
+            raise ValueError(f"runlog.storage must be one of: {', '.join(RUNLOG_STORAGE_MODES)}")
+        if storage == "plain":
+            return None
+        defaults = SegmentPolicy()
+        max_mb = runlog.get("segment_max_mb", defaults.max_bytes / (1024 * 1024))
+        max_age_hours = runlog.get("segment_max_age_hours", defaults.max_age_s / 3600)
+        for key, value in (("segment_max_mb", max_mb), ("segment_max_age_hours", max_age_hours)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"runlog.{key} must be a positive number")
+        compression = runlog.get("compression", defaults.compression)
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"runlog.compression must be one of: {', '.join(COMPRESSION_MODES)}")
+        return SegmentPolicy(
+            max_bytes=int(max_mb * 1024 * 1024),
+            max_age_s=float(max_age_hours) * 3600,
+            compression=str(compression),
         )
 
     def resolve_api_key(self, provider: str) -> tuple[str | None, str | None]:
@@ -117,7 +297,7 @@ class FileMemory:
             return None, None
 
         env_value = os.getenv(env_name, "").strip()
-        if env_value:
+        if env_value and env_value != self._env_from_local.get(env_name):
             return env_value, "env"
 
         local = self._load_local_toml()
@@ -136,8 +316,16 @@ class FileMemory:
         if env_name is None:
             return None
         key, source = self.resolve_api_key(provider)
-        if key and not os.getenv(env_name):
+        # A key this instance injected earlier is refreshed, so a long-lived
+        # process (`hexi serve`) picks up edits to local.toml.
+        current = os.getenv(env_name)
+        ours = current is not None and current == self._env_from_local.get(env_name)
+        if source == "local" and key and (not current or ours):
             os.environ[env_name] = key
+            self._env_from_local[env_name] = key
+        elif ours and source is None:
+            del os.environ[env_name]
+            del self._env_from_local[env_name]
         return source
 
     def write_local_onboarding(
@@ -174,26 +362,155 @@ class FileMemory:
             ])
 
         self.local_config_path.write_text("\n".join(lines), encoding="utf-8")
+        self.invalidate_config()
 
     def append_runlog(self, event: Event) -> None:
-        data = {
-            "type": event.type,
-            "one_line_summary": event.one_line_summary,
-            "blocking": event.blocking,
-            "payload": event.payload,
-        }
-        with self.runlog_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=True) + "\n")
+        if self._runlog_writer is None:
+            writer = self._open_runlog_writer()
+            writer.transform = self.load_blob_store().externalize
+            self._runlog_writer = writer
+        self._runlog_writer.write(runlog_record(event))
+
+    def iter_runlog(self, resolve_blobs: bool = True) -> Iterator[dict[str, Any]]:
+        """Every runlog record, oldest first, across plain and segmented storage."""
+        self.flush_runlog(fsync=False)
+        return iter_runlog(self.hexi_dir, resolve_blobs=resolve_blobs)
+
+    def query_runlog(
+        self,
+        types: set[str] | None = None,
+        run_id: str | None = None,
+        since: float | None = None,
+        last_runs: int | None = None,
+        limit: int | None = None,
+    ) -> list[IndexedEvent]:
+        """Filtered runlog events through the sidecar index (see `RunlogIndex.query`)."""
+        self.flush_runlog(fsync=False)
+        return RunlogIndex(self.hexi_dir).query(
+            types=types, run_id=run_id, since=since, last_runs=last_runs, limit=limit
+        )
+
+    def runlog_cursor(self) -> Any:
+        """Opaque position after the current end of the runlog, for `follow_runlog`."""
+        self.flush_runlog(fsync=False)
+        return RunlogFollower.end_cursor(self.hexi_dir)
+
+    def follow_runlog(
+        self,
+        cursor: Any = None,
+        types: set[str] | None = None,
+        run_id: str | None = None,
+        poll_interval: float = 1.0,
+        stop: Callable[[], bool] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield records appended after `cursor` (default: now) as they arrive, blob references resolved."""
+        follower = RunlogFollower(self.hexi_dir, cursor if cursor is not None else self.runlog_cursor())
+        blobs = self.load_blob_store()
+        for line in follower.follow(poll_interval=poll_interval, stop=stop):
+            record = json.loads(line)
+            if types is not None and record.get("type") not in types:
+                continue
+            if run_id is not None and record.get("run_id") != run_id:
+                continue
+            yield blobs.resolve(record)
+
+    def referenced_blobs(self) -> set[str]:
+        """Blob digests referenced from any runlog storage present in `.hexi/`."""
+        self.flush_runlog(fsync=False)
+        found = referenced_digests(iter_runlog_lines(self.hexi_dir))
+        sqlite_path = self.hexi_dir / "runlog.sqlite3"
+        if sqlite_path.exists():
+            from .memory_sqlite import sqlite_referenced_digests
+
+            found |= sqlite_referenced_digests(sqlite_path)
+        return found
+
+    def gc_blobs(self, grace_s: float = 3600.0) -> BlobGcResult:
+        return BlobStore(blob_dir_for(self.hexi_dir)).gc(self.referenced_blobs(), grace_s=grace_s)
+
+    def flush_runlog(self, fsync: bool | None = None) -> None:
+        """Block until every appended event is on disk; `fsync=None` follows `runlog.fsync_on_step_end`."""
+        writer = self._runlog_writer
+        if writer is None:
+            return
+        writer.flush(writer.policy.fsync_on_step_end if fsync is None else fsync)
+
+    def close(self) -> None:
+        writer, self._runlog_writer = self._runlog_writer, None
+        if writer is not None:
+            writer.close()
+
+    def _open_runlog_writer(self) -> BufferedRunlogWriter:
+        flush_policy = self.load_flush_policy()
+        segments = self.load_segment_policy()
+        if segments is None:
+            return BufferedRunlogWriter(self.runlog_path, flush_policy)
+        return SegmentedRunlogWriter(self.runlog_dir, flush_policy, segments)
+
+    def config_snapshot(self) -> ConfigSnapshot:
+        """Parsed config, re-read only when `config.toml` or `local.toml` changes (mtime and size).
+
+        Snapshots are shared across `FileMemory` instances in the process. With
+        `HEXI_CONFIG_CACHE=1` they are also stored as JSON in `.hexi/cache/config.json`
+        (owner-only; it contains `local.toml` secrets) so a new process can skip TOML parsing.
+        """
+        key: _StatKey = (_stat_key(self.config_path), _stat_key(self.local_config_path))
+        if key[0] is None:
+            raise FileNotFoundError(f"missing config: {self.config_path}")
+        with _SNAPSHOTS_LOCK:
+            snapshot = _SNAPSHOTS.get(self.config_path)
+        if snapshot is not None and snapshot.key == key:
+            return snapshot
+        use_cache = os.getenv(CONFIG_CACHE_ENV, "").strip().lower() in {"1", "true", "yes"}
+        snapshot = self._read_config_cache(key) if use_cache else None
+        if snapshot is None:
+            local = self._load_toml(self.local_config_path) if key[1] is not None else {}
+            snapshot = ConfigSnapshot(key=key, merged=_merge_dicts(self._load_toml(self.config_path), local), local=local)
+            if use_cache:
+                self._write_config_cache(snapshot)
+        with _SNAPSHOTS_LOCK:
+            _SNAPSHOTS[self.config_path] = snapshot
+        return snapshot
+
+    def invalidate_config(self) -> None:
+        with _SNAPSHOTS_LOCK:
+            _SNAPSHOTS.pop(self.config_path, None)
+        self.config_cache_path.unlink(missing_ok=True)
+
+    def _read_config_cache(self, key: _StatKey) -> ConfigSnapshot | None:
+        try:
+            data = json.loads(self.config_cache_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != CONFIG_CACHE_VERSION:
+            return None
+        cached_key = tuple(tuple(part) if part is not None else None for part in data.get("key", []))
+        if cached_key != key:
+            return None
+        return ConfigSnapshot(key=key, merged=data["merged"], local=data["local"])
+
+    def _write_config_cache(self, snapshot: ConfigSnapshot) -> None:
+        data = {"version": CONFIG_CACHE_VERSION, "key": snapshot.key, "merged": snapshot.merged, "local": snapshot.local}
+        try:
+            text = json.dumps(data)
+        except (TypeError, ValueError):
+            return  # TOML dates/times have no JSON form; keep the in-process snapshot only
+        self.config_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.config_cache_path.with_name(f"config.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        tmp.replace(self.config_cache_path)
 
     def _load_merged_toml(self) -> dict[str, Any]:
-        base = self._load_toml(self.config_path)
-        local = self._load_local_toml()
-        return _merge_dicts(base, local)
+        return self.config_snapshot().merged
 
     def _load_local_toml(self) -> dict[str, Any]:
         if not self.local_config_path.exists():
             return {}
-        return self._load_toml(self.local_config_path)
+        if not self.config_path.exists():
+            return self._load_toml(self.local_config_path)
+        return self.config_snapshot().local
 
     def _load_toml(self, path: Path) -> dict[str, Any]:
         if not path.exists():
@@ -222,3 +539,13 @@ class FileMemory:
             "anthropic_compat": "anthropic_api_key",
         }
         return mapping.get(provider, "openrouter_api_key")
+
+
+def open_memory(repo_root: Path) -> FileMemory:
+    """Memory adapter selected by `memory.backend` (the file adapter when unset)."""
+    memory = FileMemory(repo_root)
+    if memory.load_memory_backend() == "sqlite":
+        from .memory_sqlite import SqliteMemory
+
+        return SqliteMemory(repo_root)
+    return memory
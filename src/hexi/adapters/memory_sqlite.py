@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .blob_store import referenced_digests
+from .memory_file import FileMemory
+from .runlog_follow import ChangeWatcher
+from .runlog_index import RUN_START_SUMMARY, IndexedEvent
+from .runlog_store import complete_lines, open_source, runlog_sources
+from .runlog_writer import BufferedRunlogWriter, FlushPolicy
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT,
+    seq INTEGER,
+    type TEXT NOT NULL,
+    ts REAL,
+    mono REAL,
+    blocking INTEGER NOT NULL,
+    one_line_summary TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_run ON events(run_id, seq);
+CREATE INDEX IF NOT EXISTS events_type_ts ON events(type, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events(ts);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    first_event INTEGER NOT NULL,
+    started REAL
+);
+CREATE INDEX IF NOT EXISTS runs_first_event ON runs(first_event);
+CREATE TRIGGER IF NOT EXISTS events_register_run AFTER INSERT ON events WHEN NEW.run_id IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO runs(run_id, first_event, started) VALUES (NEW.run_id, NEW.id, NEW.ts);
+END;
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    events INTEGER NOT NULL,
+    imported_at REAL NOT NULL,
+    position INTEGER,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# v1 recorded whole-file imports only; NULL position means "resume after `events` records".
+_MIGRATE_V2 = """
+ALTER TABLE imports ADD COLUMN position INTEGER;
+ALTER TABLE imports ADD COLUMN complete INTEGER NOT NULL DEFAULT 0;
+"""
+
+_INSERT = (
+    "INSERT INTO events (run_id, seq, type, ts, mono, blocking, one_line_summary, payload)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_COLUMNS = "id, run_id, seq, type, ts, mono, blocking, one_line_summary, payload"
+
+
+@dataclass(frozen=True)
+class RunlogImportResult:
+    events: int
+    skipped: int
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        with conn:
+            if version == 1:
+                conn.executescript(_MIGRATE_V2)
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def _row(record: dict[str, Any], run_id: str | None = None) -> tuple[Any, ...]:
+    return (
+        record.get("run_id", run_id),
+        record.get("seq"),
+        str(record.get("type", "progress")),
+        record.get("ts"),
+        record.get("mono"),
+        1 if record.get("blocking") else 0,
+        str(record.get("one_line_summary", "")),
+        json.dumps(record.get("payload", {}), ensure_ascii=False),
+    )
+
+
+def _record(row: sqlite3.Row | tuple[Any, ...]) -> dict[str, Any]:
+    _id, run_id, seq, event_type, ts, mono, blocking, summary, payload = row
+    data: dict[str, Any] = {
+        "type": event_type,
+        "one_line_summary": summary,
+        "blocking": bool(blocking),
+        "payload": json.loads(payload),
+    }
+    for key, value in (("run_id", run_id), ("seq", seq), ("ts", ts), ("mono", mono)):
+        if value is not None:
+            data[key] = value
+    return data
+
+
+def sqlite_referenced_digests(db_path: Path) -> set[str]:
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT payload FROM events WHERE instr(payload, '\"$blob\"') > 0")
+        return referenced_digests(row[0].encode("utf-8") for row in rows)
+    finally:
+        conn.close()
+
+
+class SqliteRunlogWriter(BufferedRunlogWriter):
+    """Background writer that inserts each flushed batch in one SQLite transaction."""
+
+    def __init__(self, db_path: Path, policy: FlushPolicy | None = None) -> None:
+        super().__init__(db_path, policy)
+        self._conn: sqlite3.Connection | None = None
+
+    def _encode(self, record: dict[str, Any]) -> tuple[Any, ...]:
+        return _row(record)
+
+    def _commit(self, batch: list[Any], fsync: bool) -> None:
+        # The connection is created on the worker thread, which owns it.
+        if self._conn is None:
+            self._conn = connect(self.path)
+        if batch:
+            with self._conn:
+                self._conn.executemany(_INSERT, batch)
+        if fsync:
+            self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def _shutdown(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SqliteMemory(FileMemory):
+    """`MemoryPort` that keeps config in TOML like `FileMemory` and the runlog in SQLite.
+
+    Events live in `.hexi/runlog.sqlite3` (WAL mode) with indexes on run id, event
+    type and time. Writes are batched through the background runlog writer, one
+    transaction per flush.
+    """
+
+    def __init__(self, repo_root: Path) -> None:
+        super().__init__(repo_root)
+        self.db_path = self.hexi_dir / "runlog.sqlite3"
+
+    def ensure_initialized(self) -> None:
+        super().ensure_initialized()
+        connect(self.db_path).close()
+
+    def _open_runlog_writer(self) -> BufferedRunlogWriter:
+        return SqliteRunlogWriter(self.db_path, self.load_flush_policy())
+
+    def iter_runlog(self, resolve_blobs: bool = True) -> Iterator[dict[str, Any]]:
+        self.flush_runlog(fsync=False)
+        blobs = self.load_blob_store()
+        conn = connect(self.db_path)
+        try:
+            for row in conn.execute(f"SELECT {_COLUMNS} FROM events ORDER BY id"):
+                yield blobs.resolve(_record(row)) if resolve_blobs else _record(row)
+        finally:
+            conn.close()
+
+    def query_runlog(
+        self,
+        types: set[str] | None = None,
+        run_id: str | None = None,
+        since: float | None = None,
+        last_runs: int | None = None,
+        limit: int | None = None,
+    ) -> list[IndexedEvent]:
+        self.flush_runlog(fsync=False)
+        where: list[str] = []
+        params: list[Any] = []
+        if run_id is not None:
+            where.append("run_id = ?")
+            params.append(run_id)
+        elif last_runs is not None:
+            where.append("run_id IN (SELECT run_id FROM runs ORDER BY first_event DESC LIMIT ?)")
+            params.append(last_runs)
+        if types:
+            where.append(f"type IN ({', '.join('?' for _ in types)})")
+            params.extend(sorted(types))
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        sql = f"SELECT {_COLUMNS} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        conn = connect(self.db_path)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        blobs = self.load_blob_store()
+        out: list[IndexedEvent] = []
+        for row in reversed(rows):
+            record = _record(row)
+            raw = (json.dumps(record, ensure_ascii=True) + "\n").encode("utf-8")
+            out.append(IndexedEvent(run_id=row[1] or "-", ts=row[4], record=blobs.resolve(record), raw=raw))
+        return out
+
+    def runlog_cursor(self) -> Any:
+        self.flush_runlog(fsync=False)
+        conn = connect(self.db_path)
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+
+    def follow_runlog(
+        self,
+        cursor: Any = None,
+        types: set[str] | None = None,
+        run_id: str | None = None,
+        poll_interval: float = 1.0,
+        stop: Callable[[], bool] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield rows inserted after `cursor` (an event id; default: now), woken by WAL writes."""
+        last_id = cursor if cursor is not None else self.runlog_cursor()
+        where = ["id > ?"]
+        params: list[Any] = []
+        if run_id is not None:
+            where.append("run_id = ?")
+            params.append(run_id)
+        if types:
+            where.append(f"type IN ({', '.join('?' for _ in types)})")
+            params.extend(sorted(types))
+        sql = f"SELECT {_COLUMNS} FROM events WHERE {' AND '.join(where)} ORDER BY id"
+        blobs = self.load_blob_store()
+        conn = connect(self.db_path)
+        try:
+            with ChangeWatcher([self.hexi_dir]) as watcher:
+                while True:
+                    for row in conn.execute(sql, [last_id, *params]).fetchall():
+                        last_id = row[0]
+                        yield blobs.resolve(_record(row))
+                    if stop is not None and stop():
+                        return
+                    watcher.wait(poll_interval)
+        finally:
+            conn.close()
+
+    def import_runlog_files(self) -> RunlogImportResult:
+        """Import `runlog.jsonl` and runlog segments, resuming where the previous import stopped.
+
+        `imports` records the byte position reached in each source, so records
+        appended to the live runlog since the last migration are picked up; closed
+        segments are marked complete and skipped afterwards. Lines that are not
+        JSON objects are skipped and counted. Lines without a `run_id` are grouped
+        at each run-start event and given `legacy-N` run ids so run filters work on
+        migrated history.
+        """
+        self.flush_runlog(fsync=False)
+        conn = connect(self.db_path)
+        imported = skipped = 0
+        try:
+            progress = {
+                row[0]: row[1:] for row in conn.execute("SELECT source, events, position, complete FROM imports")
+            }
+            legacy_runs = conn.execute("SELECT COUNT(*) FROM runs WHERE run_id LIKE 'legacy-%'").fetchone()[0]
+            legacy_id: str | None = f"legacy-{legacy_runs}" if legacy_runs else None
+            for source in runlog_sources(self.hexi_dir):
+                events, position, complete = progress.get(source.key, (0, 0, 0))
+                if complete or not source.closed and source.path.stat().st_size == 0:
+                    continue
+                # Rows from schema v1 have no position: skip the records imported back then.
+                skip_records = events if position is None else 0
+                position = position or 0
+                rows: list[tuple[Any, ...]] = []
+                with open_source(source) as f:
+                    if position:
+                        f.seek(position)
+                    for line in complete_lines(f):
+                        position += len(line)
+                        if not line.strip():
+                            continue
+                        if skip_records:
+                            skip_records -= 1
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:  # bad JSON or bad UTF-8
+                            record = None
+                        if not isinstance(record, dict):
+                            skipped += 1
+                            continue
+                        if "run_id" not in record:
+                            starts_run = (
+                                record.get("type") == "progress"
+                                and record.get("one_line_summary") == RUN_START_SUMMARY
+                            )
+                            if legacy_id is None or starts_run:
+                                legacy_runs += 1
+                                legacy_id = f"legacy-{legacy_runs}"
+                        rows.append(_row(record, run_id=legacy_id))
+                with conn:
+                    conn.executemany(_INSERT, rows)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO imports (source, events, imported_at, position, complete)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (source.key, events + len(rows), time.time(), position, 1 if source.closed else 0),
+                    )
+                imported += len(rows)
+        finally:
+            conn.close()
+        return RunlogImportResult(events=imported, skipped=skipped)
@@ -1,12 +1,48 @@
 from __future__ import annotations
 
-from hexi.core.domain import ModelConfig
+from typing import Any
 
-from .model_http_common import post_json, require_env
+import httpx
+
+from hexi.core.domain import ModelConfig, ModelResult
+
+from .model_http_common import (
+    AsyncClientHolder,
+    HttpTiming,
+    anthropic_output_options,
+    anthropic_text,
+    anthropic_usage,
+    apost_json_timed,
+    post_json_timed,
+    require_env,
+)
 
 
 class AnthropicCompatModel:
+    def __init__(self, async_client: httpx.AsyncClient | None = None) -> None:
+        self._async_clients = AsyncClientHolder(async_client)
+
     def plan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return self.plan_step_result(config, system_prompt, user_prompt).text
+
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        url, headers, payload = self._request(config, system_prompt, user_prompt)
+        data, timing = post_json_timed(url, headers, payload)
+        return self._result(config, data, timing)
+
+    async def aplan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return (await self.aplan_step_result(config, system_prompt, user_prompt)).text
+
+    async def aplan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        url, headers, payload = self._request(config, system_prompt, user_prompt)
+        data, timing = await apost_json_timed(self._async_clients.get(), url, headers, payload)
+        return self._result(config, data, timing)
+
+    async def aclose(self) -> None:
+        await self._async_clients.aclose()
+
+    @staticmethod
+    def _request(config: ModelConfig, system_prompt: str, user_prompt: str) -> tuple[str, dict[str, str], dict[str, Any]]:
         api_key = require_env("ANTHROPIC_API_KEY")
         base_url = (config.base_url or "https://api.anthropic.com").rstrip("/")
         url = f"{base_url}/v1/messages"
@@ -16,20 +52,30 @@ class AnthropicCompatModel:
             "temperature": 0,
             "system": system_prompt,
             "messages": [{"role": "user", "content": user_prompt}],
+            **anthropic_output_options(config.structured_output),
         }
-        data = post_json(
-            url,
-            {
-                "x-api-key": api_key,
-                "anthropic-version": "2023-06-01",
-            },
-            payload,
-        )
-        content = data.get("content", [])
-        if not content:
+        headers = {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+        }
+        return url, headers, payload
+
+    @staticmethod
+    def _result(config: ModelConfig, data: dict[str, Any], timing: HttpTiming) -> ModelResult:
+        if not data.get("content"):
             raise RuntimeError("anthropic response missing content")
-        first = content[0]
-        text = first.get("text") if isinstance(first, dict) else None
+        text = anthropic_text(data)
         if not text:
             raise RuntimeError("anthropic response missing text")
-        return text
+        prompt_tokens, completion_tokens, cached_tokens = anthropic_usage(data)
+        return ModelResult(
+            text=text,
+            provider=config.provider,
+            model=str(data.get("model") or config.model),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            latency_ms=timing.latency_ms,
+            ttfb_ms=timing.ttfb_ms,
+            provider_processing_ms=timing.provider_processing_ms,
+        )
@@ -1,9 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import json
 import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Mapping
 
 import httpx
 
+from hexi.core.schemas import ACTION_PLAN_TOOL_NAME, load_action_plan_schema, strict_action_plan_schema
+
+_TOOL_DESCRIPTION = "Return the single-step ActionPlan."
+
+
+@dataclass(frozen=True)
+class HttpTiming:
+    latency_ms: float
+    ttfb_ms: float | None = None
+    provider_processing_ms: float | None = None
+
 
 def require_env(name: str) -> str:
     value = os.getenv(name, "").strip()
@@ -12,8 +30,188 @@ def require_env(name: str) -> str:
     return value
 
 
-def post_json(url: str, headers: dict[str, str], payload: dict) -> dict:
-    with httpx.Client(timeout=60.0) as client:
-        response = client.post(url, headers=headers, json=payload)
+_SYNC_CLIENT: httpx.Client | None = None
+_SYNC_CLIENT_LOCK = threading.Lock()
+
+
+def shared_client() -> httpx.Client:
+    """Process-wide pooled client so sync adapters reuse TLS setup and connections."""
+    global _SYNC_CLIENT
+    with _SYNC_CLIENT_LOCK:
+        if _SYNC_CLIENT is None or _SYNC_CLIENT.is_closed:
+            _SYNC_CLIENT = httpx.Client(timeout=60.0)
+            atexit.register(_SYNC_CLIENT.close)
+        return _SYNC_CLIENT
+
+
+def _timing(started: float, ttfb: float, response: httpx.Response) -> HttpTiming:
+    return HttpTiming(
+        latency_ms=round((time.perf_counter() - started) * 1000, 3),
+        ttfb_ms=round(ttfb * 1000, 3),
+        provider_processing_ms=processing_ms_from_headers(response.headers),
+    )
+
+
+def post_json_timed(url: str, headers: dict[str, str], payload: dict) -> tuple[dict, HttpTiming]:
+    started = time.perf_counter()
+    with shared_client().stream("POST", url, headers=headers, json=payload) as response:
+        ttfb = time.perf_counter() - started
+        response.read()
+    timing = _timing(started, ttfb, response)
     response.raise_for_status()
-    return response.json()
+    return response.json(), timing
+
+
+async def apost_json_timed(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str],
+    payload: dict,
+) -> tuple[dict, HttpTiming]:
+    started = time.perf_counter()
+    async with client.stream("POST", url, headers=headers, json=payload) as response:
+        ttfb = time.perf_counter() - started
+        await response.aread()
+    timing = _timing(started, ttfb, response)
+    response.raise_for_status()
+    return response.json(), timing
+
+
+class AsyncClientHolder:
+    """One shared `httpx.AsyncClient` per event loop for an adapter instance.
+
+    An injected client is always used as-is; otherwise each event loop gets its
+    own lazily created client (clients cannot be shared across loops). A watcher
+    task on that loop closes the client when the loop shuts down (`asyncio.run`
+    cancels pending tasks before closing), so its pooled connections are released
+    while the loop can still run their cleanup.
+    """
+
+    def __init__(self, client: httpx.AsyncClient | None = None, timeout: float = 60.0) -> None:
+        self._injected = client
+        self._timeout = timeout
+        self._clients: dict[asyncio.AbstractEventLoop, tuple[httpx.AsyncClient, asyncio.Task[None]]] = {}
+
+    def get(self) -> httpx.AsyncClient:
+        if self._injected is not None:
+            return self._injected
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None or entry[0].is_closed:
+            if entry is not None:
+                entry[1].cancel()
+            client = httpx.AsyncClient(timeout=self._timeout)
+            watcher = loop.create_task(self._close_on_shutdown(loop, client), name="hexi-http-client-closer")
+            self._clients[loop] = entry = (client, watcher)
+        return entry[0]
+
+    async def _close_on_shutdown(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+        try:
+            await loop.create_future()
+        finally:
+            entry = self._clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del self._clients[loop]
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            client, watcher = entry
+            watcher.cancel()
+            if not client.is_closed:
+                await client.aclose()
+
+
+def processing_ms_from_headers(headers: Mapping[str, str] | None) -> float | None:
+    if not headers:
+        return None
+    raw = headers.get("openai-processing-ms")
+    if raw is None:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _int_or_none(value: Any) -> int | None:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def openai_usage(data: dict[str, Any]) -> tuple[int | None, int | None, int | None]:
+    usage = data.get("usage")
+    if not isinstance(usage, dict):
+        return None, None, None
+    details = usage.get("prompt_tokens_details")
+    cached = details.get("cached_tokens") if isinstance(details, dict) else None
+    return _int_or_none(usage.get("prompt_tokens")), _int_or_none(usage.get("completion_tokens")), _int_or_none(cached)
+
+
+def anthropic_usage(data: dict[str, Any]) -> tuple[int | None, int | None, int | None]:
+    usage = data.get("usage")
+    if not isinstance(usage, dict):
+        return None, None, None
+    return (
+        _int_or_none(usage.get("input_tokens")),
+        _int_or_none(usage.get("output_tokens")),
+        _int_or_none(usage.get("cache_read_input_tokens")),
+    )
+
+
+def openai_output_options(mode: str | None) -> dict[str, Any]:
+    """Request fields constraining an OpenAI-style chat completion to the ActionPlan contract."""
+    if mode == "json_schema":
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": "action_plan", "strict": True, "schema": strict_action_plan_schema()},
+            }
+        }
+    if mode == "tools":
+        return {
+            "tools": [
+                {
+                    "type": "function",
+                    "function": {
+                        "name": ACTION_PLAN_TOOL_NAME,
+                        "description": _TOOL_DESCRIPTION,
+                        "parameters": strict_action_plan_schema(),
+                        "strict": True,
+                    },
+                }
+            ],
+            "tool_choice": {"type": "function", "function": {"name": ACTION_PLAN_TOOL_NAME}},
+        }
+    return {"response_format": {"type": "json_object"}}
+
+
+def anthropic_output_options(mode: str | None) -> dict[str, Any]:
+    """Anthropic has no JSON-schema response format, so both constrained modes force a tool call."""
+    if mode not in ("json_schema", "tools"):
+        return {}
+    schema = {k: v for k, v in load_action_plan_schema().items() if k != "$schema"}
+    return {
+        "tools": [{"name": ACTION_PLAN_TOOL_NAME, "description": _TOOL_DESCRIPTION, "input_schema": schema}],
+        "tool_choice": {"type": "tool", "name": ACTION_PLAN_TOOL_NAME},
+    }
+
+
+def openai_text(data: dict[str, Any]) -> str:
+    message = data["choices"][0]["message"]
+    tool_calls = message.get("tool_calls") or []
+    for call in tool_calls:
+        function = call.get("function") if isinstance(call, dict) else None
+        if isinstance(function, dict) and function.get("name") == ACTION_PLAN_TOOL_NAME:
+            return str(function.get("arguments") or "")
+    return message["content"]
+
+
+def anthropic_text(data: dict[str, Any]) -> str | None:
+    content = data.get("content") or []
+    for block in content:
+        if isinstance(block, dict) and block.get("type") == "tool_use" and block.get("name") == ACTION_PLAN_TOOL_NAME:
+            return json.dumps(block.get("input"), ensure_ascii=False)
+    first = content[0] if content else None
+    text = first.get("text") if isinstance(first, dict) else None
+    return text or None
@@ -1,23 +1,73 @@
 from __future__ import annotations
 
-from hexi.core.domain import ModelConfig
+from typing import Any
 
-from .model_http_common import post_json, require_env
+import httpx
+
+from hexi.core.domain import ModelConfig, ModelResult
+
+from .model_http_common import (
+    AsyncClientHolder,
+    HttpTiming,
+    apost_json_timed,
+    openai_output_options,
+    openai_text,
+    openai_usage,
+    post_json_timed,
+    require_env,
+)
 
 
 class OpenAICompatModel:
+    def __init__(self, async_client: httpx.AsyncClient | None = None) -> None:
+        self._async_clients = AsyncClientHolder(async_client)
+
     def plan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return self.plan_step_result(config, system_prompt, user_prompt).text
+
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        url, headers, payload = self._request(config, system_prompt, user_prompt)
+        data, timing = post_json_timed(url, headers, payload)
+        return self._result(config, data, timing)
+
+    async def aplan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return (await self.aplan_step_result(config, system_prompt, user_prompt)).text
+
+    async def aplan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        url, headers, payload = self._request(config, system_prompt, user_prompt)
+        data, timing = await apost_json_timed(self._async_clients.get(), url, headers, payload)
+        return self._result(config, data, timing)
+
+    async def aclose(self) -> None:
+        await self._async_clients.aclose()
+
+    @staticmethod
+    def _request(config: ModelConfig, system_prompt: str, user_prompt: str) -> tuple[str, dict[str, str], dict[str, Any]]:
         api_key = require_env("OPENAI_API_KEY")
         base_url = (config.base_url or "https://api.openai.com/v1").rstrip("/")
         url = f"{base_url}/chat/completions"
         payload = {
             "model": config.model,
             "temperature": 0,
-            "response_format": {"type": "json_object"},
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            **openai_output_options(config.structured_output),
         }
-        data = post_json(url, {"Authorization": f"Bearer {api_key}"}, payload)
-        return data["choices"][0]["message"]["content"]
+        return url, {"Authorization": f"Bearer {api_key}"}, payload
+
+    @staticmethod
+    def _result(config: ModelConfig, data: dict[str, Any], timing: HttpTiming) -> ModelResult:
+        prompt_tokens, completion_tokens, cached_tokens = openai_usage(data)
+        return ModelResult(
+            text=openai_text(data),
+            provider=config.provider,
+            model=str(data.get("model") or config.model),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            latency_ms=timing.latency_ms,
+            ttfb_ms=timing.ttfb_ms,
+            provider_processing_ms=timing.provider_processing_ms,
+        )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import time
 from typing import Any
 
 import httpx
@@ -9,7 +10,17 @@ try:
 except Exception:  # pragma: no cover
     requests_lib = None
 
-from hexi.core.domain import ModelConfig
+from hexi.core.domain import ModelConfig, ModelResult
+
+from .model_http_common import (
+    anthropic_output_options,
+    anthropic_text,
+    anthropic_usage,
+    openai_output_options,
+    openai_text,
+    openai_usage,
+    processing_ms_from_headers,
+)
 
 
 class OpenRouterHTTPModel:
@@ -20,12 +31,18 @@ class OpenRouterHTTPModel:
         self.api_key = api_key
 
     def plan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return self.plan_step_result(config, system_prompt, user_prompt).text
+
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         style = (config.api_style or "openai").strip().lower()
         if style == "anthropic":
             return self._plan_step_anthropic(config, system_prompt, user_prompt)
         return self._plan_step_openai(config, system_prompt, user_prompt)
 
     async def aplan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return (await self.aplan_step_result(config, system_prompt, user_prompt)).text
+
+    async def aplan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         style = (config.api_style or "openai").strip().lower()
         if style == "anthropic":
             return await self._aplan_step_anthropic(config, system_prompt, user_prompt)
@@ -34,19 +51,50 @@ class OpenRouterHTTPModel:
     def _base_url(self, config: ModelConfig) -> str:
         return (config.base_url or "https://openrouter.ai/api/v1").rstrip("/")
 
-    def _plan_step_openai(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+    @staticmethod
+    def _requests_ttfb_ms(response: Any) -> float | None:
+        # requests measures `elapsed` from send until the response headers are parsed.
+        elapsed = getattr(response, "elapsed", None)
+        if elapsed is None or not hasattr(elapsed, "total_seconds"):
+            return None
+        return round(elapsed.total_seconds() * 1000, 3)
+
+    @staticmethod
+    def _result(
+        config: ModelConfig,
+        text: str,
+        data: dict[str, Any],
+        usage: tuple[int | None, int | None, int | None],
+        latency: float,
+        ttfb_ms: float | None,
+        headers: Any,
+    ) -> ModelResult:
+        return ModelResult(
+            text=text,
+            provider=config.provider,
+            model=str(data.get("model") or config.model),
+            prompt_tokens=usage[0],
+            completion_tokens=usage[1],
+            cached_tokens=usage[2],
+            latency_ms=round(latency * 1000, 3),
+            ttfb_ms=ttfb_ms,
+            provider_processing_ms=processing_ms_from_headers(headers),
+        )
+
+    def _plan_step_openai(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         if requests_lib is None:
             raise RuntimeError("requests is required for openrouter_http adapter. Install with: pip install -e '.[openrouter-http]'")
         url = f"{self._base_url(config)}/chat/completions"
         payload = {
             "model": config.model,
             "temperature": 0,
-            "response_format": {"type": "json_object"},
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            **openai_output_options(config.structured_output),
         }
+        started = time.perf_counter()
         response = requests_lib.post(
             url,
             headers={
@@ -56,22 +104,25 @@ class OpenRouterHTTPModel:
             json=payload,
             timeout=60,
         )
+        latency = time.perf_counter() - started
         if response.status_code != 200:
             raise RuntimeError(f"OpenRouter OpenAI-style request failed: status={response.status_code}, body={response.text}")
         data: dict[str, Any] = response.json()
-        return str(data["choices"][0]["message"]["content"])
+        text = str(openai_text(data))
+        return self._result(config, text, data, openai_usage(data), latency, self._requests_ttfb_ms(response), getattr(response, "headers", None))
 
-    async def _aplan_step_openai(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+    async def _aplan_step_openai(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         url = f"{self._base_url(config)}/chat/completions"
         payload = {
             "model": config.model,
             "temperature": 0,
-            "response_format": {"type": "json_object"},
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            **openai_output_options(config.structured_output),
         }
+        started = time.perf_counter()
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.post(
                 url,
@@ -81,12 +132,14 @@ class OpenRouterHTTPModel:
                 },
                 json=payload,
             )
+        latency = time.perf_counter() - started
         if response.status_code != 200:
             raise RuntimeError(f"OpenRouter OpenAI-style request failed: status={response.status_code}, body={response.text}")
         data: dict[str, Any] = response.json()
-        return str(data["choices"][0]["message"]["content"])
+        text = str(openai_text(data))
+        return self._result(config, text, data, openai_usage(data), latency, None, getattr(response, "headers", None))
 
-    def _plan_step_anthropic(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+    def _plan_step_anthropic(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         if requests_lib is None:
             raise RuntimeError("requests is required for openrouter_http adapter. Install with: pip install -e '.[openrouter-http]'")
         url = f"{self._base_url(config)}/messages"
@@ -95,7 +148,9 @@ class OpenRouterHTTPModel:
             "max_tokens": 2048,
             "system": system_prompt,
             "messages": [{"role": "user", "content": user_prompt}],
+            **anthropic_output_options(config.structured_output),
         }
+        started = time.perf_counter()
         response = requests_lib.post(
             url,
             headers={
@@ -106,19 +161,23 @@ class OpenRouterHTTPModel:
             json=payload,
             timeout=60,
         )
+        latency = time.perf_counter() - started
         if response.status_code != 200:
             raise RuntimeError(f"OpenRouter Anthropic-style request failed: status={response.status_code}, body={response.text}")
         data: dict[str, Any] = response.json()
-        return str(data["content"][0]["text"])
+        text = str(anthropic_text(data) or data["content"][0]["text"])
+        return self._result(config, text, data, anthropic_usage(data), latency, self._requests_ttfb_ms(response), getattr(response, "headers", None))
 
-    async def _aplan_step_anthropic(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+    async def _aplan_step_anthropic(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         url = f"{self._base_url(config)}/messages"
         payload = {
             "model": config.model,
             "max_tokens": 2048,
             "system": system_prompt,
             "messages": [{"role": "user", "content": user_prompt}],
+            **anthropic_output_options(config.structured_output),
         }
+        started = time.perf_counter()
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.post(
                 url,
@@ -129,7 +188,9 @@ class OpenRouterHTTPModel:
                 },
                 json=payload,
             )
+        latency = time.perf_counter() - started
         if response.status_code != 200:
             raise RuntimeError(f"OpenRouter Anthropic-style request failed: status={response.status_code}, body={response.text}")
         data: dict[str, Any] = response.json()
-        return str(data["content"][0]["text"])
+        text = str(anthropic_text(data) or data["content"][0]["text"])
+        return self._result(config, text, data, anthropic_usage(data), latency, None, getattr(response, "headers", None))
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import os
+import time
 from typing import Any
 
-from hexi.core.domain import ModelConfig
+from hexi.core.domain import ModelConfig, ModelResult
+
+
+def _usage_int(usage: Any, name: str) -> int | None:
+    value = getattr(usage, name, None)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
 
 
 class OpenRouterSDKModel:
@@ -20,17 +26,40 @@ class OpenRouterSDKModel:
         self._client = OpenRouter(api_key=api_key)
 
     def plan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return self.plan_step_result(config, system_prompt, user_prompt).text
+
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
+        started = time.perf_counter()
         response = self._client.chat.send(messages=messages, model=config.model)
-        return str(response.choices[0].message.content)
+        return self._result(config, response, time.perf_counter() - started)
 
     async def aplan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return (await self.aplan_step_result(config, system_prompt, user_prompt)).text
+
+    async def aplan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
+        started = time.perf_counter()
         response = await self._client.chat.send_async(messages=messages, model=config.model)
-        return str(response.choices[0].message.content)
+        return self._result(config, response, time.perf_counter() - started)
+
+    @staticmethod
+    def _result(config: ModelConfig, response: Any, latency: float) -> ModelResult:
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        model = getattr(response, "model", None)
+        return ModelResult(
+            text=str(response.choices[0].message.content),
+            provider=config.provider,
+            model=model if isinstance(model, str) and model else config.model,
+            prompt_tokens=_usage_int(usage, "prompt_tokens"),
+            completion_tokens=_usage_int(usage, "completion_tokens"),
+            cached_tokens=_usage_int(details, "cached_tokens"),
+            latency_ms=round(latency * 1000, 3),
+        )
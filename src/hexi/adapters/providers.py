@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from importlib.metadata import EntryPoint
+
+ENTRY_POINT_GROUP = "hexi.providers"
+
+# Mirrors the `hexi.providers` entry points declared in pyproject.toml, so built-in
+# providers resolve without scanning installed distributions (and from a source
+# checkout, where no distribution metadata exists).
+BUILTIN_PROVIDERS: dict[str, str] = {
+    "openrouter_http": "hexi.adapters.model_openrouter_http:OpenRouterHTTPModel",
+    "openrouter_sdk": "hexi.adapters.model_openrouter_sdk:OpenRouterSDKModel",
+    "openai_compat": "hexi.adapters.model_openai_compat:OpenAICompatModel",
+    "anthropic_compat": "hexi.adapters.model_anthropic_compat:AnthropicCompatModel",
+}
+
+# provider name -> (credential fingerprint, adapter)
+_instances: dict[str, tuple[str | None, Any]] = {}
+_lock = threading.Lock()
+
+
+class UnknownProviderError(LookupError):
+    pass
+
+
+def _plugin_entry_points() -> dict[str, EntryPoint]:
+    from importlib.metadata import entry_points  # scanning installed distributions is slow; only on demand
+
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP) if ep.name not in BUILTIN_PROVIDERS}
+
+
+def available_providers() -> list[str]:
+    """Built-in providers first, then plugins registered under the `hexi.providers` entry point group."""
+    return [*BUILTIN_PROVIDERS, *sorted(_plugin_entry_points())]
+
+
+def load_provider(name: str) -> Callable[[], Any]:
+    """Import and return the adapter factory for `name` (usually the adapter class).
+
+    Built-in names never trigger an entry point scan; other names are looked up
+    in installed distributions. Only the selected provider's module is imported.
+    """
+    target = BUILTIN_PROVIDERS.get(name)
+    if target is not None:
+        module_name, _, attr = target.partition(":")
+        return getattr(import_module(module_name), attr)
+    plugin = _plugin_entry_points().get(name)
+    if plugin is None:
+        raise UnknownProviderError(f"unsupported provider: {name}. Available: {', '.join(available_providers())}")
+    return plugin.load()
+
+
+def _fingerprint(credential: str | None) -> str | None:
+    return None if credential is None else hashlib.sha256(credential.encode("utf-8")).hexdigest()
+
+
+def get_model(name: str, credential: str | None = None) -> Any:
+    """The process-wide adapter for `name`, constructed on first use.
+
+    Adapters take their configuration per call, so one instance (and its pooled
+    HTTP client) serves every step in loops and in `hexi serve`. Some adapters
+    capture their API key when constructed; passing the resolved `credential`
+    replaces the cached instance when the key changes.
+    """
+    fingerprint = _fingerprint(credential)
+    with _lock:
+        cached = _instances.get(name)
+        if cached is None or cached[0] != fingerprint:
+            cached = _instances[name] = (fingerprint, load_provider(name)())
+        return cached[1]
+
+
+def clear_cache() -> None:
+    with _lock:
+        _instances.clear()
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+from hexi.core.domain import ModelConfig, ModelResult, RateLimits
+
+# Output budget assumed before the provider reports real usage; reconciled on release.
+DEFAULT_COMPLETION_ESTIMATE = 1024
+
+
+def estimate_tokens(*texts: str) -> int:
+    return sum(len(t) for t in texts) // 4 + DEFAULT_COMPLETION_ESTIMATE
+
+
+def _refill(level: float, last: float, now: float, capacity: float, per_minute: float) -> float:
+    return min(capacity, level + max(0.0, now - last) * per_minute / 60.0)
+
+
+def _reserve(state: dict[str, float], amount: float, now: float, per_minute: float) -> float:
+    """Take `amount` from a bucket (allowing debt) and return seconds until it is covered."""
+    capacity = per_minute
+    amount = min(amount, capacity)
+    level = _refill(state.get("level", capacity), state.get("ts", now), now, capacity, per_minute)
+    level -= amount
+    state["level"] = level
+    state["ts"] = now
+    return 0.0 if level >= 0 else -level * 60.0 / per_minute
+
+
+class _LocalBucketStore:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: dict[str, dict[str, float]] = {}
+
+    def reserve(self, limits: RateLimits, tokens: int, now: float) -> float:
+        with self._lock:
+            return _reserve_all(self._state, limits, tokens, now)
+
+    def adjust_tokens(self, limits: RateLimits, delta: int, now: float) -> None:
+        with self._lock:
+            _adjust(self._state, limits, delta, now)
+
+
+class _FileBucketStore:
+    """Bucket state shared across processes through a flock-guarded JSON file."""
+
+    def __init__(self, state_dir: Path, provider: str) -> None:
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = state_dir / f"{provider}.json"
+        self.lock_path = state_dir / f"{provider}.lock"
+        self._thread_lock = threading.Lock()
+
+    def _locked(self, fn: Callable[[dict[str, dict[str, float]]], Any]) -> Any:
+        with self._thread_lock, self.lock_path.open("a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(self.state_path.read_text(encoding="utf-8"))
+                except (FileNotFoundError, json.JSONDecodeError):
+                    state = {}
+                out = fn(state)
+                tmp = self.state_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(state), encoding="utf-8")
+                tmp.replace(self.state_path)
+                return out
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def reserve(self, limits: RateLimits, tokens: int, now: float) -> float:
+        return self._locked(lambda state: _reserve_all(state, limits, tokens, now))
+
+    def adjust_tokens(self, limits: RateLimits, delta: int, now: float) -> None:
+        self._locked(lambda state: _adjust(state, limits, delta, now))
+
+
+def _reserve_all(state: dict[str, dict[str, float]], limits: RateLimits, tokens: int, now: float) -> float:
+    wait = 0.0
+    if limits.requests_per_minute:
+        wait = max(wait, _reserve(state.setdefault("requests", {}), 1, now, limits.requests_per_minute))
+    if limits.tokens_per_minute:
+        wait = max(wait, _reserve(state.setdefault("tokens", {}), tokens, now, limits.tokens_per_minute))
+    return wait
+
+
+def _adjust(state: dict[str, dict[str, float]], limits: RateLimits, delta: int, now: float) -> None:
+    if not limits.tokens_per_minute or delta == 0:
+        return
+    bucket = state.setdefault("tokens", {})
+    capacity = limits.tokens_per_minute
+    level = _refill(bucket.get("level", capacity), bucket.get("ts", now), now, capacity, capacity)
+    bucket["level"] = min(capacity, level - delta)
+    bucket["ts"] = now
+
+
+class _AsyncTicket:
+    """Queue entry for a coroutine waiting for an in-flight slot; woken on its own loop."""
+
+    __slots__ = ("loop", "ready")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.ready = asyncio.Event()
+
+    def wake(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:  # loop already closed; its waiter is gone
+            pass
+
+
+@dataclass(frozen=True)
+class Lease:
+    estimated_tokens: int
+    queue_wait_ms: float
+
+
+class ProviderScheduler:
+    """Per-provider requests/min, tokens/min and in-flight governor with FIFO queueing.
+
+    Callers first queue for an in-flight slot in arrival order, then reserve from the
+    token buckets and sleep until the reservation is covered. `acquire` blocks the
+    calling thread; `aacquire` waits on the event loop in the same queue, without
+    occupying an executor thread, and leaves the queue cleanly when cancelled. With
+    `state_dir`, the buckets are shared across processes; the in-flight limit is
+    always per process. `update_limits` swaps the limits without losing leases,
+    queued callers or bucket levels.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        limits: RateLimits,
+        state_dir: Path | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.provider = provider
+        self.limits = limits
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._store: _LocalBucketStore | _FileBucketStore
+        self._store = _FileBucketStore(state_dir, provider) if state_dir is not None else _LocalBucketStore()
+        self._cond = threading.Condition()
+        self._waiting: deque[object | _AsyncTicket] = deque()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def update_limits(self, limits: RateLimits) -> None:
+        with self._cond:
+            self.limits = limits
+            self._notify()  # a higher (or removed) in-flight cap can admit queued callers
+
+    def _slot_free(self) -> bool:
+        # Called with `_cond` held; re-read on every check so `update_limits` applies to waiters.
+        max_in_flight = self.limits.max_in_flight
+        return not max_in_flight or self._in_flight < max_in_flight
+
+    def acquire(self, estimated_tokens: int) -> Lease:
+        started = time.perf_counter()
+        if self.limits.max_in_flight:
+            ticket = object()
+            with self._cond:
+                self._waiting.append(ticket)
+                while self._waiting[0] is not ticket or not self._slot_free():
+                    self._cond.wait()
+                self._waiting.popleft()
+                self._in_flight += 1
+                self._notify()
+        else:
+            with self._cond:
+                self._in_flight += 1
+        try:
+            wait = self._store.reserve(self.limits, estimated_tokens, self._clock())
+            if wait > 0:
+                self._sleep(wait)
+        except BaseException:
+            self._release_slot()
+            raise
+        return Lease(estimated_tokens=estimated_tokens, queue_wait_ms=round((time.perf_counter() - started) * 1000, 3))
+
+    async def aacquire(self, estimated_tokens: int) -> Lease:
+        started = time.perf_counter()
+        if self.limits.max_in_flight:
+            ticket = _AsyncTicket(asyncio.get_running_loop())
+            with self._cond:
+                self._waiting.append(ticket)
+            try:
+                while True:
+                    with self._cond:
+                        if self._waiting[0] is ticket and self._slot_free():
+                            self._waiting.popleft()
+                            self._in_flight += 1
+                            self._notify()
+                            break
+                        ticket.ready.clear()
+                    await ticket.ready.wait()
+            except BaseException:
+                with self._cond:
+                    if ticket in self._waiting:
+                        self._waiting.remove(ticket)
+                    self._notify()
+                raise
+        else:
+            with self._cond:
+                self._in_flight += 1
+        try:
+            if isinstance(self._store, _FileBucketStore):
+                # flock + file I/O: keep it off the event loop.
+                wait = await asyncio.to_thread(self._store.reserve, self.limits, estimated_tokens, self._clock())
+            else:
+                wait = self._store.reserve(self.limits, estimated_tokens, self._clock())
+            if wait > 0:
+                await self._async_sleep(wait)
+        except BaseException:
+            self._release_slot()
+            raise
+        return Lease(estimated_tokens=estimated_tokens, queue_wait_ms=round((time.perf_counter() - started) * 1000, 3))
+
+    def release(self, lease: Lease, actual_tokens: int | None = None) -> None:
+        try:
+            if actual_tokens is not None:
+                self._store.adjust_tokens(self.limits, actual_tokens - lease.estimated_tokens, self._clock())
+        finally:
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._notify()
+
+    def _notify(self) -> None:
+        # Called with `_cond` held. Only the queue head can take a slot, so an
+        # async head is woken on its loop; threads re-check on their own.
+        self._cond.notify_all()
+        if self._waiting and isinstance(self._waiting[0], _AsyncTicket):
+            self._waiting[0].wake()
+
+
+_SCHEDULERS: dict[tuple[str, str | None], ProviderScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(provider: str, limits: RateLimits, state_dir: Path | None = None) -> ProviderScheduler:
+    """Return the process-wide scheduler for `provider`, updating its limits in place if they changed."""
+    key = (provider, str(state_dir) if state_dir is not None else None)
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(key)
+        if scheduler is None:
+            scheduler = ProviderScheduler(provider, limits, state_dir=state_dir)
+            _SCHEDULERS[key] = scheduler
+        elif scheduler.limits != limits:
+            scheduler.update_limits(limits)
+        return scheduler
+
+
+def _actual_tokens(result: ModelResult) -> int | None:
+    if result.prompt_tokens is None and result.completion_tokens is None:
+        return None
+    return (result.prompt_tokens or 0) + (result.completion_tokens or 0)
+
+
+class RateLimitedModel:
+    def __init__(self, inner: Any, scheduler: ProviderScheduler) -> None:
+        self.inner = inner
+        self.scheduler = scheduler
+
+    def plan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return self.plan_step_result(config, system_prompt, user_prompt).text
+
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        lease = self.scheduler.acquire(estimate_tokens(system_prompt, user_prompt))
+        result: ModelResult | None = None
+        try:
+            result = self._call_inner(config, system_prompt, user_prompt)
+        finally:
+            self.scheduler.release(lease, _actual_tokens(result) if result is not None else None)
+        return replace(result, queue_wait_ms=lease.queue_wait_ms)
+
+    async def aplan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        return (await self.aplan_step_result(config, system_prompt, user_prompt)).text
+
+    async def aplan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        lease = await self.scheduler.aacquire(estimate_tokens(system_prompt, user_prompt))
+        result: ModelResult | None = None
+        try:
+            inner_async = getattr(self.inner, "aplan_step_result", None)
+            if callable(inner_async):
+                result = await inner_async(config, system_prompt, user_prompt)
+            else:
+                result = await asyncio.to_thread(self._call_inner, config, system_prompt, user_prompt)
+        finally:
+            self.scheduler.release(lease, _actual_tokens(result) if result is not None else None)
+        return replace(result, queue_wait_ms=lease.queue_wait_ms)
+
+    def _call_inner(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        plan_step_result = getattr(self.inner, "plan_step_result", None)
+        if callable(plan_step_result):
+            return plan_step_result(config, system_prompt, user_prompt)
+        started = time.perf_counter()
+        text = self.inner.plan_step(config, system_prompt, user_prompt)
+        return ModelResult(
+            text=text,
+            provider=config.provider,
+            model=config.model,
+            latency_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import posixpath
+import subprocess
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+from .symbol_index import SymbolIndex
+
+INDEX_VERSION = 1
+# `.hexi/` is often not gitignored; its churn (runlog, indexes) must not invalidate the map.
+_EXCLUDE_HEXI = ":(exclude).hexi"
+_TOP_EXTENSIONS = 3
+_NAMES_PER_FILE = 8
+
+
+def _fit(lines: list[str], limit: int) -> tuple[list[str], int]:
+    """Leading `lines` that fit in `limit` chars (newline-joined), and how many were dropped."""
+    kept: list[str] = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > limit:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept, len(lines) - len(kept)
+
+
+class RepoMap:
+    """Compact repository summary for the planning prompt, cached in `.hexi/index/repomap/`.
+
+    The cache is keyed by a git snapshot: HEAD plus `git status` entries (with
+    mtime and size of the listed paths). While the snapshot is unchanged the
+    rendered map is served from the cache; otherwise only directories holding
+    paths that changed since the cached snapshot are re-listed, and symbols come
+    from the (mtime-incremental) `SymbolIndex`.
+    """
+
+    def __init__(self, hexi_dir: Path, repo_root: Path, symbols: SymbolIndex) -> None:
+        self.repo_root = repo_root
+        self.symbols = symbols
+        self.index_dir = hexi_dir / "index" / "repomap"
+        self.state_path = self.index_dir / "state.json"
+        self._state: dict[str, Any] | None = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with (self.index_dir / ".lock").open("a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_state(self) -> dict[str, Any] | None:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            return None
+        return state
+
+    def _save_state(self, state: dict[str, Any]) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def _git(self, *args: str) -> bytes | None:
+        proc = subprocess.run(["git", *args], cwd=self.repo_root, capture_output=True, check=False)
+        return proc.stdout if proc.returncode == 0 else None
+
+    def _snapshot(self) -> tuple[str | None, list[list[Any]]]:
+        head = self._git("rev-parse", "--verify", "-q", "HEAD")
+        raw = self._git("status", "--porcelain", "-z", "--untracked-files=all", "--", ".", _EXCLUDE_HEXI)
+        if raw is None:
+            raise RuntimeError("git status failed")
+        parts = raw.decode("utf-8").split("\0")
+        entries: list[list[Any]] = []
+        i = 0
+        while i < len(parts):
+            entry = parts[i]
+            i += 1
+            if not entry:
+                continue
+            code, paths = entry[:2], [entry[3:]]
+            if "R" in code or "C" in code:  # renames/copies are followed by the source path
+                paths.append(parts[i])
+                i += 1
+            for path in paths:
+                try:
+                    stat = (self.repo_root / path).stat()
+                    signature: list[int] | None = [stat.st_mtime_ns, stat.st_size]
+                except OSError:
+                    signature = None
+                entries.append([code, path, signature])
+        return (head.decode("ascii").strip() if head else None), entries
+
+    def _scan(self, dirs: set[str] | None) -> dict[str, dict[str, Any]]:
+        """Direct-file stats per directory ("" is the root), for `dirs` or the whole repo."""
+        args = ["ls-files", "-z", "--cached", "--others", "--exclude-standard", "--"]
+        if dirs is None:
+            args.append(".")
+        else:
+            args.extend(f":(glob){d}/*" if d else ":(glob)*" for d in sorted(dirs))
+        raw = self._git(*args, _EXCLUDE_HEXI)
+        if raw is None:
+            raise RuntimeError("git ls-files failed")
+        stats: dict[str, dict[str, Any]] = {}
+        for rel in sorted(set(raw.decode("utf-8").split("\0")) - {""}):
+            parent, name = posixpath.split(rel)
+            entry = stats.setdefault(parent, {"files": 0, "ext": {}})
+            entry["files"] += 1
+            ext = posixpath.splitext(name)[1].lower()
+            if ext:
+                entry["ext"][ext] = entry["ext"].get(ext, 0) + 1
+            if not parent:
+                entry.setdefault("names", []).append(name)
+        return stats
+
+    def _changed_paths(self, state: dict[str, Any], head: str | None, status: list[list[Any]]) -> set[str] | None:
+        """Paths that may differ from the cached snapshot, or None when a full rescan is needed."""
+        changed = {path for _, path, _ in state["status"]} | {path for _, path, _ in status}
+        if state["head"] != head:
+            if state["head"] is None or head is None:
+                return None
+            diff = self._git("diff", "--name-only", "-z", state["head"], head, "--", ".", _EXCLUDE_HEXI)
+            if diff is None:  # e.g. the old HEAD was garbage-collected
+                return None
+            changed.update(name for name in diff.decode("utf-8").split("\0") if name)
+        return changed
+
+    def refresh(self) -> bool:
+        """Bring the cached directory stats up to date; returns whether anything changed."""
+        with self._locked():
+            state = self._state if self._state is not None else self._load_state()
+            head, status = self._snapshot()
+            if state is not None and state["head"] == head and state["status"] == status:
+                self._state = state
+                return False
+            changed = self._changed_paths(state, head, status) if state is not None else None
+            if state is None or changed is None:
+                dirs = self._scan(None)
+            else:
+                dirs = dict(state["dirs"])
+                stale = {posixpath.dirname(path.rstrip("/")) for path in changed}
+                for d in stale:
+                    dirs.pop(d, None)
+                dirs.update(self._scan(stale))
+            state = {"version": INDEX_VERSION, "head": head, "status": status, "dirs": dirs, "rendered": {}}
+            self._save_state(state)
+            self._state = state
+            return True
+
+    def render(self, max_chars: int) -> str:
+        """The repo map in at most `max_chars` characters (cached per budget)."""
+        if max_chars < 1:
+            raise ValueError("max_chars must be >= 1")
+        self.refresh()
+        assert self._state is not None
+        cached = self._state["rendered"].get(str(max_chars))
+        if cached is not None:
+            return cached
+        text = self._render(self._state["dirs"], self.symbols.definitions(), max_chars)
+        with self._locked():
+            self._state["rendered"][str(max_chars)] = text
+            self._save_state(self._state)
+        return text
+
+    @staticmethod
+    def _render(dirs: dict[str, dict[str, Any]], definitions: dict[str, list[Any]], max_chars: int) -> str:
+        files: Counter[str] = Counter()
+        extensions: dict[str, Counter[str]] = {}
+        for d, stats in dirs.items():
+            node = d
+            while True:
+                files[node] += stats["files"]
+                extensions.setdefault(node, Counter()).update(stats["ext"])
+                if not node:
+                    break
+                node = posixpath.dirname(node)
+
+        top_dirs = sorted(d for d in files if d and "/" not in d)
+        top = [f"{d}/ ({files[d]})" for d in top_dirs] + sorted(dirs.get("", {}).get("names", []))
+        header = f"{files['']} files; top level: {', '.join(top)}"
+        if len(header) > max_chars:
+            header = header[: max(max_chars - 3, 0)] + "..."
+
+        dir_lines = []
+        for d in sorted((d for d in files if d), key=lambda d: (d.count("/"), d)):
+            common = ", ".join(f"{ext} {n}" for ext, n in extensions[d].most_common(_TOP_EXTENSIONS))
+            dir_lines.append(f"{d}/ {files[d]}" + (f" ({common})" if common else ""))
+
+        def is_test(rel: str) -> bool:
+            return any(part.startswith("test") for part in rel.split("/"))
+
+        # Files defining the most public top-level names first; tests last.
+        ranked = []
+        for rel, rows in definitions.items():
+            names = [
+                qualname
+                for _, qualname, kind, _, _ in rows
+                if kind != "method" and "." not in qualname and not qualname.startswith("_")
+            ]
+            if names:
+                ranked.append((is_test(rel), -len(names), rel, names))
+        symbol_lines = [
+            f"{rel}: {', '.join(names[:_NAMES_PER_FILE])}"
+            + (f" +{len(names) - _NAMES_PER_FILE}" if len(names) > _NAMES_PER_FILE else "")
+            for _, _, rel, names in sorted(ranked)
+        ]
+
+        # Header first, directories (shallowest first) up to half the budget, then symbols.
+        reserve = 64  # room for the "... more" markers
+        out, _ = _fit([header], max_chars)
+        used = sum(len(line) + 1 for line in out)
+        dir_budget = (max_chars - used - reserve) // 2 if symbol_lines else max_chars - used - reserve
+        shown_dirs, more_dirs = _fit(dir_lines, max(dir_budget, 0))
+        if shown_dirs or more_dirs:
+            out.append("Directories (files, main extensions):")
+            out.extend(sorted(shown_dirs, key=lambda line: line.split(" ", 1)[0]))
+            if more_dirs:
+                out.append(f"... {more_dirs} more directories")
+        used = sum(len(line) + 1 for line in out)
+        if symbol_lines:
+            shown_symbols, more_symbols = _fit(symbol_lines, max(max_chars - used - reserve // 2, 0))
+            if shown_symbols:
+                out.append("Key symbols:")
+                out.extend(shown_symbols)
+            if more_symbols:
+                out.append(f"... {more_symbols} more files with symbols")
+        text, _ = _fit(out, max_chars + 1)
+        return "\n".join(text)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .runlog_store import complete_lines, open_source, runlog_sources, segment_dir_for
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_DONE = -1
+_TAIL_CHUNK = 64 * 1024
+
+
+def _load_inotify() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class ChangeWatcher:
+    """Wait for files in some directories to change.
+
+    Uses inotify on Linux (through libc, no extra dependency) and plain sleeping
+    elsewhere or when inotify is unavailable; callers re-check the files either way.
+    Directories that do not exist yet are watched once they appear.
+    """
+
+    def __init__(self, directories: Iterable[Path], use_inotify: bool = True) -> None:
+        self.directories = list(directories)
+        self._watched: set[Path] = set()
+        self._fd: int | None = None
+        self._libc = _load_inotify() if use_inotify else None
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+                self._add_watches()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _add_watches(self) -> None:
+        assert self._libc is not None and self._fd is not None
+        for directory in self.directories:
+            if directory in self._watched or not directory.is_dir():
+                continue
+            if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK) >= 0:
+                self._watched.add(directory)
+
+    def wait(self, timeout: float) -> None:
+        """Return after a change notification or after `timeout` seconds, whichever comes first."""
+        if self._fd is None:
+            time.sleep(timeout)
+            return
+        self._add_watches()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self._fd, 64 * 1024):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def __enter__(self) -> "ChangeWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _complete_end(path: Path) -> int:
+    """Offset just past the last newline of `path` (a partial tail record is not consumed)."""
+    with path.open("rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - _TAIL_CHUNK)
+            f.seek(start)
+            chunk = f.read(end - start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+class RunlogFollower:
+    """Incrementally read records appended to the JSONL runlog (plain and segmented).
+
+    A cursor maps each source key to the byte offset already consumed, so `poll`
+    only reads new bytes and never re-parses earlier records. Segments keep their
+    key when compressed, so rotation mid-follow continues where reading stopped.
+    """
+
+    def __init__(self, hexi_dir: Path, cursor: dict[str, int] | None = None) -> None:
+        self.hexi_dir = hexi_dir
+        self.cursor = dict(cursor) if cursor is not None else self.end_cursor(hexi_dir)
+
+    @staticmethod
+    def end_cursor(hexi_dir: Path) -> dict[str, int]:
+        """A cursor positioned after every complete record currently in the runlog."""
+        cursor: dict[str, int] = {}
+        for source in runlog_sources(hexi_dir):
+            cursor[source.key] = _DONE if source.closed else _complete_end(source.path)
+        return cursor
+
+    def directories(self) -> list[Path]:
+        return [self.hexi_dir, segment_dir_for(self.hexi_dir)]
+
+    def poll(self) -> list[bytes]:
+        lines: list[bytes] = []
+        for source in runlog_sources(self.hexi_dir):
+            offset = self.cursor.get(source.key, 0)
+            if offset == _DONE:
+                continue
+            if not source.closed:
+                try:
+                    size = source.path.stat().st_size
+                except FileNotFoundError:
+                    continue  # rotated since the manifest was read; picked up next poll
+                if size == offset:
+                    continue
+                if size < offset:
+                    offset = 0  # truncated or replaced
+            try:
+                f = open_source(source)
+            except FileNotFoundError:
+                continue
+            with f:
+                f.seek(offset)
+                for line in complete_lines(f):
+                    offset += len(line)
+                    if line.strip():
+                        lines.append(line)
+            self.cursor[source.key] = _DONE if source.closed else offset
+        return lines
+
+    def follow(
+        self,
+        poll_interval: float = 1.0,
+        stop: Callable[[], bool] | None = None,
+        use_inotify: bool = True,
+    ) -> Iterator[bytes]:
+        """Yield new records as they are appended until `stop()` returns true."""
+        with ChangeWatcher(self.directories(), use_inotify=use_inotify) as watcher:
+            while True:
+                yield from self.poll()
+                if stop is not None and stop():
+                    return
+                watcher.wait(poll_interval)
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+import zlib
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+from .blob_store import BlobStore
+from .runlog_store import RunlogSource, blob_dir_for, complete_lines, open_source, runlog_sources
+
+INDEX_VERSION = 1
+RUN_START_SUMMARY = "Starting single-step run"
+EVENT_TYPES = ("progress", "question", "review", "artifact", "error", "done")
+_UNKNOWN_TYPE = 255
+
+# run_no, source_no, offset, length, type code, ts (NaN when the record has none)
+_EVENT = struct.Struct("<IHQIBd")
+# run id (ascii, NUL padded), first event number, event count, start ts
+_RUN = struct.Struct("<26sQId")
+# run_ids.idx slot: run id (ascii, NUL padded; all NUL = empty), run number
+_KEY = struct.Struct("<26sI")
+_EMPTY_KEY = b"\0" * _KEY.size
+_MIN_KEY_SLOTS = 1024
+_SCAN_CHUNK = 4096
+
+
+@dataclass(frozen=True)
+class IndexedRun:
+    run_no: int
+    run_id: str
+    first_event: int
+    events: int
+    started: float | None
+
+
+@dataclass(frozen=True)
+class IndexedEvent:
+    run_id: str
+    ts: float | None
+    record: dict[str, Any]
+    raw: bytes
+
+
+def _ts(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+        return None
+    return float(value)
+
+
+class _StaleIndexError(Exception):
+    """An indexed source file was deleted or replaced after it was indexed."""
+
+
+class RunlogIndex:
+    """Sidecar offset index over the runlog (plain file and segments).
+
+    `events.idx` holds one fixed-width record per event (run, source file, byte
+    offset, length, type, timestamp) and `runs.idx` one per run, so filters by run,
+    recency and time seek to the matching records instead of scanning the runlog.
+    `run_ids.idx` is an open-addressing hash table from run id to run number, so
+    `--run` is a constant-time lookup. `refresh` only parses bytes appended since
+    the previous refresh; a source that disappeared (pruned or rotated away)
+    makes the index start over. Query results
+    carry the stored line in `raw` and the blob-resolved record in `record`.
+    Nothing is written while the `.hexi` directory does not exist.
+    """
+
+    def __init__(self, hexi_dir: Path) -> None:
+        self.hexi_dir = hexi_dir
+        self.index_dir = hexi_dir / "index" / "runlog"
+        self.events_path = self.index_dir / "events.idx"
+        self.runs_path = self.index_dir / "runs.idx"
+        self.keys_path = self.index_dir / "run_ids.idx"
+        self.state_path = self.index_dir / "state.json"
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with (self.index_dir / ".lock").open("a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_state(self) -> dict[str, Any]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = None
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            self._reset()
+            state = {"version": INDEX_VERSION, "sources": []}
+        return state
+
+    def _reset(self) -> None:
+        self.events_path.unlink(missing_ok=True)
+        self.runs_path.unlink(missing_ok=True)
+        self.keys_path.unlink(missing_ok=True)
+
+    def _save_state(self, state: dict[str, Any]) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def refresh(self) -> int:
+        """Index records appended since the last refresh; returns how many were added."""
+        if not self.hexi_dir.is_dir():
+            return 0
+        with self._locked():
+            state = self._load_state()
+            sources = runlog_sources(self.hexi_dir)
+            known = {entry["key"]: entry for entry in state["sources"]}
+            stale = not known.keys() <= {source.key for source in sources}
+            for source in sources:
+                entry = known.get(source.key)
+                if entry is not None and not source.closed and source.path.stat().st_size < entry["indexed"]:
+                    stale = True
+            if stale:
+                # A source was truncated, replaced or removed: start over.
+                self._reset()
+                state = {"version": INDEX_VERSION, "sources": []}
+                known = {}
+
+            added = 0
+            self.runs_path.touch()
+            with self.events_path.open("ab") as events_f, self.runs_path.open("r+b") as runs_f:
+                last_run = self._last_run(runs_f)
+                total_events = events_f.tell() // _EVENT.size
+                for source in sources:
+                    entry = known.get(source.key)
+                    if entry is None:
+                        entry = {"key": source.key, "indexed": 0, "complete": False}
+                        state["sources"].append(entry)
+                        known[source.key] = entry
+                    if entry["complete"]:
+                        continue
+                    source_no = state["sources"].index(entry)
+                    if not source.closed and source.path.stat().st_size == entry["indexed"]:
+                        continue
+                    with open_source(source) as f:
+                        f.seek(entry["indexed"])
+                        offset = entry["indexed"]
+                        for line in complete_lines(f):
+                            length = len(line)
+                            if line.strip():
+                                last_run = self._index_line(
+                                    line, source_no, offset, length, total_events, last_run, events_f, runs_f
+                                )
+                                total_events += 1
+                                added += 1
+                            offset += length
+                    entry["indexed"] = offset
+                    entry["complete"] = source.closed
+                if last_run is not None:
+                    self._write_run(runs_f, last_run)
+                state["keyed_runs"] = self._key_runs(runs_f, state.get("keyed_runs", 0))
+            self._save_state(state)
+            return added
+
+    def _index_line(
+        self,
+        line: bytes,
+        source_no: int,
+        offset: int,
+        length: int,
+        event_no: int,
+        run: IndexedRun | None,
+        events_f: BinaryIO,
+        runs_f: BinaryIO,
+    ) -> IndexedRun:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = {}
+        if not isinstance(record, dict):
+            record = {}
+        ts = _ts(record.get("ts"))
+        run_id = record.get("run_id") if isinstance(record.get("run_id"), str) else None
+        starts_run = record.get("type") == "progress" and record.get("one_line_summary") == RUN_START_SUMMARY
+        if run is None or starts_run or (run_id is not None and run_id != run.run_id):
+            if run is not None:
+                self._write_run(runs_f, run)
+            run_no = run.run_no + 1 if run is not None else 1
+            run = IndexedRun(run_no=run_no, run_id=(run_id or str(run_no))[:26], first_event=event_no, events=0, started=ts)
+        elif run.started is None and ts is not None:
+            run = IndexedRun(run.run_no, run.run_id, run.first_event, run.events, ts)
+        event_type = record.get("type")
+        code = EVENT_TYPES.index(event_type) if event_type in EVENT_TYPES else _UNKNOWN_TYPE
+        events_f.write(_EVENT.pack(run.run_no, source_no, offset, length, code, math.nan if ts is None else ts))
+        return IndexedRun(run.run_no, run.run_id, run.first_event, run.events + 1, run.started)
+
+    @staticmethod
+    def _unpack_run(run_no: int, raw: bytes) -> IndexedRun:
+        run_id, first_event, events, started = _RUN.unpack(raw)
+        return IndexedRun(
+            run_no=run_no,
+            run_id=run_id.rstrip(b"\0").decode("ascii"),
+            first_event=first_event,
+            events=events,
+            started=None if math.isnan(started) else started,
+        )
+
+    def _last_run(self, runs_f: BinaryIO) -> IndexedRun | None:
+        runs_f.seek(0, 2)
+        count = runs_f.tell() // _RUN.size
+        if count == 0:
+            return None
+        runs_f.seek((count - 1) * _RUN.size)
+        return self._unpack_run(count, runs_f.read(_RUN.size))
+
+    def _write_run(self, runs_f: BinaryIO, run: IndexedRun) -> None:
+        # Runs are numbered from 1 and stored in order, so a run's slot is fixed;
+        # the last run is rewritten in place as more of its events are indexed.
+        runs_f.seek((run.run_no - 1) * _RUN.size)
+        runs_f.write(
+            _RUN.pack(
+                run.run_id.encode("ascii", "replace"),
+                run.first_event,
+                run.events,
+                math.nan if run.started is None else run.started,
+            )
+        )
+        runs_f.flush()
+
+    @staticmethod
+    def _slot(run_id: bytes, slots: int) -> int:
+        return zlib.crc32(run_id) % slots
+
+    def _key_runs(self, runs_f: BinaryIO, keyed: int) -> int:
+        """Add runs `keyed + 1..` to `run_ids.idx`; returns the new keyed count.
+
+        The table is kept at most half full; when it would exceed that it is rebuilt
+        at four times the run count, so insertion stays amortized O(1).
+        """
+        runs_f.seek(0, 2)
+        total = runs_f.tell() // _RUN.size
+        if total == keyed:
+            return keyed
+        slots = self.keys_path.stat().st_size // _KEY.size if self.keys_path.exists() else 0
+        if total * 2 > slots:
+            slots = max(_MIN_KEY_SLOTS, total * 4)
+            keyed = 0
+            with self.keys_path.open("wb") as keys_f:
+                keys_f.truncate(slots * _KEY.size)
+        with self.keys_path.open("r+b") as keys_f:
+            runs_f.seek(keyed * _RUN.size)
+            run_no = keyed
+            while run_no < total:
+                chunk = runs_f.read(min(total - run_no, _SCAN_CHUNK) * _RUN.size)
+                for run_id, _first, _events, _started in _RUN.iter_unpack(chunk):
+                    run_no += 1
+                    self._insert_key(keys_f, slots, run_id, run_no)
+        return total
+
+    def _insert_key(self, keys_f: BinaryIO, slots: int, run_id: bytes, run_no: int) -> None:
+        slot = self._slot(run_id, slots)
+        while True:
+            keys_f.seek(slot * _KEY.size)
+            raw = keys_f.read(_KEY.size)
+            if raw == _EMPTY_KEY:
+                keys_f.seek(slot * _KEY.size)
+                keys_f.write(_KEY.pack(run_id, run_no))
+                return
+            if _KEY.unpack(raw)[0] == run_id:  # keep the first run with this id
+                return
+            slot = (slot + 1) % slots
+
+    def _run_at(self, runs_f: BinaryIO, run_no: int) -> IndexedRun:
+        runs_f.seek((run_no - 1) * _RUN.size)
+        return self._unpack_run(run_no, runs_f.read(_RUN.size))
+
+    def runs(self) -> list[IndexedRun]:
+        if not self.runs_path.exists():
+            return []
+        data = self.runs_path.read_bytes()
+        return [
+            self._unpack_run(i + 1, data[i * _RUN.size : (i + 1) * _RUN.size]) for i in range(len(data) // _RUN.size)
+        ]
+
+    def last_runs(self, count: int) -> list[IndexedRun]:
+        if not self.runs_path.exists() or count <= 0:
+            return []
+        with self.runs_path.open("rb") as f:
+            f.seek(0, 2)
+            total = f.tell() // _RUN.size
+            first = max(0, total - count)
+            f.seek(first * _RUN.size)
+            data = f.read()
+        return [self._unpack_run(first + i + 1, data[i * _RUN.size : (i + 1) * _RUN.size]) for i in range(total - first)]
+
+    def find_run(self, run_id: str) -> IndexedRun | None:
+        if not self.keys_path.exists() or not self.runs_path.exists():
+            return None
+        key = _KEY.pack(run_id.encode("ascii", "replace")[:26], 0)[:26]
+        with self.keys_path.open("rb") as keys_f, self.runs_path.open("rb") as runs_f:
+            slots = self.keys_path.stat().st_size // _KEY.size
+            slot = self._slot(key, slots)
+            for _ in range(slots):
+                keys_f.seek(slot * _KEY.size)
+                raw = keys_f.read(_KEY.size)
+                if raw == _EMPTY_KEY:
+                    return None
+                stored, run_no = _KEY.unpack(raw)
+                if stored == key:
+                    return self._run_at(runs_f, run_no)
+                slot = (slot + 1) % slots
+        return None
+
+    def _first_run_since(self, since: float) -> IndexedRun | None:
+        """The run to start scanning from for events at or after `since`.
+
+        Runs are appended in time order, so this binary-searches start times in
+        `runs.idx` on disk; runs without a start time are skipped over.
+        """
+        if not self.runs_path.exists():
+            return None
+        with self.runs_path.open("rb") as f:
+            f.seek(0, 2)
+            total = f.tell() // _RUN.size
+            if total == 0:
+                return None
+            lo, hi = 1, total + 1  # first run number whose start is >= since
+            while lo < hi:
+                mid = (lo + hi) // 2
+                probe = mid
+                run = self._run_at(f, probe)
+                while run.started is None and probe + 1 < hi:
+                    probe += 1
+                    run = self._run_at(f, probe)
+                if run.started is None:
+                    hi = mid
+                elif run.started < since:
+                    lo = probe + 1
+                else:
+                    hi = mid
+            # The run just before may still contain events after `since`.
+            return self._run_at(f, max(lo - 1, 1))
+
+    def query(
+        self,
+        types: set[str] | None = None,
+        run_id: str | None = None,
+        since: float | None = None,
+        last_runs: int | None = None,
+        limit: int | None = None,
+    ) -> list[IndexedEvent]:
+        """Matching events in runlog order; with `limit`, only the newest `limit` matches."""
+        try:
+            return self._query(types, run_id, since, last_runs, limit)
+        except _StaleIndexError:
+            # A source went away between refresh and read: rebuild from what is left.
+            with self._locked():
+                self._reset()
+                self.state_path.unlink(missing_ok=True)
+            return self._query(types, run_id, since, last_runs, limit)
+
+    def _query(
+        self,
+        types: set[str] | None,
+        run_id: str | None,
+        since: float | None,
+        last_runs: int | None,
+        limit: int | None,
+    ) -> list[IndexedEvent]:
+        self.refresh()
+        if not self.events_path.exists():
+            return []
+        with self.events_path.open("rb") as f:
+            f.seek(0, 2)
+            total = f.tell() // _EVENT.size
+        start, end = 0, total
+        runs: dict[int, str] = {}
+        if run_id is not None:
+            run = self.find_run(run_id)
+            if run is None:
+                return []
+            start, end = run.first_event, run.first_event + run.events
+            runs[run.run_no] = run.run_id
+        elif last_runs is not None:
+            selected = self.last_runs(last_runs)
+            if not selected:
+                return []
+            start = selected[0].first_event
+            runs.update({run.run_no: run.run_id for run in selected})
+        if since is not None:
+            first = self._first_run_since(since)
+            if first is not None:
+                start = max(start, first.first_event)
+
+        codes = None if types is None else {EVENT_TYPES.index(t) if t in EVENT_TYPES else _UNKNOWN_TYPE for t in types}
+
+        def keep(code: int, ts: float) -> bool:
+            if codes is not None and code not in codes:
+                return False
+            return since is None or (not math.isnan(ts) and ts >= since)
+
+        matches: list[tuple[int, int, int, int, float]] = []
+        with self.events_path.open("rb") as f:
+            if limit is None:
+                f.seek(start * _EVENT.size)
+                remaining = end - start
+                while remaining > 0:
+                    chunk = f.read(min(remaining, _SCAN_CHUNK) * _EVENT.size)
+                    if not chunk:
+                        break
+                    for run_no, source_no, offset, length, code, ts in _EVENT.iter_unpack(chunk):
+                        if keep(code, ts):
+                            matches.append((run_no, source_no, offset, length, ts))
+                    remaining -= len(chunk) // _EVENT.size
+            else:
+                # Newest first: walk back from the end and stop after `limit` matches,
+                # so the cost depends on the limit, not on the runlog size.
+                position = end
+                chunk_events = 256  # grows while matches are sparse
+                while position > start and len(matches) < limit:
+                    count = min(position - start, chunk_events)
+                    chunk_events = min(chunk_events * 2, _SCAN_CHUNK)
+                    position -= count
+                    f.seek(position * _EVENT.size)
+                    records = list(_EVENT.iter_unpack(f.read(count * _EVENT.size)))
+                    for run_no, source_no, offset, length, code, ts in reversed(records):
+                        if keep(code, ts):
+                            matches.append((run_no, source_no, offset, length, ts))
+                            if len(matches) == limit:
+                                break
+                matches.reverse()
+        return self._load(matches, runs)
+
+    def _load(self, matches: list[tuple[int, int, int, int, float]], runs: dict[int, str]) -> list[IndexedEvent]:
+        if not matches:
+            return []
+        state = self._load_state()
+        by_key = {source.key: source for source in runlog_sources(self.hexi_dir)}
+        missing = {m[0] for m in matches} - runs.keys()
+        if missing:
+            with self.runs_path.open("rb") as runs_f:
+                runs = {**runs, **{run_no: self._run_at(runs_f, run_no).run_id for run_no in missing}}
+        blobs = BlobStore(blob_dir_for(self.hexi_dir))
+        out: list[IndexedEvent] = []
+        with ExitStack() as stack:
+            handles: dict[int, tuple[BinaryIO, RunlogSource]] = {}
+            for run_no, source_no, offset, length, ts in matches:
+                if source_no not in handles:
+                    source = by_key.get(state["sources"][source_no]["key"])
+                    if source is None:
+                        raise _StaleIndexError(state["sources"][source_no]["key"])
+                    try:
+                        handles[source_no] = (stack.enter_context(open_source(source)), source)
+                    except FileNotFoundError:
+                        raise _StaleIndexError(source.key) from None
+                f, _source = handles[source_no]
+                # Matches are in file order, so compressed streams only ever seek forward.
+                f.seek(offset)
+                raw = f.read(length)
+                out.append(
+                    IndexedEvent(
+                        run_id=runs.get(run_no, str(run_no)),
+                        ts=None if math.isnan(ts) else ts,
+                        record=blobs.resolve(json.loads(raw)),
+                        raw=raw,
+                    )
+                )
+        return out
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import json
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from .blob_store import is_blob_reference
+from .runlog_index import RUN_START_SUMMARY
+
+MAX_OPEN_RUNS = 256
+# Evicted run ids remembered so their later events are not counted as new runs.
+MAX_EVICTED_RUNS = 4096
+MAX_COMMANDS = 500
+OTHER_COMMANDS = "(other)"
+
+
+class LogHistogram:
+    """Streaming quantile sketch with bounded relative error.
+
+    Values land in logarithmic buckets `(gamma^(i-1), gamma^i]`, so any quantile is
+    reported within `relative_accuracy` of a true sample value and memory grows
+    with the log of the value range, not with the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        value = max(float(value), 0.0)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if value <= 0.0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket in relative terms, capped at the observed max.
+                return min(2 * self.gamma**key / (self.gamma + 1), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def summary(self) -> dict[str, Any]:
+        def _round(value: float | None) -> float | None:
+            return None if value is None else round(value, 3)
+
+        return {
+            "count": self.count,
+            "p50": _round(self.quantile(0.5)),
+            "p95": _round(self.quantile(0.95)),
+            "mean": _round(self.mean),
+            "max": _round(self.max) if self.count else None,
+        }
+
+
+@dataclass
+class _OpenRun:
+    start_ts: float | None
+    start_mono: float | None
+    provider: str = "-"
+    model: str = "-"
+
+
+@dataclass
+class _CommandStats:
+    runs: int = 0
+    failures: int = 0
+
+
+@dataclass
+class _SizeStats:
+    events: int = 0
+    total: int = 0
+    max: int = 0
+
+
+def _day(ts: float | None) -> str:
+    if ts is None:
+        return "-"
+    return datetime.fromtimestamp(ts, tz=timezone.utc).date().isoformat()
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def payload_bytes(value: Any) -> int:
+    """Approximate content size of a payload; blob references count as the blob's size."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if is_blob_reference(value):
+        return value["bytes"]
+    if isinstance(value, dict):
+        return sum(len(str(key)) + payload_bytes(item) for key, item in value.items())
+    if isinstance(value, list):
+        return sum(payload_bytes(item) for item in value)
+    return len(json.dumps(value))
+
+
+class RunlogStats:
+    """One-pass aggregates over runlog records.
+
+    Memory is bounded: quantiles come from `LogHistogram`s, at most
+    `MAX_OPEN_RUNS` unfinished runs are tracked at once (oldest evicted; the
+    last `MAX_EVICTED_RUNS` evicted ids are remembered so a late event does not
+    count its run twice), and
+    commands beyond `MAX_COMMANDS` distinct strings are pooled under `(other)`.
+    """
+
+    def __init__(self, since: float | None = None) -> None:
+        self.since = since
+        self.events = 0
+        self.runs = 0
+        self.failed_runs = 0
+        self.step_duration_ms: dict[tuple[str, str, str], LogHistogram] = {}
+        self.model_latency_ms: dict[tuple[str, str, str], LogHistogram] = {}
+        self.action_ms: dict[tuple[str, str, str, str], LogHistogram] = {}
+        self.action_failures: dict[tuple[str, str, str, str], int] = {}
+        self.commands: dict[str, _CommandStats] = {}
+        self.payload_sizes: dict[str, _SizeStats] = {}
+        self._open: OrderedDict[str, _OpenRun] = OrderedDict()
+        self._evicted: OrderedDict[str, None] = OrderedDict()
+        self._legacy_runs = 0
+
+    def add_all(self, records: Iterable[dict[str, Any]]) -> "RunlogStats":
+        for record in records:
+            self.add(record)
+        return self
+
+    def _run_key(self, record: dict[str, Any], starts_run: bool) -> str:
+        run_id = record.get("run_id")
+        if isinstance(run_id, str):
+            return run_id
+        # Older records have no run id: a run spans from one start event to the next.
+        if starts_run or self._legacy_runs == 0:
+            self._legacy_runs += 1
+        return f"legacy-{self._legacy_runs}"
+
+    def add(self, record: dict[str, Any]) -> None:
+        ts = _number(record.get("ts"))
+        if self.since is not None and (ts is None or ts < self.since):
+            return
+        self.events += 1
+        event_type = str(record.get("type", "?"))
+        summary = record.get("one_line_summary")
+        payload = record.get("payload") if isinstance(record.get("payload"), dict) else {}
+        starts_run = event_type == "progress" and summary == RUN_START_SUMMARY
+        key = self._run_key(record, starts_run)
+
+        run = self._open.get(key)
+        if run is None and key in self._evicted:
+            # Already counted; its start is gone, so it contributes no step duration.
+            run = _OpenRun(start_ts=None, start_mono=None)
+        elif run is None:
+            run = _OpenRun(start_ts=ts, start_mono=_number(record.get("mono")))
+            self._open[key] = run
+            self.runs += 1
+            if len(self._open) > MAX_OPEN_RUNS:
+                evicted, _ = self._open.popitem(last=False)
+                self._evicted[evicted] = None
+                if len(self._evicted) > MAX_EVICTED_RUNS:
+                    self._evicted.popitem(last=False)
+
+        size = self.payload_sizes.setdefault(event_type, _SizeStats())
+        nbytes = payload_bytes(payload)
+        size.events += 1
+        size.total += nbytes
+        size.max = max(size.max, nbytes)
+
+        model = payload.get("model")
+        if isinstance(model, dict):
+            run.provider = str(model.get("provider") or "-")
+            run.model = str(model.get("model") or "-")
+            latency = _number(model.get("latency_ms"))
+            if latency is not None:
+                group = (run.provider, run.model, _day(ts))
+                self.model_latency_ms.setdefault(group, LogHistogram()).add(latency)
+
+        action = payload.get("action")
+        duration = _number(payload.get("duration_ms"))
+        if isinstance(action, str) and duration is not None:
+            group = (run.provider, run.model, action, _day(ts))
+            self.action_ms.setdefault(group, LogHistogram()).add(duration)
+            failed = event_type == "error" or (action == "run" and payload.get("exit_code") not in (0, None))
+            if failed:
+                self.action_failures[group] = self.action_failures.get(group, 0) + 1
+            command = payload.get("command")
+            if action == "run" and isinstance(command, str):
+                if command not in self.commands and len(self.commands) >= MAX_COMMANDS:
+                    command = OTHER_COMMANDS
+                stats = self.commands.setdefault(command, _CommandStats())
+                stats.runs += 1
+                stats.failures += int(failed)
+
+        if event_type == "done":
+            self._open.pop(key, None)
+            self._evicted.pop(key, None)
+            if payload.get("success") is False:
+                self.failed_runs += 1
+            elapsed = self._elapsed_ms(run, ts, _number(record.get("mono")))
+            if elapsed is not None:
+                group = (run.provider, run.model, _day(run.start_ts))
+                self.step_duration_ms.setdefault(group, LogHistogram()).add(elapsed)
+
+    @staticmethod
+    def _elapsed_ms(run: _OpenRun, ts: float | None, mono: float | None) -> float | None:
+        if run.start_mono is not None and mono is not None:
+            return (mono - run.start_mono) * 1000
+        if run.start_ts is not None and ts is not None:
+            return (ts - run.start_ts) * 1000
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "events": self.events,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "step_duration_ms": [
+                {"provider": provider, "model": model, "day": day, **hist.summary()}
+                for (provider, model, day), hist in sorted(self.step_duration_ms.items())
+            ],
+            "model_latency_ms": [
+                {"provider": provider, "model": model, "day": day, **hist.summary()}
+                for (provider, model, day), hist in sorted(self.model_latency_ms.items())
+            ],
+            "actions": [
+                {
+                    "provider": provider,
+                    "model": model,
+                    "action": action,
+                    "day": day,
+                    "failures": self.action_failures.get((provider, model, action, day), 0),
+                    **hist.summary(),
+                }
+                for (provider, model, action, day), hist in sorted(self.action_ms.items())
+            ],
+            "commands": [
+                {
+                    "command": command,
+                    "runs": stats.runs,
+                    "failures": stats.failures,
+                    "failure_rate": round(stats.failures / stats.runs, 4) if stats.runs else 0.0,
+                }
+                for command, stats in sorted(self.commands.items(), key=lambda item: (-item[1].runs, item[0]))
+            ],
+            "payload_bytes": [
+                {
+                    "type": event_type,
+                    "events": size.events,
+                    "mean": round(size.total / size.events, 1) if size.events else 0.0,
+                    "max": size.max,
+                }
+                for event_type, size in sorted(self.payload_sizes.items())
+            ],
+        }
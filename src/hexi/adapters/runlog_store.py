@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+try:
+    import zstandard
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from .blob_store import BlobStore
+from .runlog_writer import BufferedRunlogWriter, FlushPolicy
+
+RUNLOG_STORAGE_MODES = ("plain", "segmented")
+COMPRESSION_MODES = ("auto", "gzip", "zstd", "none")
+MANIFEST_VERSION = 1
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+_COPY_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SegmentPolicy:
+    max_bytes: int = 16 * 1024 * 1024
+    max_age_s: float = 24 * 3600.0
+    compression: str = "auto"
+
+
+def resolve_codec(compression: str) -> str:
+    if compression not in COMPRESSION_MODES:
+        raise ValueError(f"runlog.compression must be one of: {', '.join(COMPRESSION_MODES)}")
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstd runlog compression requires the 'zstandard' package")
+    return compression
+
+
+def segment_dir_for(hexi_dir: Path) -> Path:
+    return hexi_dir / "runlog"
+
+
+def blob_dir_for(hexi_dir: Path) -> Path:
+    return hexi_dir / "blobs"
+
+
+def read_manifest(segment_dir: Path) -> dict[str, Any]:
+    try:
+        data = json.loads((segment_dir / "manifest.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "next_seq": 1, "segments": [], "active": None}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"unsupported runlog manifest: {segment_dir / 'manifest.json'}")
+    return data
+
+
+def _write_manifest(segment_dir: Path, manifest: dict[str, Any]) -> None:
+    path = segment_dir / "manifest.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _open_compressed(path: Path, codec: str) -> BinaryIO:
+    if codec == "gzip":
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"reading {path.name} requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)  # type: ignore[return-value]
+    return path.open("rb")
+
+
+def complete_lines(f: BinaryIO) -> Iterator[bytes]:
+    # A file still being appended to may end mid-line; stop at the last full record.
+    for line in f:
+        if not line.endswith(b"\n"):
+            return
+        yield line
+
+
+def _iter_segment_lines(segment_dir: Path) -> Iterator[bytes]:
+    seen: set[str] = set()
+    while True:
+        manifest = read_manifest(segment_dir)
+        for segment in manifest.get("segments", []):
+            name = segment["name"]
+            if name in seen:
+                continue
+            seen.add(name)
+            with _open_compressed(segment_dir / name, segment.get("codec", "none")) as f:
+                yield from complete_lines(f)
+        active = manifest.get("active")
+        if not active:
+            return
+        try:
+            f = (segment_dir / active["name"]).open("rb")
+        except FileNotFoundError:
+            continue  # rotated between reading the manifest and opening it
+        with f:
+            yield from complete_lines(f)
+        return
+
+
+@dataclass(frozen=True)
+class RunlogSource:
+    """One physical runlog file; `key` stays stable when an active segment is compressed."""
+
+    key: str
+    path: Path
+    codec: str
+    closed: bool
+
+
+def runlog_sources(hexi_dir: Path) -> list[RunlogSource]:
+    sources: list[RunlogSource] = []
+    plain = hexi_dir / "runlog.jsonl"
+    if plain.exists():
+        sources.append(RunlogSource(key=plain.name, path=plain, codec="none", closed=False))
+    segment_dir = segment_dir_for(hexi_dir)
+    if not (segment_dir / "manifest.json").exists():
+        return sources
+    manifest = read_manifest(segment_dir)
+    for segment in manifest.get("segments", []):
+        codec = segment.get("codec", "none")
+        name = segment["name"]
+        key = name[: -len(_SUFFIXES[codec])] if _SUFFIXES.get(codec) else name
+        sources.append(RunlogSource(key=f"runlog/{key}", path=segment_dir / name, codec=codec, closed=True))
+    active = manifest.get("active")
+    if active:
+        path = segment_dir / active["name"]
+        sources.append(RunlogSource(key=f"runlog/{active['name']}", path=path, codec="none", closed=False))
+    return sources
+
+
+def open_source(source: RunlogSource) -> BinaryIO:
+    return _open_compressed(source.path, source.codec)
+
+
+def iter_runlog_lines(hexi_dir: Path) -> Iterator[bytes]:
+    """Raw JSONL records from `runlog.jsonl` followed by any segmented storage, oldest first."""
+    plain = hexi_dir / "runlog.jsonl"
+    if plain.exists():
+        with plain.open("rb") as f:
+            yield from complete_lines(f)
+    segment_dir = segment_dir_for(hexi_dir)
+    if (segment_dir / "manifest.json").exists():
+        yield from _iter_segment_lines(segment_dir)
+
+
+def iter_runlog(hexi_dir: Path, resolve_blobs: bool = True) -> Iterator[dict[str, Any]]:
+    blobs = BlobStore(blob_dir_for(hexi_dir)) if resolve_blobs else None
+    for line in iter_runlog_lines(hexi_dir):
+        if line.strip():
+            record = json.loads(line)
+            yield blobs.resolve(record) if blobs is not None else record
+
+
+class SegmentedRunlogWriter(BufferedRunlogWriter):
+    """Buffered writer that appends to an active segment and rotates by size or age.
+
+    Closed segments are compressed and recorded in `manifest.json`. Every batch
+    commit runs under a flock on `.lock` so several Hexi processes can share one
+    segment directory.
+    """
+
+    def __init__(
+        self,
+        segment_dir: Path,
+        policy: FlushPolicy | None = None,
+        segments: SegmentPolicy | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(segment_dir / "manifest.json", policy)
+        self.segment_dir = segment_dir
+        self.segments = segments or SegmentPolicy()
+        self.codec = resolve_codec(self.segments.compression)
+        self._clock = clock
+        self._file_name: str | None = None
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, (self.segment_dir / ".lock").open("a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def rotate(self) -> None:
+        """Close and compress the active segment now (no-op when it is empty)."""
+        with self._locked():
+            manifest = read_manifest(self.segment_dir)
+            if manifest.get("active"):
+                self._rotate(manifest)
+                _write_manifest(self.segment_dir, manifest)
+
+    def _commit(self, lines: list[str], fsync: bool) -> None:
+        with self._locked():
+            manifest = read_manifest(self.segment_dir)
+            dirty = False
+            active = manifest.get("active")
+            if active and self._clock() - float(active["started"]) >= self.segments.max_age_s:
+                dirty = self._rotate(manifest) or dirty
+                active = None
+            if not active:
+                active = self._start_segment(manifest)
+                dirty = True
+            if self._file is None or self._file_name != active["name"]:
+                self._close_file()
+                self._file = (self.segment_dir / active["name"]).open("a", encoding="utf-8")
+                self._file_name = active["name"]
+            if lines:
+                self._file.write("".join(lines))
+                self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+            if os.fstat(self._file.fileno()).st_size >= self.segments.max_bytes:
+                self._rotate(manifest)
+                dirty = True
+            if dirty:
+                _write_manifest(self.segment_dir, manifest)
+
+    def _start_segment(self, manifest: dict[str, Any]) -> dict[str, Any]:
+        seq = int(manifest.get("next_seq", 1))
+        manifest["next_seq"] = seq + 1
+        active = {"name": f"{seq:06d}.jsonl", "started": self._clock()}
+        manifest["active"] = active
+        return active
+
+    def _rotate(self, manifest: dict[str, Any]) -> bool:
+        active = manifest.get("active")
+        if not active:
+            return False
+        if self._file_name == active["name"]:
+            self._close_file()
+        source = self.segment_dir / active["name"]
+        manifest["active"] = None
+        if not source.exists() or source.stat().st_size == 0:
+            source.unlink(missing_ok=True)
+            return True
+        target = source.with_name(source.name + _SUFFIXES[self.codec])
+        events, raw_bytes = self._compress(source, target)
+        if target != source:
+            source.unlink()
+        manifest.setdefault("segments", []).append(
+            {
+                "name": target.name,
+                "codec": self.codec,
+                "events": events,
+                "bytes": raw_bytes,
+                "stored_bytes": target.stat().st_size,
+                "started": active["started"],
+                "closed": self._clock(),
+            }
+        )
+        return True
+
+    def _compress(self, source: Path, target: Path) -> tuple[int, int]:
+        events = 0
+        raw_bytes = 0
+        if self.codec == "none":
+            with source.open("rb") as f:
+                for chunk in iter(lambda: f.read(_COPY_CHUNK), b""):
+                    events += chunk.count(b"\n")
+                    raw_bytes += len(chunk)
+            return events, raw_bytes
+        tmp = target.with_name(target.name + ".tmp")
+        with source.open("rb") as src, tmp.open("wb") as raw_out:
+            if self.codec == "gzip":
+                out: Any = gzip.GzipFile(fileobj=raw_out, mode="wb", mtime=0)
+            else:
+                out = zstandard.ZstdCompressor().stream_writer(raw_out, closefd=False)
+            with out:
+                for chunk in iter(lambda: src.read(_COPY_CHUNK), b""):
+                    events += chunk.count(b"\n")
+                    raw_bytes += len(chunk)
+                    out.write(chunk)
+        tmp.replace(target)
+        return events, raw_bytes
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._file_name = None
+
+    def _shutdown(self) -> None:
+        self._close_file()
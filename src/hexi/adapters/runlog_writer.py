@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+from hexi.core.domain import Event
+from hexi.core.schemas import event_to_dict
+
+
+def runlog_record(event: Event) -> dict[str, Any]:
+    """JSONL record for an event; events emitted outside a run get an append-time `ts`."""
+    data = event_to_dict(event)
+    if event.ts is None:
+        data["ts"] = round(time.time(), 6)
+    return data
+
+
+@dataclass(frozen=True)
+class FlushPolicy:
+    every_events: int = 64
+    interval_ms: float = 200.0
+    fsync_on_step_end: bool = False
+
+
+class _Barrier:
+    def __init__(self, fsync: bool) -> None:
+        self.fsync = fsync
+        self.done = threading.Event()
+        # First failure since the previous barrier, reported by the flush that waits on this one.
+        self.error: BaseException | None = None
+
+
+_CLOSE = object()
+_LIVE_WRITERS: "weakref.WeakSet[BufferedRunlogWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_writers() -> None:
+    for writer in list(_LIVE_WRITERS):
+        writer.close()
+
+
+class BufferedRunlogWriter:
+    """Append JSONL records from a background thread through one open file handle.
+
+    `write` only enqueues; encoding and I/O happen on the worker, which flushes to
+    the OS every `every_events` records or `interval_ms`, whichever comes first.
+    `flush` is a barrier: it returns once everything enqueued before it is written
+    (and fsynced if requested), and raises if a record it covers could not be
+    written; that failure is reported once, so later flushes are unaffected.
+    Writers still open at interpreter exit are closed.
+    """
+
+    def __init__(self, path: Path, policy: FlushPolicy | None = None) -> None:
+        self.path = path
+        self.policy = policy or FlushPolicy()
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._error: BaseException | None = None
+        self._file: TextIO | None = None
+        # Optional record rewrite applied on the worker thread before encoding.
+        self.transform: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+        _LIVE_WRITERS.add(self)
+
+    def write(self, record: dict[str, Any]) -> None:
+        if self._closed:
+            raise RuntimeError(f"runlog writer is closed: {self.path}")
+        self._ensure_started()
+        self._queue.put(record)
+
+    def flush(self, fsync: bool = False) -> None:
+        if self._thread is None:
+            return
+        barrier = _Barrier(fsync)
+        self._queue.put(barrier)
+        barrier.done.wait()
+        if barrier.error is not None:
+            raise RuntimeError(f"runlog writer failed: {barrier.error}") from barrier.error
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_CLOSE)
+            thread.join()
+        _LIVE_WRITERS.discard(self)
+        self._raise_if_failed()
+
+    def __enter__(self) -> "BufferedRunlogWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _raise_if_failed(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"runlog writer failed: {error}") from error
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hexi-runlog-writer", daemon=True)
+                self._thread.start()
+
+    def _encode(self, record: dict[str, Any]) -> Any:
+        return json.dumps(record, ensure_ascii=True) + "\n"
+
+    def _commit(self, lines: list[str], fsync: bool) -> None:
+        """Write one batch of `_encode` results; subclasses override both to change the storage."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        if lines:
+            self._file.write("".join(lines))
+            self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def _shutdown(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self) -> None:
+        interval = max(self.policy.interval_ms, 1.0) / 1000
+        every = max(self.policy.every_events, 1)
+        batch: list[Any] = []
+        last_flush = time.monotonic()
+        try:
+            while True:
+                timeout = max(0.0, interval - (time.monotonic() - last_flush)) if batch else None
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is not None and item is not _CLOSE and not isinstance(item, _Barrier):
+                    try:
+                        if self.transform is not None:
+                            item = self.transform(item)
+                        batch.append(self._encode(item))
+                    except BaseException as exc:
+                        self._error = self._error or exc
+                        continue
+                    if len(batch) < every and time.monotonic() - last_flush < interval:
+                        continue
+
+                fsync = isinstance(item, _Barrier) and item.fsync
+                try:
+                    if batch or fsync:
+                        self._commit(batch, fsync)
+                except BaseException as exc:  # pragma: no cover - disk errors
+                    self._error = self._error or exc
+                batch = []
+                last_flush = time.monotonic()
+                if isinstance(item, _Barrier):
+                    item.error, self._error = self._error, None
+                    item.done.set()
+                if item is _CLOSE:
+                    return
+        finally:
+            self._shutdown()
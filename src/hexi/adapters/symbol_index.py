@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import ast
+import json
+import multiprocessing
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+INDEX_VERSION = 1
+# Below this many changed files, parsing inline beats starting worker processes.
+POOL_THRESHOLD = 64
+_MAX_WORKERS = 8
+
+# name, qualname, kind, first line (including decorators), last line
+SymbolRow = list[Any]
+
+
+def _symbols(tree: ast.Module) -> list[SymbolRow]:
+    rows: list[SymbolRow] = []
+
+    def visit(body: list[ast.stmt], prefix: str, in_class: bool) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if in_class else "function"
+            else:
+                continue
+            qualname = f"{prefix}{node.name}"
+            start = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+            rows.append([node.name, qualname, kind, start, node.end_lineno or node.lineno])
+            if kind == "class":
+                visit(node.body, f"{qualname}.", True)
+
+    visit(tree.body, "", False)
+    return rows
+
+
+def parse_symbols(path: str) -> list[SymbolRow]:
+    """Classes, functions and methods defined in one Python file (empty if it does not parse)."""
+    try:
+        source = Path(path).read_bytes()
+        return _symbols(ast.parse(source, filename=path))
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+
+class SymbolIndex:
+    """Python symbol index for a repository, stored in `.hexi/index/symbols/`.
+
+    `refresh` stats the tracked and untracked-but-not-ignored `*.py` files and
+    re-parses only those whose mtime or size changed; large batches are parsed in
+    a process pool. The parsed state is kept in memory between refreshes, so a
+    long-lived workspace (`hexi serve`) only pays for the stat pass.
+    """
+
+    def __init__(self, hexi_dir: Path, repo_root: Path) -> None:
+        self.repo_root = repo_root
+        self.index_dir = hexi_dir / "index" / "symbols"
+        self.state_path = self.index_dir / "state.json"
+        self._files: dict[str, dict[str, Any]] | None = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with (self.index_dir / ".lock").open("a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_state(self) -> dict[str, dict[str, Any]]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            state = None
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            return {}
+        return state["files"]
+
+    def _save_state(self, files: dict[str, dict[str, Any]]) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "files": files}), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def _python_files(self) -> list[str]:
+        proc = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", "*.py"],
+            cwd=self.repo_root,
+            capture_output=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"git ls-files failed: {proc.stderr.decode('utf-8', 'replace').strip()}")
+        return sorted({name for name in proc.stdout.decode("utf-8").split("\0") if name})
+
+    def _parse(self, paths: list[str]) -> list[list[SymbolRow]]:
+        absolute = [str(self.repo_root / rel) for rel in paths]
+        if len(paths) < POOL_THRESHOLD:
+            return [parse_symbols(path) for path in absolute]
+        workers = min(os.cpu_count() or 1, _MAX_WORKERS)
+        # spawn, not fork: `hexi serve` calls this from a worker thread.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(parse_symbols, absolute, chunksize=max(1, len(absolute) // (workers * 4))))
+
+    def refresh(self) -> int:
+        """Re-parse new and changed files, drop deleted ones; returns how many files were parsed."""
+        with self._locked():
+            files = self._files if self._files is not None else self._load_state()
+            current: dict[str, tuple[int, int]] = {}
+            for rel in self._python_files():
+                try:
+                    stat = (self.repo_root / rel).stat()
+                except FileNotFoundError:  # listed by git but deleted from the worktree
+                    continue
+                current[rel] = (stat.st_mtime_ns, stat.st_size)
+            stale = [
+                rel
+                for rel, (mtime_ns, size) in current.items()
+                if rel not in files or (files[rel]["mtime_ns"], files[rel]["size"]) != (mtime_ns, size)
+            ]
+            removed = files.keys() - current.keys()
+            for rel in removed:
+                del files[rel]
+            for rel, rows in zip(stale, self._parse(stale)):
+                mtime_ns, size = current[rel]
+                files[rel] = {"mtime_ns": mtime_ns, "size": size, "symbols": rows}
+            if stale or removed or not self.state_path.exists():
+                self._save_state(files)
+            self._files = files
+            return len(stale)
+
+    def definitions(self) -> dict[str, list[SymbolRow]]:
+        """Refreshed symbol rows per file."""
+        self.refresh()
+        assert self._files is not None
+        return {rel: entry["symbols"] for rel, entry in self._files.items()}
+
+    def query(self, text: str, path: str | None = None, limit: int = 50) -> list[dict[str, object]]:
+        """Symbols whose name or dotted qualname starts with `text`; exact matches first."""
+        if not text:
+            raise ValueError("query must be non-empty")
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self.refresh()
+        assert self._files is not None
+        prefix = "" if path in (None, "", ".") else path.rstrip("/") + "/"
+        exact: list[dict[str, object]] = []
+        partial: list[dict[str, object]] = []
+        for rel in sorted(self._files):
+            if prefix and not rel.startswith(prefix) and rel != path:
+                continue
+            for name, qualname, kind, line, end_line in self._files[rel]["symbols"]:
+                if not (name.startswith(text) or qualname.startswith(text)):
+                    continue
+                match = {
+                    "name": name,
+                    "qualname": qualname,
+                    "kind": kind,
+                    "path": rel,
+                    "line": line,
+                    "end_line": end_line,
+                }
+                (exact if text in (name, qualname) else partial).append(match)
+        return (exact + partial)[:limit]
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import threading
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Iterable, Protocol
+
+from hexi.core.domain import Event
+from hexi.core.schemas import event_to_dict
+
+SOCKET_NAME = "serve.sock"
+# Holds the socket path of a worker started with `--socket`.
+SOCKET_RECORD = "serve.socket"
+
+# JSON-RPC 2.0 error codes (-32000..-32099 are implementation-defined).
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+QUEUE_FULL = -32001
+
+
+def socket_path(hexi_dir: Path) -> Path:
+    return hexi_dir / SOCKET_NAME
+
+
+def worker_socket_path(hexi_dir: Path) -> Path:
+    """Where this repository's worker listens: the path recorded by `hexi serve --socket`, else the default."""
+    try:
+        recorded = (hexi_dir / SOCKET_RECORD).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        recorded = ""
+    return Path(recorded) if recorded else socket_path(hexi_dir)
+
+
+def record_socket_path(hexi_dir: Path, path: Path) -> None:
+    """Record a non-default socket path so `run`/`apply` can find the worker."""
+    record = hexi_dir / SOCKET_RECORD
+    if path == socket_path(hexi_dir):
+        record.unlink(missing_ok=True)
+        return
+    tmp = record.with_suffix(".tmp")
+    tmp.write_text(str(path.absolute()) + "\n", encoding="utf-8")
+    tmp.replace(record)
+
+
+def clear_socket_path(hexi_dir: Path, path: Path) -> None:
+    """Forget the recorded socket path if it still points at `path`."""
+    if worker_socket_path(hexi_dir) == path.absolute():
+        (hexi_dir / SOCKET_RECORD).unlink(missing_ok=True)
+
+
+class WorkerError(RuntimeError):
+    def __init__(self, message: str, code: int = SERVER_ERROR) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class WorkerUnavailable(WorkerError):
+    """No worker is listening on the socket; callers fall back to in-process execution."""
+
+
+class WorkerRequestError(ValueError):
+    """Raised by a handler for bad request params; reported as JSON-RPC `invalid params`."""
+
+
+class StepHandler(Protocol):
+    def __call__(self, method: str, params: dict[str, Any], events: Any) -> dict[str, Any]: ...
+
+
+def _send(conn: socket.socket, message: dict[str, Any]) -> None:
+    conn.sendall(json.dumps({"jsonrpc": "2.0", **message}, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"id": request_id, "error": {"code": code, "message": message}}
+
+
+@dataclass
+class _Job:
+    method: str
+    params: dict[str, Any]
+    out: queue.Queue[tuple[str, Any]] = field(default_factory=queue.Queue)
+
+
+class _JobEventSink:
+    def __init__(self, job: _Job) -> None:
+        self._job = job
+
+    def emit(self, event: Event) -> None:
+        self._job.out.put(("event", event_to_dict(event)))
+
+
+class WorkerServer:
+    """Serve step requests for one repository over a Unix socket.
+
+    Wire format is newline-delimited JSON-RPC 2.0, one request per connection.
+    `ping` and `shutdown` are answered directly; every other method in `methods`
+    is queued (FIFO, at most `max_queue` waiting) and executed one at a time by
+    `handler` on a single executor thread, so steps never race on the workspace.
+    While a request runs, each event is streamed back as an `event` notification
+    before the final response.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        handler: StepHandler,
+        methods: Iterable[str] = ("run", "apply"),
+        max_queue: int = 64,
+    ) -> None:
+        self.path = path
+        self.handler = handler
+        self.methods = frozenset(methods)
+        self._jobs: queue.Queue[_Job | None] = queue.Queue(maxsize=max(max_queue, 1))
+        self._stop = threading.Event()
+        self._sock: socket.socket | None = None
+        self._executor: threading.Thread | None = None
+        self.completed = 0
+        self._busy = False
+
+    def bind(self) -> None:
+        if self.path.exists():
+            if _is_listening(self.path):
+                raise WorkerError(f"a worker is already listening on {self.path}")
+            self.path.unlink()  # stale socket from a worker that did not exit cleanly
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(self.path))
+        os.chmod(self.path, 0o600)
+        sock.listen()
+        sock.settimeout(0.2)
+        self._sock = sock
+        self._executor = threading.Thread(target=self._execute, name="hexi-serve-executor", daemon=True)
+        self._executor.start()
+
+    def serve_forever(self) -> None:
+        if self._sock is None:
+            self.bind()
+        assert self._sock is not None
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), name="hexi-serve-conn", daemon=True).start()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        self._stop.set()
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+            self.path.unlink(missing_ok=True)
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            self._jobs.put(None)
+            executor.join()
+
+    def _execute(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._busy = True
+            try:
+                result = self.handler(job.method, job.params, _JobEventSink(job))
+                job.out.put(("result", result))
+            except WorkerRequestError as exc:
+                job.out.put(("error", (INVALID_PARAMS, str(exc))))
+            except Exception as exc:
+                job.out.put(("error", (SERVER_ERROR, f"{type(exc).__name__}: {exc}")))
+            finally:
+                self._busy = False
+                self.completed += 1
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rb") as reader:
+            try:
+                self._respond(conn, reader.readline())
+            except OSError:
+                pass  # client went away; a queued step still runs and logs to the runlog
+
+    def _respond(self, conn: socket.socket, line: bytes) -> None:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            _send(conn, _error(None, PARSE_ERROR, "request is not valid JSON"))
+            return
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            _send(conn, _error(None, INVALID_REQUEST, "request must be an object with a string method"))
+            return
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            _send(conn, _error(request_id, INVALID_PARAMS, "params must be an object"))
+            return
+
+        if method == "ping":
+            status = {"pid": os.getpid(), "queued": self._jobs.qsize(), "completed": self.completed}
+            _send(conn, {"id": request_id, "result": status})
+            return
+        if method == "shutdown":
+            self.shutdown()
+            _send(conn, {"id": request_id, "result": {"stopping": True}})
+            return
+        if method not in self.methods:
+            _send(conn, _error(request_id, METHOD_NOT_FOUND, f"unknown method: {method}"))
+            return
+
+        job = _Job(method=method, params=params)
+        position = self._jobs.qsize() + int(self._busy)  # requests ahead of this one
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            _send(conn, _error(request_id, QUEUE_FULL, "worker queue is full"))
+            return
+        _send(conn, {"method": "queued", "params": {"position": position}})
+        while True:
+            kind, value = job.out.get()
+            if kind == "event":
+                _send(conn, {"method": "event", "params": value})
+            elif kind == "result":
+                _send(conn, {"id": request_id, "result": value})
+                return
+            else:
+                code, message = value
+                _send(conn, _error(request_id, code, message))
+                return
+
+
+def _is_listening(path: Path) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class WorkerClient:
+    """Call a `WorkerServer`; raises `WorkerUnavailable` when nothing is listening."""
+
+    _ids = count(1)
+
+    def __init__(self, path: Path, connect_timeout: float = 1.0) -> None:
+        self.path = path
+        self.connect_timeout = connect_timeout
+
+    def call(
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+        on_queued: Callable[[int], None] | None = None,
+    ) -> dict[str, Any]:
+        if not self.path.exists():
+            raise WorkerUnavailable(f"no worker socket at {self.path}")
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.connect_timeout)
+        try:
+            conn.connect(str(self.path))
+        except OSError as exc:
+            conn.close()
+            raise WorkerUnavailable(f"worker socket {self.path} is not accepting connections: {exc}") from exc
+        conn.settimeout(None)  # a step may queue behind others and run for minutes
+        request_id = next(self._ids)
+        with conn, conn.makefile("rb") as reader:
+            _send(conn, {"id": request_id, "method": method, "params": params or {}})
+            for line in reader:
+                message = json.loads(line)
+                notification = message.get("method")
+                if notification == "event":
+                    if on_event is not None:
+                        on_event(message.get("params") or {})
+                elif notification == "queued":
+                    if on_queued is not None:
+                        on_queued(int((message.get("params") or {}).get("position", 0)))
+                elif "error" in message:
+                    error = message["error"] or {}
+                    raise WorkerError(str(error.get("message")), code=int(error.get("code", SERVER_ERROR)))
+                elif "result" in message:
+                    return message["result"] or {}
+        raise WorkerError("worker closed the connection before responding")
+
+    def ping(self) -> dict[str, Any]:
+        return self.call("ping")
+
+    def shutdown(self) -> dict[str, Any]:
+        return self.call("shutdown")
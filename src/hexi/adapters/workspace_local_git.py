@@ -1,7 +1,20 @@
 from __future__ import annotations
 
+import os
 import subprocess
+import tempfile
 from pathlib import Path
+from typing import TextIO
+
+from hexi.core.patches import FilePatch, apply_file_patch
+
+from .repo_map import RepoMap
+from .symbol_index import SymbolIndex
+
+
+# Chunk size for skipping lines outside the requested range.
+_LINE_CHUNK = 64 * 1024
+_LINE_ENDINGS = ("\n", "\r")
 
 
 class PathSafetyError(ValueError):
@@ -18,10 +31,34 @@ def resolve_repo_path(repo_root: Path, requested: str) -> Path:
     return candidate
 
 
+def _readline(handle: TextIO, limit: int) -> str:
+    """`handle.readline(limit)`, keeping a `\\r\\n` the limit splits in one piece."""
+    line = handle.readline(limit)
+    if len(line) == limit and line.endswith("\r"):
+        pos = handle.tell()
+        if handle.read(1) == "\n":
+            line += "\n"
+        else:
+            handle.seek(pos)
+    return line
+
+
+def _skip_line(handle: TextIO) -> bool:
+    """Consume one line in bounded chunks; False at end of file."""
+    chunk = _readline(handle, _LINE_CHUNK)
+    if not chunk:
+        return False
+    while len(chunk) == _LINE_CHUNK and not chunk.endswith(_LINE_ENDINGS):
+        chunk = _readline(handle, _LINE_CHUNK)
+    return True
+
+
 class LocalGitWorkspace:
     def __init__(self, cwd: Path) -> None:
         self._cwd = cwd
         self._repo_root = self._discover_repo_root(cwd)
+        self._symbols: SymbolIndex | None = None
+        self._repo_map: RepoMap | None = None
 
     @staticmethod
     def _discover_repo_root(cwd: Path) -> Path:
@@ -46,11 +83,121 @@ class LocalGitWorkspace:
         content = p.read_text(encoding="utf-8")
         return content[:max_chars]
 
+    def read_lines(self, path: str, start_line: int, end_line: int | None, max_chars: int) -> dict[str, object]:
+        """Stream the requested line range; memory stays bounded by `max_chars`.
+
+        Lines are read in capped chunks, so even a single huge line (minified code,
+        a data dump) is never held in full.
+        """
+        p = resolve_repo_path(self._repo_root, path)
+        if not p.is_file():
+            raise FileNotFoundError(path)
+        chunks: list[str] = []
+        used = 0
+        last = start_line - 1
+        next_line: int | None = None
+        number = 0
+        with p.open(encoding="utf-8", newline="") as handle:
+            while end_line is None or number < end_line:
+                number += 1
+                if number < start_line:
+                    if not _skip_line(handle):
+                        break
+                    continue
+                budget = max_chars - used
+                # One char more than the budget tells a line that fits from one that does not.
+                line = _readline(handle, budget + 1)
+                if not line:
+                    break
+                if len(line) > budget:
+                    if not chunks and budget > 0:
+                        # A single line longer than the budget: return its head.
+                        chunks.append(line[:budget])
+                        last = number
+                        if not line.endswith(_LINE_ENDINGS):
+                            _skip_line(handle)
+                        if (end_line is None or number < end_line) and handle.readline(1):
+                            next_line = number + 1
+                    else:
+                        next_line = number
+                    break
+                chunks.append(line)
+                used += len(line)
+                last = number
+        result: dict[str, object] = {
+            "path": path,
+            "start_line": start_line,
+            "end_line": last,
+            "content": "".join(chunks),
+        }
+        if next_line is not None:
+            result["next_line"] = next_line
+        return result
+
     def write_text(self, path: str, content: str) -> None:
         p = resolve_repo_path(self._repo_root, path)
         p.parent.mkdir(parents=True, exist_ok=True)
         p.write_text(content, encoding="utf-8")
 
+    def apply_patch(self, patches: list[FilePatch]) -> list[dict[str, object]]:
+        """Apply `patches` atomically: all files change or none do.
+
+        Every patch is applied in memory first (several patches to one path apply
+        in order), so a hunk that does not apply leaves the tree untouched. Files
+        are then swapped in via same-directory temp files and `os.replace`; if a
+        swap fails, files already replaced are restored.
+        """
+        staged: dict[Path, tuple[str, str | None, str]] = {}
+        results: list[dict[str, object]] = []
+        for patch in patches:
+            p = resolve_repo_path(self._repo_root, patch.path)
+            if p in staged:
+                rel, original, current = staged[p]
+            else:
+                rel = p.relative_to(self._repo_root).as_posix()
+                original = p.read_bytes().decode("utf-8") if p.is_file() else None
+                current = original
+            updated = apply_file_patch(current, patch)
+            staged[p] = (rel, original, updated)
+            added, removed = patch.line_counts()
+            results.append(
+                {
+                    "path": rel,
+                    "added": added,
+                    "removed": removed,
+                    "bytes": len(updated.encode("utf-8")),
+                    "created": original is None,
+                }
+            )
+
+        done: list[tuple[Path, str | None]] = []
+        try:
+            for p, (_, original, updated) in staged.items():
+                self._replace_file(p, updated)
+                done.append((p, original))
+        except BaseException:
+            for p, original in reversed(done):
+                if original is None:
+                    p.unlink(missing_ok=True)
+                else:
+                    self._replace_file(p, original)
+            raise
+        return results
+
+    @staticmethod
+    def _replace_file(p: Path, content: str) -> None:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{p.name}.", suffix=".tmp", dir=p.parent)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content.encode("utf-8"))
+            if p.exists():
+                os.chmod(tmp, p.stat().st_mode & 0o7777)
+            os.replace(tmp, p)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
     def list_files(self, path: str | None, glob_pattern: str | None, limit: int) -> list[str]:
         if limit < 1:
             raise ValueError("limit must be >= 1")
@@ -107,6 +254,23 @@ class LocalGitWorkspace:
                         return out
         return out
 
+    def find_symbols(self, query: str, path: str | None, limit: int) -> list[dict[str, object]]:
+        """Python classes/functions/methods by name or prefix, from `.hexi/index/symbols/`."""
+        if path is not None:
+            resolve_repo_path(self._repo_root, path)
+        return self._symbol_index().query(query, path=path, limit=limit)
+
+    def repo_map(self, max_chars: int) -> str:
+        """Directory stats and top-level Python symbols, cached in `.hexi/index/repomap/`."""
+        if self._repo_map is None:
+            self._repo_map = RepoMap(self._repo_root / ".hexi", self._repo_root, self._symbol_index())
+        return self._repo_map.render(max_chars)
+
+    def _symbol_index(self) -> SymbolIndex:
+        if self._symbols is None:
+            self._symbols = SymbolIndex(self._repo_root / ".hexi", self._repo_root)
+        return self._symbols
+
     def git_status(self) -> str:
         proc = subprocess.run(
             ["git", "status", "--short"],
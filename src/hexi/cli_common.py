@@ -0,0 +1,93 @@
+"""Helpers shared by `hexi.cli` and the command bodies in `hexi.commands`.
+
+This module sits outside `hexi.commands` because `hexi.cli` imports it on every
+invocation; like `hexi.cli` it must stay cheap to import, so rich and the
+adapters are imported inside the functions that need them.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import typer
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from hexi.adapters.memory_file import FileMemory
+    from hexi.adapters.workspace_local_git import LocalGitWorkspace
+
+# Set from the global `-v` and `--console` options by the `hexi` app callback.
+GLOBAL_VERBOSE = 0
+GLOBAL_CONSOLE_MODE = "auto"
+
+_console_instance: Console | None = None
+
+
+def console() -> Console:
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+
+        _console_instance = Console()
+    return _console_instance
+
+
+def trace(message: str, level: int = 1) -> None:
+    if GLOBAL_VERBOSE >= level:
+        console().print(f"[dim][trace:v{level}] {message}[/dim]")
+
+
+def error_and_exit(message: str, code: int = 2) -> None:
+    from rich.panel import Panel
+    from rich.text import Text
+
+    console().print(Panel(Text(f"Error: {message}", style="bold red"), border_style="red", title="Hexi"))
+    raise typer.Exit(code=code)
+
+
+def workspace_and_memory() -> tuple[LocalGitWorkspace, FileMemory]:
+    from hexi.adapters.memory_file import open_memory
+    from hexi.adapters.workspace_local_git import LocalGitWorkspace
+
+    ws = LocalGitWorkspace(Path.cwd())
+    memory = open_memory(ws.repo_root())
+    return ws, memory
+
+
+def bootstrap_memory() -> tuple[FileMemory, Path, bool]:
+    from hexi.adapters.memory_file import open_memory
+    from hexi.adapters.workspace_local_git import LocalGitWorkspace
+
+    try:
+        ws = LocalGitWorkspace(Path.cwd())
+        root = ws.repo_root()
+        return open_memory(root), root, True
+    except RuntimeError:
+        root = Path.cwd()
+        return open_memory(root), root, False
+
+
+def pick_model(provider: str, credential: str | None = None):
+    """The cached adapter for `provider`, resolved through the `hexi.providers` registry.
+
+    `credential` is the resolved API key; a different key yields a fresh adapter.
+    """
+    from hexi.adapters.providers import UnknownProviderError, get_model
+
+    try:
+        return get_model(provider, credential)
+    except UnknownProviderError as exc:
+        raise typer.BadParameter(str(exc)) from None
+
+
+def governed_model(model: Any, memory: FileMemory, provider: str) -> Any:
+    limits = memory.load_rate_limits(provider)
+    if not limits.enabled:
+        return model
+    from hexi.adapters.rate_limit import RateLimitedModel, get_scheduler
+
+    state_dir = memory.hexi_dir / "ratelimit" if limits.shared else None
+    trace(f"Rate limits for {provider}: {limits}", level=2)
+    return RateLimitedModel(model, get_scheduler(provider, limits, state_dir=state_dir))
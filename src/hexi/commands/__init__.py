@@ -0,0 +1,6 @@
+"""Implementations of `hexi` subcommands.
+
+`hexi.cli` declares every command and its options; the bodies live here and are
+imported only when their command runs, so rendering and adapter imports stay off
+the startup path of unrelated commands.
+"""
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import typer
+from rich.panel import Panel
+from rich.table import Table
+
+from hexi import cli_common
+from hexi.core.schemas import ActionPlanError, parse_action_plan
+
+
+def plan_check(file: Path | None, json_input: str | None) -> None:
+    console = cli_common.console()
+    if file is None and json_input is None:
+        cli_common.error_and_exit("Provide one input via --file or --json")
+    if file is not None and json_input is not None:
+        cli_common.error_and_exit("Use only one input source: --file or --json")
+
+    raw = ""
+    source = ""
+    if file is not None:
+        if not file.exists():
+            cli_common.error_and_exit(f"ActionPlan file not found: {file}")
+        raw = file.read_text(encoding="utf-8")
+        source = str(file)
+    else:
+        assert json_input is not None
+        raw = json_input
+        source = "inline --json"
+
+    try:
+        plan = parse_action_plan(raw)
+    except ActionPlanError as exc:
+        console.print(
+            Panel(
+                f"Invalid ActionPlan from [bold]{source}[/bold]\n\n{exc}",
+                title="Plan Check Failed",
+                border_style="red",
+            )
+        )
+        console.print(
+            "Hints:\n"
+            "- ensure top-level keys are exactly: summary, actions\n"
+            "- ensure each action has required fields by kind\n"
+            "- ensure JSON is strict (no trailing commas/comments)"
+        )
+        raise typer.Exit(code=1)
+
+    info = Table(show_header=False)
+    info.add_row("Source", source)
+    info.add_row("Summary", plan.summary)
+    info.add_row("Action count", str(len(plan.actions)))
+    console.print(Panel(info, title="Plan Check Passed", border_style="green"))
+
+    actions_table = Table(title="Actions", show_header=True, header_style="bold cyan")
+    actions_table.add_column("#", justify="right")
+    actions_table.add_column("Kind")
+    actions_table.add_column("Target/Command")
+    actions_table.add_column("Notes")
+    for idx, action in enumerate(plan.actions, start=1):
+        target = action.path or ", ".join(action.paths or []) or action.command or "-"
+        notes = "-"
+        if action.kind == "read" and (action.start_line or action.end_line):
+            notes = f"lines={action.start_line or 1}-{action.end_line or 'end'}"
+        elif action.kind == "write":
+            notes = f"bytes={len((action.content or '').encode('utf-8'))}"
+        elif action.kind == "patch":
+            notes = f"edits={len(action.edits)}" if action.edits else "unified diff"
+        elif action.kind == "emit":
+            notes = f"event={action.event_type}, blocking={action.blocking}"
+        actions_table.add_row(str(idx), action.kind, target, notes)
+    console.print(actions_table)
+
+
+def diff() -> None:
+    try:
+        ws, _ = cli_common.workspace_and_memory()
+    except RuntimeError as exc:
+        cli_common.error_and_exit(str(exc))
+    diff_text = ws.git_diff(max_chars=20000)
+    cli_common.console().print(Panel(diff_text or "(no changes)", title="Git Diff", border_style="magenta"))
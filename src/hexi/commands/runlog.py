@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import re
+import time
+from datetime import datetime
+from typing import Any
+
+import typer
+from rich.markup import escape
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from hexi import cli_common
+from hexi.adapters.events_console import ConsoleEventSink
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.memory_sqlite import SqliteMemory
+from hexi.adapters.runlog_index import EVENT_TYPES, IndexedEvent
+from hexi.adapters.runlog_stats import RunlogStats
+from hexi.core.schemas import event_from_dict
+
+_RELATIVE_SINCE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_SINCE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _parse_since(value: str) -> float:
+    """Relative (`30m`, `2h`, `7d`) or ISO-8601 (`2026-03-01`, `2026-03-01T12:00`) to Unix time."""
+    match = _RELATIVE_SINCE.match(value.strip())
+    if match:
+        return time.time() - float(match.group(1)) * _SINCE_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"invalid --since value: {value!r} (use e.g. 30m, 2h, 7d or an ISO date)") from None
+
+
+def log(
+    event_type: list[str] | None,
+    run: str | None,
+    since: str | None,
+    last: int | None,
+    limit: int,
+    as_json: bool,
+    follow: bool,
+) -> None:
+    memory, _root, _is_git_repo = cli_common.bootstrap_memory()
+    if event_type:
+        unknown = sorted(set(event_type) - set(EVENT_TYPES))
+        if unknown:
+            cli_common.error_and_exit(f"unknown event type(s): {', '.join(unknown)}. Use: {', '.join(EVENT_TYPES)}")
+    try:
+        since_ts = _parse_since(since) if since else None
+    except ValueError as exc:
+        cli_common.error_and_exit(str(exc))
+
+    # Taken before the history query so nothing appended in between is missed.
+    cursor = memory.runlog_cursor() if follow else None
+    events = memory.query_runlog(
+        types=set(event_type) if event_type else None,
+        run_id=run,
+        since=since_ts,
+        last_runs=last,
+        limit=limit,
+    )
+    if as_json:
+        for event in events:
+            typer.echo(json.dumps(event.record, ensure_ascii=False))
+    elif events:
+        _print_log_table(events)
+    elif not follow:
+        cli_common.console().print("(no matching events)")
+    if follow:
+        _follow_log(memory, cursor, events, set(event_type) if event_type else None, run, as_json)
+
+
+def _follow_log(
+    memory: FileMemory,
+    cursor: Any,
+    shown: list[IndexedEvent],
+    types: set[str] | None,
+    run_id: str | None,
+    as_json: bool,
+) -> None:
+    seen = {(e.record.get("run_id"), e.record.get("seq")) for e in shown if e.record.get("seq") is not None}
+    sink = None if as_json else ConsoleEventSink(verbose=cli_common.GLOBAL_VERBOSE, mode=cli_common.GLOBAL_CONSOLE_MODE)
+    try:
+        for record in memory.follow_runlog(cursor, types=types, run_id=run_id):
+            if (record.get("run_id"), record.get("seq")) in seen:
+                continue  # already printed by the history query
+            if sink is None:
+                typer.echo(json.dumps(record, ensure_ascii=False))
+            else:
+                sink.emit(event_from_dict(record))
+                sink.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+def _print_log_table(events: list[IndexedEvent]) -> None:
+    table = Table(title="Hexi Log")
+    table.add_column("Run", style="cyan", no_wrap=True)
+    table.add_column("Time", no_wrap=True)
+    table.add_column("Type", no_wrap=True)
+    table.add_column("Summary")
+    for event in events:
+        record = event.record
+        when = datetime.fromtimestamp(event.ts).strftime("%Y-%m-%d %H:%M:%S") if event.ts is not None else "-"
+        kind = str(record.get("type", "?"))
+        style = "red" if kind == "error" else ("yellow" if record.get("blocking") else "")
+        table.add_row(event.run_id, when, Text(kind, style=style), str(record.get("one_line_summary", "")))
+        if cli_common.GLOBAL_VERBOSE >= 1 and record.get("payload"):
+            table.add_row("", "", "", Text(json.dumps(record["payload"], ensure_ascii=False)[:500], style="dim"))
+    cli_common.console().print(table)
+
+
+def migrate_runlog() -> None:
+    memory, _root, _is_git_repo = cli_common.bootstrap_memory()
+    memory.ensure_initialized()
+    sqlite_memory = memory if isinstance(memory, SqliteMemory) else SqliteMemory(memory.repo_root)
+    sqlite_memory.ensure_initialized()
+    result = sqlite_memory.import_runlog_files()
+    lines = [f"Imported [bold]{result.events}[/bold] events into [bold]{escape(str(sqlite_memory.db_path))}[/bold]"]
+    if result.skipped:
+        lines.append(f"Skipped {result.skipped} malformed line(s).")
+    if not isinstance(memory, SqliteMemory):
+        lines.append(escape('Set `[memory] backend = "sqlite"` in .hexi/config.toml to use it.'))
+    cli_common.console().print(Panel("\n".join(lines), title="Runlog Migration", border_style="green"))
+
+
+def stats(since: str | None, as_json: bool) -> None:
+    memory, _root, _is_git_repo = cli_common.bootstrap_memory()
+    try:
+        since_ts = _parse_since(since) if since else None
+    except ValueError as exc:
+        cli_common.error_and_exit(str(exc))
+    data = RunlogStats(since=since_ts).add_all(memory.iter_runlog(resolve_blobs=False)).to_dict()
+    if as_json:
+        typer.echo(json.dumps(data, ensure_ascii=False))
+        return
+
+    console = cli_common.console()
+    console.print(
+        f"Events: [bold]{data['events']}[/bold]  Runs: [bold]{data['runs']}[/bold]  "
+        f"Failed runs: [bold]{data['failed_runs']}[/bold]"
+    )
+    timing_columns = ("count", "p50", "p95", "mean", "max")
+    label_columns = {"provider", "model", "day", "action", "command", "type"}
+    sections = (
+        ("Step duration (ms)", data["step_duration_ms"], ("provider", "model", "day", *timing_columns)),
+        ("Model latency (ms)", data["model_latency_ms"], ("provider", "model", "day", *timing_columns)),
+        ("Actions (ms)", data["actions"], ("provider", "model", "action", "day", "failures", *timing_columns)),
+        ("Commands", data["commands"], ("command", "runs", "failures", "failure_rate")),
+        ("Payload bytes", data["payload_bytes"], ("type", "events", "mean", "max")),
+    )
+    for title, rows, columns in sections:
+        if not rows:
+            continue
+        table = Table(title=title)
+        for column in columns:
+            justify = "left" if column in label_columns else "right"
+            table.add_column(column.replace("_", " ").title(), justify=justify)
+        for row in rows:
+            table.add_row(*("-" if row[column] is None else str(row[column]) for column in columns))
+        console.print(table)
+
+
+def gc(grace_hours: float) -> None:
+    memory, _root, _is_git_repo = cli_common.bootstrap_memory()
+    result = memory.gc_blobs(grace_s=grace_hours * 3600)
+    cli_common.console().print(
+        Panel(
+            f"Removed [bold]{result.removed}[/bold] blobs ({result.freed_bytes} bytes), kept {result.kept}.",
+            title="Blob GC",
+            border_style="green",
+        )
+    )
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import typer
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from hexi import cli_common
+from hexi.adapters.providers import available_providers
+from hexi.core.domain import ModelConfig
+
+TEMPLATES = [
+    "hexi-python-lib",
+    "hexi-fastapi-service",
+    "hexi-typer-cli",
+    "hexi-data-job",
+    "hexi-agent-worker",
+]
+
+
+def _copy_template_tree(src: Path, destination: Path, force: bool) -> None:
+    destination.mkdir(parents=True, exist_ok=True)
+    if any(destination.iterdir()) and not force:
+        raise RuntimeError(f"destination is not empty: {destination}. Use --force to overwrite-compatible copy")
+
+    for item in src.iterdir():
+        target = destination / item.name
+        if item.is_dir():
+            shutil.copytree(item, target, dirs_exist_ok=force)
+        else:
+            if target.exists() and not force:
+                raise RuntimeError(f"file exists: {target}. Re-run with --force")
+            shutil.copy2(item, target)
+
+
+def _local_template_roots() -> list[Path]:
+    return [
+        Path(__file__).resolve().parents[3] / "templates",
+        Path.cwd() / "templates",
+    ]
+
+
+def _copy_template(template: str, destination: Path, force: bool) -> None:
+    for root in _local_template_roots():
+        src = root / template
+        if src.exists():
+            _copy_template_tree(src, destination, force)
+            return
+
+    from importlib.resources import as_file, files
+
+    package_templates = files("hexi").joinpath("templates").joinpath(template)
+    if package_templates.is_dir():
+        with as_file(package_templates) as src:
+            _copy_template_tree(Path(src), destination, force)
+            return
+
+    raise FileNotFoundError(f"template not found: {template}")
+
+
+def _validate_destination(destination: Path, force: bool) -> None:
+    if not destination.exists():
+        return
+    if destination.is_file():
+        raise RuntimeError(f"destination is a file: {destination}. Choose a directory path.")
+    if destination.is_dir() and any(destination.iterdir()) and not force:
+        raise RuntimeError(f"destination is not empty: {destination}. Use --force to overwrite-compatible copy.")
+
+
+DEMO_RANDOM_PROMPTS: dict[str, list[str]] = {
+    "hexi-python-lib": [
+        "create an agentic codemod helper that proposes safe refactors and add tests",
+        "add an autonomous flaky-test triage helper and test it",
+    ],
+    "hexi-fastapi-service": [
+        "add endpoint to receive coding tasks and queue single-step agent actions with tests",
+        "add endpoint that summarizes git diff review for agentic runs and test it",
+    ],
+    "hexi-typer-cli": [
+        "add 'agent-plan' subcommand to draft coding action plans and tests",
+        "add 'agent-review' subcommand to summarize code diffs and tests",
+    ],
+    "hexi-data-job": [
+        "add job that analyzes runlogs and reports recurring agent failures with tests",
+        "add pipeline stage that scores agent action quality and tests",
+    ],
+    "hexi-agent-worker": [
+        "add retry guardrails for failed agent steps and tests",
+        "add structured post-step reviewer for code edits and tests",
+    ],
+}
+
+
+def _generate_demo_ideas(cfg_provider: str, cfg_model: str, cfg_base_url: str | None, cfg_api_style: str | None) -> list[dict[str, str]]:
+    model_cfg = ModelConfig(provider=cfg_provider, model=cfg_model, base_url=cfg_base_url, api_style=cfg_api_style)
+    model = cli_common.pick_model(cfg_provider)
+    nonce = random.randint(100000, 999999)
+    raw = model.plan_step(
+        model_cfg,
+        (
+            "You are Hexi Demo Ideator.\n"
+            "Hexi is a Pythonic library/CLI for creating agentic coders: systems that read code, propose constrained action plans, "
+            "edit files safely, run allowlisted commands, and emit structured events.\n"
+            "Hexi projects are about code generation and code-change automation workflows, not generic apps.\n"
+            "Output must be strict JSON only; no markdown, no prose outside JSON."
+        ),
+        (
+            f"Run nonce: {nonce}.\n"
+            "Generate exactly 3 distinct, practical project ideas as JSON with this shape only:\n"
+            "{\"ideas\":[{\"title\":str,\"template\":str,\"prompt\":str}]}\n\n"
+            f"Template must be one of: {TEMPLATES}.\n"
+            "Each idea must be explicitly about agentic coding capabilities, such as:\n"
+            "- automated code edits with safety constraints\n"
+            "- test generation/repair loops\n"
+            "- migration assistants for codebases\n"
+            "- code review augmentation using structured events\n"
+            "- runlog analysis and coding workflow diagnostics\n\n"
+            "Hard constraints:\n"
+            "- no generic websites\n"
+            "- no general consumer apps\n"
+            "- no ideas unrelated to software engineering automation\n"
+            "- prompts must request code changes/tests/docs in a repository\n\n"
+            "Quality bar:\n"
+            "- concrete and buildable in a tiny starter project\n"
+            "- clear engineering value for developers\n"
+            "- each of the 3 ideas must be meaningfully different\n"
+        ),
+    )
+    data: dict[str, Any]
+    try:
+        parsed = json.loads(raw)
+        if not isinstance(parsed, dict):
+            raise RuntimeError("ideas response must be a JSON object")
+        data = parsed
+    except json.JSONDecodeError:
+        start = raw.find("{")
+        end = raw.rfind("}")
+        if start == -1 or end == -1 or start >= end:
+            snippet = raw[:200].replace("\n", " ")
+            raise RuntimeError(f"ideas response was not valid JSON. Raw starts with: {snippet}")
+        parsed = json.loads(raw[start : end + 1])
+        if not isinstance(parsed, dict):
+            raise RuntimeError("ideas response must be a JSON object")
+        data = parsed
+    ideas = data.get("ideas", [])
+    if not isinstance(ideas, list) or len(ideas) != 3:
+        raise RuntimeError("invalid ideas response")
+    out: list[dict[str, str]] = []
+    for item in ideas:
+        if not isinstance(item, dict):
+            raise RuntimeError("invalid idea item")
+        title = str(item.get("title", "")).strip()
+        template = str(item.get("template", "")).strip()
+        prompt = str(item.get("prompt", "")).strip()
+        if not title or template not in TEMPLATES or not prompt:
+            raise RuntimeError("invalid idea fields")
+        out.append({"title": title, "template": template, "prompt": prompt})
+    random.shuffle(out)
+    return out
+
+
+def _ideas_mode_available(cfg_provider: str, cfg_model: str, cfg_base_url: str | None, cfg_api_style: str | None, key_source: str | None) -> tuple[bool, str]:
+    if key_source is None:
+        return False, "missing API key"
+    if cfg_provider not in available_providers():
+        return False, f"unsupported provider '{cfg_provider}'"
+    try:
+        model_cfg = ModelConfig(provider=cfg_provider, model=cfg_model, base_url=cfg_base_url, api_style=cfg_api_style)
+        model = cli_common.pick_model(cfg_provider)
+        _ = model.plan_step(
+            model_cfg,
+            "You are a connectivity probe. Reply with one word: ok.",
+            "Say ok.",
+        )
+        return True, "ready"
+    except Exception as exc:
+        return False, str(exc)
+
+
+def new(
+    template: str,
+    name: str | None,
+    path: Path,
+    git_init: bool,
+    force: bool,
+    interactive: bool,
+) -> None:
+    console = cli_common.console()
+    chosen_template = template
+    chosen_name = name
+    if interactive:
+        chosen_template = typer.prompt("Template", default=template).strip()
+        chosen_name = typer.prompt("Project name (blank for current path)", default=name or "").strip() or None
+    if chosen_template not in TEMPLATES:
+        cli_common.error_and_exit(f"unknown template '{chosen_template}'. Available: {', '.join(TEMPLATES)}")
+
+    destination = path / chosen_name if chosen_name else path
+    _validate_destination(destination, force)
+    _copy_template(chosen_template, destination, force)
+
+    if git_init:
+        subprocess.run(["git", "init"], cwd=destination, check=False, capture_output=True)
+
+    info = Table(show_header=False)
+    info.add_row("Template", chosen_template)
+    info.add_row("Destination", str(destination.resolve()))
+    info.add_row("Git initialized", "yes" if git_init else "no")
+    console.print(Panel(info, title="Hexi New", border_style="green"))
+    console.print("Next: `cd <project> && hexi doctor && make test`")
+
+
+def demo(path: Path, name: str | None, git_init: bool, force: bool) -> None:
+    console = cli_common.console()
+    project_name = name or typer.prompt("Project name", default="hexi-demo-project").strip()
+    destination = path / project_name
+    try:
+        _validate_destination(destination, force)
+    except RuntimeError as exc:
+        cli_common.error_and_exit(str(exc))
+
+    memory, _, _ = cli_common.bootstrap_memory()
+    memory.ensure_initialized()
+    cfg = memory.load_model_config()
+    memory.apply_api_key_to_env(cfg.provider)
+    _, key_source = memory.resolve_api_key(cfg.provider)
+    ideas_ok, ideas_reason = _ideas_mode_available(cfg.provider, cfg.model, cfg.base_url, cfg.api_style, key_source)
+
+    disclaimer = Text(
+        "QUALITY DISCLAIMER: generated demo ideas depend on your configured language model. "
+        "Model capability and reliability directly affect output quality.",
+        style="blink bold black on bright_yellow",
+    )
+    console.print(Panel(disclaimer, title="⚠ DEMO MODE NOTICE ⚠", border_style="bright_yellow"))
+    console.print(
+        Panel(
+            "Note: Hexi demo code-generating features are still being implemented.",
+            title="Demo Note",
+            border_style="cyan",
+        )
+    )
+
+    mode_table = Table(title="Hexi Demo Mode", show_header=True, header_style="bold cyan")
+    mode_table.add_column("Option")
+    mode_table.add_column("Description")
+    mode_table.add_row("random", "Pick a random template + random starter prompt")
+    if ideas_ok:
+        mode_table.add_row("ideas", "Ask configured model for 3 ideas")
+    mode_table.add_row("custom", "Choose template manually and type your own prompt")
+    console.print(mode_table)
+    if not ideas_ok:
+        console.print(
+            Panel(
+                f"Ideas mode is unavailable: {ideas_reason}",
+                title="Demo Notice",
+                border_style="yellow",
+            )
+        )
+        if typer.confirm("Show connectivity debug hint now?", default=False):
+            console.print("Run: `hexi doctor --probe-model` to inspect provider/key/model connectivity.")
+    default_mode = "ideas" if ideas_ok else "random"
+    mode = typer.prompt("Mode", default=default_mode).strip().lower()
+    allowed_modes = {"random", "custom"} | ({"ideas"} if ideas_ok else set())
+    if mode not in allowed_modes:
+        cli_common.error_and_exit(f"mode must be one of: {', '.join(sorted(allowed_modes))}")
+
+    selected_template = "hexi-python-lib"
+    selected_prompt = "add one useful improvement with tests"
+
+    if mode == "random":
+        selected_template = random.choice(TEMPLATES)
+        selected_prompt = random.choice(DEMO_RANDOM_PROMPTS[selected_template])
+    elif mode == "custom":
+        selected_template = typer.prompt("Template", default="hexi-python-lib").strip()
+        if selected_template not in TEMPLATES:
+            cli_common.error_and_exit(f"unknown template '{selected_template}'")
+        selected_prompt = typer.prompt("Starter prompt", default=selected_prompt).strip()
+    else:
+        ideas: list[dict[str, str]]
+        try:
+            ideas = _generate_demo_ideas(cfg.provider, cfg.model, cfg.base_url, cfg.api_style)
+        except Exception as exc:
+            console.print(Panel(f"Idea generation failed ({exc}); using random fallback.", border_style="yellow", title="Demo"))
+            selected_template = random.choice(TEMPLATES)
+            selected_prompt = random.choice(DEMO_RANDOM_PROMPTS[selected_template])
+            ideas = []
+
+        if ideas:
+            ideas_table = Table(title="Pick an idea", show_header=True, header_style="bold magenta")
+            ideas_table.add_column("#")
+            ideas_table.add_column("Title")
+            ideas_table.add_column("Template")
+            ideas_table.add_column("Prompt")
+            for idx, idea in enumerate(ideas, start=1):
+                ideas_table.add_row(str(idx), idea["title"], idea["template"], idea["prompt"])
+            console.print(ideas_table)
+
+            choice = typer.prompt("Choose 1/2/3 or type custom", default="1").strip()
+            if choice in {"1", "2", "3"}:
+                picked = ideas[int(choice) - 1]
+                selected_template = picked["template"]
+                selected_prompt = picked["prompt"]
+            else:
+                selected_template = typer.prompt("Template", default="hexi-python-lib").strip()
+                if selected_template not in TEMPLATES:
+                    cli_common.error_and_exit(f"unknown template '{selected_template}'")
+                selected_prompt = choice
+
+    _copy_template(selected_template, destination, force)
+
+    if git_init:
+        subprocess.run(["git", "init"], cwd=destination, check=False, capture_output=True)
+
+    summary = Table(show_header=False)
+    summary.add_row("Template", selected_template)
+    summary.add_row("Prompt", selected_prompt)
+    summary.add_row("Destination", str(destination.resolve()))
+    summary.add_row("Git initialized", "yes" if git_init else "no")
+    console.print(Panel(summary, title="Hexi Demo Result", border_style="green"))
+
+    run_customization = typer.confirm("Run one Hexi customization step now?", default=True)
+    if run_customization:
+        if not git_init:
+            console.print(
+                Panel(
+                    "Customization step skipped because git is not initialized.\n"
+                    "Re-run with --git-init (default) or run `git init` in the project first.",
+                    title="Demo Customization",
+                    border_style="yellow",
+                )
+            )
+        else:
+            proc = subprocess.run(
+                ["hexi", "run", selected_prompt],
+                cwd=destination,
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode == 0:
+                console.print(
+                    Panel(
+                        "Customization step completed successfully.\n"
+                        "Your scaffold should now reflect the selected demo idea.",
+                        title="Demo Customization",
+                        border_style="green",
+                    )
+                )
+            else:
+                details = (proc.stderr or proc.stdout or "").strip()
+                snippet = details[:600] if details else "No output captured."
+                console.print(
+                    Panel(
+                        f"Customization step failed (exit={proc.returncode}).\n{snippet}",
+                        title="Demo Customization",
+                        border_style="yellow",
+                    )
+                )
+
+    console.print(
+        "Try next:\n"
+        f"  cd {destination}\n"
+        "  hexi doctor\n"
+        f"  hexi run \"{selected_prompt}\""
+    )
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import typer
+from rich.panel import Panel
+from rich.table import Table
+
+from hexi import cli_common
+from hexi.adapters.providers import available_providers
+
+
+def init() -> None:
+    console = cli_common.console()
+    memory, root, is_git_repo = cli_common.bootstrap_memory()
+    memory.ensure_initialized()
+    if not is_git_repo:
+        console.print(
+            Panel(
+                "No git repository detected. Initialized in current directory.\n"
+                "If you run `git init` later, rerun `hexi init` from your intended repo root.",
+                border_style="yellow",
+                title="Bootstrap Mode",
+            )
+        )
+    console.print(
+        Panel(
+            f"Initialized Hexi in [bold]{root / '.hexi'}[/bold]",
+            title="Setup Complete",
+            border_style="green",
+        )
+    )
+
+
+def onboard() -> None:
+    console = cli_common.console()
+    memory, root, is_git_repo = cli_common.bootstrap_memory()
+    memory.ensure_initialized()
+
+    if not is_git_repo:
+        console.print(
+            Panel(
+                "No git repository detected. Onboarding will write into current directory.",
+                border_style="yellow",
+                title="Bootstrap Mode",
+            )
+        )
+    console.print(Panel(f"Onboarding in repo: [bold]{root}[/bold]", border_style="cyan", title="Hexi Onboard"))
+    providers = Table(show_header=True, header_style="bold cyan")
+    providers.add_column("Provider")
+    providers.add_column("Notes")
+    providers.add_row("openai_compat", "OpenAI-compatible chat/completions")
+    providers.add_row("anthropic_compat", "Anthropic-compatible messages")
+    providers.add_row("openrouter_http", "OpenRouter via raw HTTP")
+    providers.add_row("openrouter_sdk", "OpenRouter via SDK")
+    console.print(providers)
+
+    provider = typer.prompt("Provider", default="openai_compat").strip()
+    if provider not in available_providers():
+        cli_common.error_and_exit(f"unsupported provider '{provider}'")
+
+    default_model = "gpt-4o-mini"
+    if provider in {"openrouter_http", "openrouter_sdk"}:
+        default_model = "openai/gpt-4o-mini"
+    elif provider == "anthropic_compat":
+        default_model = "claude-3-5-sonnet-latest"
+    model = typer.prompt("Model", default=default_model).strip()
+
+    api_style: str | None = None
+    if provider == "openrouter_http":
+        api_style = typer.prompt("OpenRouter API style (openai|anthropic)", default="openai").strip().lower()
+        if api_style not in {"openai", "anthropic"}:
+            cli_common.error_and_exit("api style must be openai or anthropic")
+
+    save_key = typer.confirm("Paste and store API key in .hexi/local.toml now?", default=True)
+    api_key: str | None = None
+    if save_key:
+        api_key = typer.prompt("API key", hide_input=True).strip()
+        if not api_key:
+            console.print("[yellow]Warning: empty key provided; skipping key storage[/yellow]")
+            api_key = None
+
+    memory.write_local_onboarding(provider=provider, model=model, api_style=api_style, api_key=api_key)
+    key_source = memory.apply_api_key_to_env(provider)
+
+    summary = Table(show_header=False)
+    summary.add_row("Provider", provider)
+    summary.add_row("Model", model)
+    if api_style:
+        summary.add_row("API style", api_style)
+    summary.add_row("Local config", str(memory.local_config_path))
+    summary.add_row("API key source", key_source or "none")
+    console.print(Panel(summary, title="Onboarding Result", border_style="green"))
+
+
+def doctor(probe_model: bool) -> None:
+    from hexi.adapters.memory_sqlite import SqliteMemory
+    from hexi.adapters.workspace_local_git import LocalGitWorkspace
+
+    console = cli_common.console()
+    memory, root, is_git_repo = cli_common.bootstrap_memory()
+    memory.ensure_initialized()
+    cfg = memory.load_model_config()
+    memory.apply_api_key_to_env(cfg.provider)
+    _, key_source = memory.resolve_api_key(cfg.provider)
+
+    providers = available_providers()
+    issues: list[str] = []
+    if key_source is None:
+        issues.append(f"Missing API key for provider '{cfg.provider}'")
+
+    checks = Table(title="Doctor checks", show_header=True, header_style="bold cyan")
+    checks.add_column("Check")
+    checks.add_column("Status")
+    checks.add_column("Details")
+    checks.add_row(
+        "Workspace",
+        "[green]PASS[/green]" if is_git_repo else "[yellow]WARN[/yellow]",
+        "Git repository detected" if is_git_repo else "No git repository yet (bootstrap mode)",
+    )
+    checks.add_row("Config", "[green]PASS[/green]", ".hexi files are present")
+    checks.add_row(
+        "Provider", "[green]PASS[/green]" if cfg.provider in providers else "[red]FAIL[/red]", cfg.provider
+    )
+    checks.add_row("API key", "[green]PASS[/green]" if key_source else "[yellow]WARN[/yellow]", key_source or "none")
+
+    probe_details = "not requested"
+    probe_status = "[cyan]SKIP[/cyan]"
+    if probe_model:
+        if key_source is None:
+            probe_status = "[yellow]WARN[/yellow]"
+            probe_details = "skipped: missing API key"
+        elif cfg.provider not in providers:
+            probe_status = "[red]FAIL[/red]"
+            probe_details = "unsupported provider"
+        else:
+            try:
+                model = cli_common.pick_model(cfg.provider)
+                probe_raw = model.plan_step(
+                    replace(cfg, structured_output=None),
+                    "You are a diagnostic assistant. Reply with one short plain sentence only.",
+                    "What model are you? equation: model_identity = provider/model_name",
+                )
+                probe_status = "[green]PASS[/green]"
+                probe_details = (probe_raw or "").strip().replace("\n", " ")[:180] or "(empty response)"
+            except Exception as exc:
+                probe_status = "[yellow]WARN[/yellow]"
+                probe_details = f"probe failed: {exc}"
+
+    checks.add_row("Model probe", probe_status, probe_details)
+
+    repo_display = str(root)
+    if is_git_repo:
+        try:
+            ws = LocalGitWorkspace(root)
+            repo_display = str(ws.repo_root())
+        except RuntimeError:
+            pass
+
+    border = "green" if not issues else "yellow"
+    title = "Doctor report"
+    info = Table(show_header=False)
+    info.add_row("Repo root", repo_display)
+    info.add_row("Provider", cfg.provider)
+    info.add_row("Model", cfg.model)
+    info.add_row("Base URL", cfg.base_url or "(default)")
+    info.add_row("API style", cfg.api_style or "(n/a)")
+    info.add_row("Config", str(memory.config_path))
+    info.add_row("Local config", str(memory.local_config_path))
+    info.add_row("Runlog", str(memory.db_path if isinstance(memory, SqliteMemory) else memory.runlog_path))
+    info.add_row("API key source", key_source or "none")
+    console.print(Panel(info, title=title, border_style=border))
+    console.print(checks)
+    console.print(f"API key source: {key_source or 'none'}")
+    if not probe_model:
+        console.print("Tip: run `hexi doctor --probe-model` for live model identity check.")
+
+    if issues:
+        for issue in issues:
+            console.print(f"[yellow][WARN][/yellow] {issue}")
+        raise typer.Exit(code=1)
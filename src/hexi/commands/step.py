@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import typer
+from rich.panel import Panel
+from rich.table import Table
+
+from hexi import cli_common
+from hexi.adapters.events_console import ConsoleEventSink
+from hexi.adapters.exec_local import LocalExec
+from hexi.adapters.worker_socket import WorkerClient, WorkerError, WorkerUnavailable, worker_socket_path
+from hexi.core.schemas import ActionPlanError, event_from_dict, parse_action_plan
+from hexi.core.service import RunStepService
+
+
+def _trace_sink_stats(service: Any) -> None:
+    bus = getattr(service, "bus", None)
+    if cli_common.GLOBAL_VERBOSE < 2 or bus is None:
+        return
+    for stats in bus.stats():
+        cli_common.trace(
+            f"sink {stats.name}: delivered={stats.delivered} dropped={stats.dropped} "
+            f"emit_ms_mean={stats.emit_ms_mean:.3f} emit_ms_max={stats.emit_ms_max:.3f} lag_ms_max={stats.lag_ms_max:.3f}",
+            level=2,
+        )
+
+
+def _model_usage_from_events(events: list[Any]) -> dict[str, Any] | None:
+    for event in events:
+        usage = event.payload.get("model") if isinstance(event.payload, dict) else None
+        if isinstance(usage, dict):
+            return usage
+    return None
+
+
+def _print_model_usage(usage: dict[str, Any]) -> None:
+    table = Table(show_header=False)
+    table.add_row("Model", f"{usage.get('provider')}/{usage.get('model')}")
+    prompt_tokens = usage.get("prompt_tokens")
+    completion_tokens = usage.get("completion_tokens")
+    table.add_row(
+        "Tokens",
+        f"prompt={prompt_tokens if prompt_tokens is not None else '?'}, "
+        f"completion={completion_tokens if completion_tokens is not None else '?'}, "
+        f"cached={usage.get('cached_tokens') if usage.get('cached_tokens') is not None else '?'}",
+    )
+    latency_ms = usage.get("latency_ms")
+    ttfb_ms = usage.get("ttfb_ms")
+    table.add_row(
+        "Latency",
+        f"total={latency_ms if latency_ms is not None else '?'} ms, ttfb={ttfb_ms if ttfb_ms is not None else '?'} ms",
+    )
+    if usage.get("queue_wait_ms") is not None:
+        table.add_row("Queue wait", f"{usage['queue_wait_ms']} ms")
+    if isinstance(completion_tokens, int) and isinstance(latency_ms, (int, float)) and latency_ms > 0:
+        table.add_row("Throughput", f"{completion_tokens / (latency_ms / 1000):.1f} completion tokens/s")
+    cli_common.console().print(Panel(table, title="Model Usage", border_style="cyan"))
+
+
+def _forward_to_worker(memory: Any, method: str, params: dict[str, Any]) -> tuple[bool, list[Any]] | None:
+    """Run the request on this repository's `hexi serve` worker; `None` when no worker is running."""
+    hexi_dir = getattr(memory, "hexi_dir", None)
+    if hexi_dir is None:
+        return None
+    path = worker_socket_path(hexi_dir)
+    if not path.exists():
+        return None
+    sink = ConsoleEventSink(verbose=cli_common.GLOBAL_VERBOSE, mode=cli_common.GLOBAL_CONSOLE_MODE)
+    events: list[Any] = []
+
+    def on_event(data: dict[str, Any]) -> None:
+        event = event_from_dict(data)
+        events.append(event)
+        sink.emit(event)
+
+    def on_queued(position: int) -> None:
+        if position:
+            cli_common.console().print(f"[dim]Queued behind {position} request(s) on the worker[/dim]")
+
+    try:
+        result = WorkerClient(path).call(method, params, on_event=on_event, on_queued=on_queued)
+    except WorkerUnavailable as exc:
+        cli_common.trace(f"{exc}; running in-process")
+        return None
+    except WorkerError as exc:
+        sink.flush()
+        cli_common.error_and_exit(f"worker: {exc}")
+    sink.flush()
+    cli_common.trace(f"Step ran on the worker at {path}")
+    return bool(result.get("success")), events
+
+
+def apply(plan: Path, task: str, no_worker: bool = False) -> None:
+    console = cli_common.console()
+    if not plan.exists():
+        cli_common.error_and_exit(f"ActionPlan file not found: {plan}")
+    raw = plan.read_text(encoding="utf-8")
+    try:
+        parsed = parse_action_plan(raw)
+    except ActionPlanError as exc:
+        console.print(
+            Panel(
+                f"Invalid ActionPlan from [bold]{plan}[/bold]\n\n{exc}",
+                title="Apply Failed",
+                border_style="red",
+            )
+        )
+        raise typer.Exit(code=1)
+
+    try:
+        ws, memory = cli_common.workspace_and_memory()
+    except RuntimeError as exc:
+        cli_common.error_and_exit(str(exc))
+
+    cli_common.trace(f"Workspace root: {ws.repo_root()}")
+    memory.ensure_initialized()
+    cli_common.trace(f"Runlog path: {memory.runlog_path}", level=2)
+    info = Table(show_header=False)
+    info.add_row("Plan file", str(plan))
+    info.add_row("Summary", parsed.summary)
+    info.add_row("Actions", str(len(parsed.actions)))
+    info.add_row("Task label", task)
+    console.print(Panel(info, title="Hexi Apply", border_style="blue"))
+
+    if not no_worker:
+        forwarded = _forward_to_worker(memory, "apply", {"task": task, "plan": raw, "source": str(plan)})
+        if forwarded is not None:
+            raise typer.Exit(code=0 if forwarded[0] else 1)
+
+    service = RunStepService(
+        model=None,
+        workspace=ws,
+        executor=LocalExec(),
+        events=ConsoleEventSink(verbose=cli_common.GLOBAL_VERBOSE, mode=cli_common.GLOBAL_CONSOLE_MODE),
+        memory=memory,
+    )
+    result = service.run_plan(task=task, plan=parsed, source=str(plan))
+    _trace_sink_stats(service)
+    raise typer.Exit(code=0 if result.success else 1)
+
+
+def run(task: str, no_worker: bool = False) -> None:
+    try:
+        ws, memory = cli_common.workspace_and_memory()
+    except RuntimeError as exc:
+        cli_common.error_and_exit(str(exc))
+    memory.ensure_initialized()
+    config = memory.load_model_config()
+    cli_common.trace(f"Workspace root: {ws.repo_root()}")
+    cli_common.trace(f"Loaded provider={config.provider}, model={config.model}")
+    cli_common.console().print(
+        Panel(
+            f"Task: [bold]{task}[/bold]\nProvider: [bold]{config.provider}[/bold]\nModel: [bold]{config.model}[/bold]",
+            title="Hexi Run",
+            border_style="blue",
+        )
+    )
+
+    if not no_worker:
+        forwarded = _forward_to_worker(memory, "run", {"task": task})
+        if forwarded is not None:
+            success, events = forwarded
+            usage = _model_usage_from_events(events)
+            if usage is not None:
+                _print_model_usage(usage)
+            raise typer.Exit(code=0 if success else 1)
+
+    memory.apply_api_key_to_env(config.provider)
+    model = cli_common.governed_model(cli_common.pick_model(config.provider), memory, config.provider)
+
+    service = RunStepService(
+        model=model,
+        workspace=ws,
+        executor=LocalExec(),
+        events=ConsoleEventSink(verbose=cli_common.GLOBAL_VERBOSE, mode=cli_common.GLOBAL_CONSOLE_MODE),
+        memory=memory,
+    )
+    result = service.run_once(task)
+    _trace_sink_stats(service)
+    usage = _model_usage_from_events(result.events)
+    if usage is not None:
+        _print_model_usage(usage)
+    raise typer.Exit(code=0 if result.success else 1)
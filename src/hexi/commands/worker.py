@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any
+
+import typer
+from rich.panel import Panel
+from rich.table import Table
+
+from hexi import cli_common
+from hexi.adapters.exec_local import LocalExec
+from hexi.adapters.worker_socket import (
+    WorkerClient,
+    WorkerError,
+    WorkerRequestError,
+    WorkerServer,
+    WorkerUnavailable,
+    clear_socket_path,
+    record_socket_path,
+    socket_path,
+    worker_socket_path,
+)
+from hexi.core.schemas import ActionPlanError, parse_action_plan
+from hexi.core.service import RunStepService
+
+
+class WarmStepHandler:
+    """Run `run`/`apply` requests against a workspace and memory opened once.
+
+    Model adapters come from the process-wide provider cache, so their pooled
+    HTTP clients stay warm; config is re-read per request (cheap: it is an
+    mtime-keyed snapshot), so edits to `.hexi/config.toml` apply without a restart.
+    The cache is keyed by the resolved API key as well, so a key changed in
+    `.hexi/local.toml` replaces the adapter that captured the old one.
+    """
+
+    def __init__(self, ws: Any, memory: Any) -> None:
+        self.ws = ws
+        self.memory = memory
+
+    def __call__(self, method: str, params: dict[str, Any], events: Any) -> dict[str, Any]:
+        task = params.get("task")
+        if not isinstance(task, str) or not task.strip():
+            raise WorkerRequestError("params.task must be a non-empty string")
+        started = time.perf_counter()
+        self.memory.ensure_initialized()
+        if method == "apply":
+            try:
+                plan = parse_action_plan(str(params.get("plan", "")))
+            except ActionPlanError as exc:
+                raise WorkerRequestError(f"invalid ActionPlan: {exc}") from None
+            service = self._service(model=None, events=events)
+            result = service.run_plan(task=task, plan=plan, source=str(params.get("source") or "hexi serve"))
+        else:
+            config = self.memory.load_model_config()
+            self.memory.apply_api_key_to_env(config.provider)
+            api_key, _source = self.memory.resolve_api_key(config.provider)
+            model = cli_common.governed_model(
+                cli_common.pick_model(config.provider, api_key), self.memory, config.provider
+            )
+            service = self._service(model=model, events=events)
+            result = service.run_once(task)
+        cli_common.trace(
+            f"{method} {task!r}: success={result.success} in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return {"success": result.success}
+
+    def _service(self, model: Any, events: Any) -> Any:
+        return RunStepService(
+            model=model,
+            workspace=self.ws,
+            executor=LocalExec(),
+            events=events,
+            memory=self.memory,
+        )
+
+
+def serve(socket_file: Path | None, max_queue: int, stop: bool, status: bool) -> None:
+    console = cli_common.console()
+    try:
+        ws, memory = cli_common.workspace_and_memory()
+    except RuntimeError as exc:
+        cli_common.error_and_exit(str(exc))
+
+    if stop or status:
+        path = socket_file or worker_socket_path(memory.hexi_dir)
+        try:
+            result = WorkerClient(path).call("shutdown" if stop else "ping")
+        except WorkerUnavailable:
+            console.print(f"No worker running on {path}")
+            raise typer.Exit(code=1)
+        if stop:
+            console.print(f"Stopping worker on {path}")
+        else:
+            info = Table(show_header=False)
+            info.add_row("Socket", str(path))
+            info.add_row("PID", str(result.get("pid")))
+            info.add_row("Queued", str(result.get("queued")))
+            info.add_row("Completed", str(result.get("completed")))
+            console.print(Panel(info, title="Hexi Worker", border_style="green"))
+        return
+
+    memory.ensure_initialized()
+    path = socket_file or socket_path(memory.hexi_dir)
+    server = WorkerServer(path, WarmStepHandler(ws, memory), max_queue=max_queue)
+    try:
+        server.bind()
+    except (WorkerError, OSError) as exc:
+        cli_common.error_and_exit(str(exc))
+    record_socket_path(memory.hexi_dir, path)
+    console.print(
+        Panel(
+            f"Serving [bold]{ws.repo_root()}[/bold] on [bold]{path}[/bold]\n"
+            "`hexi run` and `hexi apply` in this repository are forwarded here. Ctrl-C to stop.",
+            title="Hexi Serve",
+            border_style="blue",
+        )
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+    finally:
+        clear_socket_path(memory.hexi_dir, path)
+    console.print("Worker stopped.")
@@ -1,11 +1,36 @@
-from .domain import Event, ModelConfig, Policy, StepResult, Thread
-from .service import RunStepService
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from .domain import Event, ModelConfig, ModelResult, Policy, RateLimits, StepResult, Thread
+from .events import EventBus, SinkStats
+
+if TYPE_CHECKING:
+    from .service import RunStepService
+
+# The service (prompt building, policy, patching) is imported on first access, so
+# that commands which only need the domain types do not load the step machinery.
+_LAZY_EXPORTS = {"RunStepService": ".service"}
 
 __all__ = [
     "Event",
+    "EventBus",
     "ModelConfig",
+    "ModelResult",
     "Policy",
+    "RateLimits",
+    "SinkStats",
     "StepResult",
     "Thread",
     "RunStepService",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -12,6 +12,11 @@ class Event:
     one_line_summary: str
     blocking: bool
     payload: dict[str, Any]
+    # Stamped by RunStepService when the event is emitted.
+    run_id: str | None = None
+    seq: int | None = None
+    ts: float | None = None
+    mono: float | None = None
 
 
 @dataclass(frozen=True)
@@ -26,6 +31,21 @@ class ModelConfig:
     model: str
     base_url: str | None = None
     api_style: str | None = None
+    structured_output: str | None = None
+
+
+@dataclass(frozen=True)
+class ModelResult:
+    text: str
+    provider: str
+    model: str
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cached_tokens: int | None = None
+    latency_ms: float | None = None
+    ttfb_ms: float | None = None
+    provider_processing_ms: float | None = None
+    queue_wait_ms: float | None = None
 
 
 @dataclass(frozen=True)
@@ -33,6 +53,19 @@ class Policy:
     allow_commands: list[str]
     max_diff_chars: int = 4000
     max_file_read_chars: int = 4000
+    max_repo_map_chars: int = 2000
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+    max_in_flight: int | None = None
+    shared: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return any(v is not None for v in (self.requests_per_minute, self.tokens_per_minute, self.max_in_flight))
 
 
 @dataclass
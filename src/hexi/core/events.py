@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .domain import Event
+from .ports import EventSinkPort
+
+OVERFLOW_POLICIES = ("block", "drop", "sample")
+
+
+@dataclass(frozen=True)
+class SinkStats:
+    name: str
+    delivered: int
+    dropped: int
+    filtered: int
+    errors: int
+    queued: int
+    max_queued: int
+    emit_ms_total: float
+    emit_ms_max: float
+    lag_ms_max: float
+
+    @property
+    def emit_ms_mean(self) -> float:
+        return self.emit_ms_total / self.delivered if self.delivered else 0.0
+
+
+class _Subscription:
+    def __init__(
+        self,
+        sink: EventSinkPort,
+        name: str,
+        types: frozenset[str] | None,
+        max_queue: int,
+        overflow: str,
+        sample_every: int,
+    ) -> None:
+        self.sink = sink
+        self.name = name
+        self.types = types
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.sample_every = max(sample_every, 1)
+        self.refs = 1
+        self._items: deque[tuple[Event, float]] = deque()
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._overflowed = 0
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self.delivered = self.dropped = self.filtered = self.errors = self.max_queued = 0
+        self.emit_ms_total = self.emit_ms_max = self.lag_ms_max = 0.0
+
+    def offer(self, event: Event) -> None:
+        if self._closed:  # its worker is gone; nothing would ever deliver or drain it
+            self.dropped += 1
+            return
+        if self.types is not None and event.type not in self.types:
+            self.filtered += 1
+            return
+        if self.max_queue <= 0:
+            self._deliver(event, time.perf_counter())
+            return
+        with self._cond:
+            self._ensure_worker()
+            if len(self._items) >= self.max_queue:
+                if self.overflow == "drop":
+                    self.dropped += 1
+                    return
+                if self.overflow == "sample":
+                    # Keep every Nth overflowing event, evicting the oldest queued one for it.
+                    self._overflowed += 1
+                    if self._overflowed % self.sample_every:
+                        self.dropped += 1
+                        return
+                    self._items.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                else:
+                    while len(self._items) >= self.max_queue and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        self.dropped += 1
+                        return
+            self._items.append((event, time.perf_counter()))
+            self._unfinished += 1
+            self.max_queued = max(self.max_queued, len(self._items))
+            self._cond.notify_all()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"hexi-bus-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if not self._items:
+                    return
+                event, enqueued = self._items.popleft()
+                self._cond.notify_all()
+            self._deliver(event, enqueued)
+            with self._cond:
+                self._unfinished -= 1
+                self._cond.notify_all()
+
+    def _deliver(self, event: Event, enqueued: float) -> None:
+        started = time.perf_counter()
+        try:
+            self.sink.emit(event)
+        except Exception:
+            self.errors += 1
+            if self.max_queue <= 0:
+                raise
+            return
+        finally:
+            finished = time.perf_counter()
+            emit_ms = (finished - started) * 1000
+            self.emit_ms_total += emit_ms
+            self.emit_ms_max = max(self.emit_ms_max, emit_ms)
+            self.lag_ms_max = max(self.lag_ms_max, (finished - enqueued) * 1000)
+        self.delivered += 1
+
+    def drain(self) -> None:
+        with self._cond:
+            while self._unfinished > 0:
+                self._cond.wait()
+
+    def flush(self) -> None:
+        self.drain()
+        flush = getattr(self.sink, "flush", None)
+        if callable(flush):
+            flush()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> SinkStats:
+        with self._cond:
+            queued = len(self._items)
+        return SinkStats(
+            name=self.name,
+            delivered=self.delivered,
+            dropped=self.dropped,
+            filtered=self.filtered,
+            errors=self.errors,
+            queued=queued,
+            max_queued=self.max_queued,
+            emit_ms_total=round(self.emit_ms_total, 3),
+            emit_ms_max=round(self.emit_ms_max, 3),
+            lag_ms_max=round(self.lag_ms_max, 3),
+        )
+
+
+_LIVE_BUSES: "weakref.WeakSet[EventBus]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_buses() -> None:
+    for bus in list(_LIVE_BUSES):
+        bus.close()
+
+
+class EventBus:
+    """Fan events out to several sinks.
+
+    Each subscription can filter by event type and choose its delivery mode:
+    `max_queue=0` delivers inline on the emitting thread; otherwise a bounded queue
+    and a worker thread decouple the sink, with an overflow policy for a full queue:
+    `block` (backpressure), `drop` (discard the new event) or `sample` (keep every
+    `sample_every`-th overflowing event, evicting the oldest queued one). Inline
+    sink errors propagate; queued sink errors are counted. `flush` drains every
+    queue and calls the sinks' own `flush` when they have one. A sink (by
+    equality) is subscribed at most once: subscribing it again adds a reference,
+    and it stays until every reference is unsubscribed. After `close`, `emit`
+    raises and `flush` does nothing.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: list[_Subscription] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        _LIVE_BUSES.add(self)
+
+    def subscribe(
+        self,
+        sink: EventSinkPort,
+        name: str | None = None,
+        types: Iterable[str] | None = None,
+        max_queue: int = 0,
+        overflow: str = "block",
+        sample_every: int = 10,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of: {', '.join(OVERFLOW_POLICIES)}")
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("event bus is closed")
+            for subscription in self._subscriptions:
+                if subscription.sink == sink:
+                    subscription.refs += 1
+                    return
+            self._subscriptions = [
+                *self._subscriptions,
+                _Subscription(
+                    sink=sink,
+                    name=name or type(sink).__name__,
+                    types=frozenset(types) if types is not None else None,
+                    max_queue=max_queue,
+                    overflow=overflow,
+                    sample_every=sample_every,
+                ),
+            ]
+
+    def unsubscribe(self, sink: EventSinkPort) -> None:
+        """Drop one reference to `sink`; the last one delivers what is queued and detaches it."""
+        with self._lock:
+            subscription = next((s for s in self._subscriptions if s.sink == sink), None)
+            if subscription is None:
+                return
+            subscription.refs -= 1
+            if subscription.refs > 0:
+                return
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+        subscription.close()
+
+    def emit(self, event: Event) -> None:
+        if self._closed:
+            raise RuntimeError("event bus is closed")
+        for subscription in self._subscriptions:
+            subscription.offer(event)
+
+    def flush(self) -> None:
+        if self._closed:
+            return
+        for subscription in self._subscriptions:
+            subscription.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            subscriptions = self._subscriptions
+        for subscription in subscriptions:
+            subscription.close()
+        _LIVE_BUSES.discard(self)
+
+    def stats(self) -> list[SinkStats]:
+        return [subscription.stats() for subscription in self._subscriptions]
+
+
+class RunlogSink:
+    """Adapts `MemoryPort.append_runlog` (and an optional `flush_runlog`) to a bus sink."""
+
+    def __init__(self, memory: Any) -> None:
+        self.memory = memory
+
+    def __eq__(self, other: object) -> bool:
+        # One runlog subscription per memory, however many services share a bus.
+        return isinstance(other, RunlogSink) and other.memory is self.memory
+
+    def __hash__(self) -> int:
+        return id(self.memory)
+
+    def emit(self, event: Event) -> None:
+        self.memory.append_runlog(event)
+
+    def flush(self) -> None:
+        flush_runlog = getattr(self.memory, "flush_runlog", None)
+        if callable(flush_runlog):
+            flush_runlog()
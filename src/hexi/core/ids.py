@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+# Crockford base32, as used by ULID.
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_MAX = (1 << 80) - 1
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class RunIdGenerator:
+    """Monotonic ULID generator: 48-bit millisecond time + 80 random bits.
+
+    IDs sort lexicographically by creation time. Within one millisecond (or if the
+    clock steps backwards) the random part is incremented instead, so IDs from one
+    generator are strictly increasing.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self, now_ms: int | None = None) -> str:
+        ms = int(time.time() * 1000) if now_ms is None else now_ms
+        with self._lock:
+            if ms <= self._last_ms:
+                ms = self._last_ms
+                random_part = self._last_random + 1
+                if random_part > _RANDOM_MAX:
+                    ms += 1
+                    random_part = int.from_bytes(os.urandom(10), "big")
+            else:
+                random_part = int.from_bytes(os.urandom(10), "big")
+            self._last_ms, self._last_random = ms, random_part
+        return _encode(ms, 10) + _encode(random_part, 16)
+
+
+_DEFAULT_GENERATOR = RunIdGenerator()
+
+
+def new_run_id() -> str:
+    """Return a new 26-character ULID run id from the process-wide generator."""
+    return _DEFAULT_GENERATOR.new()
+
+
+def run_id_time_ms(run_id: str) -> int:
+    """Millisecond Unix time encoded in a ULID run id."""
+    value = 0
+    for char in run_id[:10].upper():
+        index = _ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"invalid run id: {run_id!r}")
+        value = (value << 5) | index
+    return value
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_NO_EOL = "\\"
+
+
+class PatchError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Hunk:
+    old_start: int
+    new_start: int
+    # (tag, text) with tag " " (context), "-" (removed) or "+" (added).
+    lines: tuple[tuple[str, str], ...]
+    new_no_eol: bool = False
+
+    @property
+    def header(self) -> str:
+        old_len = sum(1 for tag, _ in self.lines if tag != "+")
+        new_len = sum(1 for tag, _ in self.lines if tag != "-")
+        return f"@@ -{self.old_start},{old_len} +{self.new_start},{new_len} @@"
+
+
+@dataclass(frozen=True)
+class FilePatch:
+    """Changes to one file: unified-diff hunks or (search, replace) edits."""
+
+    path: str
+    hunks: tuple[Hunk, ...] = ()
+    edits: tuple[tuple[str, str], ...] = ()
+    create: bool = False
+
+    def line_counts(self) -> tuple[int, int]:
+        """(added, removed) line counts."""
+        if self.hunks:
+            added = sum(1 for hunk in self.hunks for tag, _ in hunk.lines if tag == "+")
+            removed = sum(1 for hunk in self.hunks for tag, _ in hunk.lines if tag == "-")
+            return added, removed
+        return (
+            sum(len(replace.splitlines()) for _, replace in self.edits),
+            sum(len(search.splitlines()) for search, _ in self.edits),
+        )
+
+
+def _diff_path(header: str, prefix: str) -> str | None:
+    name = header[4:].split("\t", 1)[0].strip()
+    if name == "/dev/null":
+        return None
+    if name.startswith(prefix):
+        name = name[len(prefix) :]
+    return name
+
+
+def parse_unified_diff(diff: str) -> list[FilePatch]:
+    """Parse a (possibly multi-file) unified diff.
+
+    Hunk bodies run until the next hunk or file header; the line counts in `@@`
+    headers are not trusted (model-written diffs often get them wrong), only the
+    start line, which is used as a position hint. A blank line inside a hunk is
+    read as an empty context line.
+    """
+    lines = diff.splitlines()
+    patches: list[FilePatch] = []
+    path: str | None = None
+    create = False
+    hunks: list[Hunk] = []
+    current: list[tuple[str, str]] | None = None
+    starts = (0, 0)
+    new_no_eol = False
+
+    def close_hunk() -> None:
+        nonlocal current, new_no_eol
+        if current is not None:
+            if not any(tag != " " for tag, _ in current):
+                raise PatchError(f"{path}: hunk {len(hunks) + 1} has no changes")
+            hunks.append(Hunk(old_start=starts[0], new_start=starts[1], lines=tuple(current), new_no_eol=new_no_eol))
+        current = None
+        new_no_eol = False
+
+    def close_file() -> None:
+        close_hunk()
+        if path is not None:
+            if not hunks:
+                raise PatchError(f"{path}: diff has no hunks")
+            patches.append(FilePatch(path=path, hunks=tuple(hunks), create=create))
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            close_file()
+            old, new = _diff_path(line, "a/"), _diff_path(lines[i + 1], "b/")
+            if new is None:
+                raise PatchError(f"{old}: deleting files is not supported by patch")
+            path, create, hunks = new, old is None, []
+            i += 2
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match:
+            if path is None:
+                raise PatchError("hunk before any '--- a/<path>' / '+++ b/<path>' file header")
+            close_hunk()
+            starts = (int(match.group(1)), int(match.group(3)))
+            current = []
+        elif current is not None:
+            if line.startswith(_NO_EOL):
+                if current and current[-1][0] != "-":
+                    new_no_eol = True
+            elif line == "":
+                current.append((" ", ""))
+            elif line[0] in " +-":
+                current.append((line[0], line[1:]))
+            else:
+                close_hunk()  # e.g. `diff --git` / `index` lines of the next file
+        i += 1
+    close_file()
+    if not patches:
+        raise PatchError("diff contains no file changes")
+    return patches
+
+
+def _find_block(lines: list[str], block: list[str], expected: int, lower: int) -> int | None:
+    """Index of `block` in `lines` at or after `lower`, nearest to `expected`.
+
+    Exact matches win; otherwise trailing whitespace is ignored.
+    """
+    size = len(block)
+    last = len(lines) - size
+    if last < lower:
+        return None
+    expected = min(max(expected, lower), last)
+    order = [expected]
+    for distance in range(1, max(expected - lower, last - expected) + 1):
+        order.extend(pos for pos in (expected - distance, expected + distance) if lower <= pos <= last)
+    for pos in order:
+        if lines[pos : pos + size] == block:
+            return pos
+    stripped, wanted = [text.rstrip() for text in lines], [text.rstrip() for text in block]
+    for pos in order:
+        if stripped[pos : pos + size] == wanted:
+            return pos
+    return None
+
+
+def _mismatch(path: str, index: int, hunk: Hunk, lines: list[str], block: list[str], expected: int) -> PatchError:
+    start = min(max(expected, 0), len(lines))
+    for offset, want in enumerate(block):
+        at = start + offset
+        actual = lines[at] if at < len(lines) else None
+        if actual != want:
+            found = "end of file" if actual is None else repr(actual)
+            return PatchError(
+                f"{path}: hunk {index} ({hunk.header}) does not apply: "
+                f"line {at + 1} is {found}, expected {want!r}"
+            )
+    return PatchError(f"{path}: hunk {index} ({hunk.header}) does not apply")
+
+
+def _apply_hunks(path: str, original: str, hunks: tuple[Hunk, ...]) -> str:
+    newline = "\r\n" if "\r\n" in original.split("\n", 1)[0] + "\n" else "\n"
+    lines = original.splitlines()
+    final_newline = original.endswith(("\n", "\r"))
+    offset = 0
+    lower = 0
+    for index, hunk in enumerate(hunks, start=1):
+        old = [text for tag, text in hunk.lines if tag != "+"]
+        new = [text for tag, text in hunk.lines if tag != "-"]
+        expected = max(hunk.old_start - 1, 0) + offset if old else hunk.old_start + offset
+        pos = _find_block(lines, old, expected, lower)
+        if pos is None:
+            raise _mismatch(path, index, hunk, lines, old, expected)
+        reaches_end = pos + len(old) == len(lines)
+        lines[pos : pos + len(old)] = new
+        offset += len(new) - len(old)
+        lower = pos + len(new)
+        if reaches_end:
+            final_newline = not hunk.new_no_eol
+    if not lines:
+        return ""
+    return newline.join(lines) + (newline if final_newline else "")
+
+
+def _apply_edits(path: str, original: str, edits: tuple[tuple[str, str], ...]) -> str:
+    text = original
+    for index, (search, replace) in enumerate(edits, start=1):
+        count = text.count(search)
+        if count != 1:
+            first = search.strip().splitlines()[0][:80] if search.strip() else search
+            if count == 0:
+                raise PatchError(f"{path}: edit {index} search text not found (starting {first!r})")
+            raise PatchError(f"{path}: edit {index} search text matches {count} times; add surrounding lines")
+        text = text.replace(search, replace, 1)
+    return text
+
+
+def apply_file_patch(original: str | None, patch: FilePatch) -> str:
+    """New content of `patch.path` given its current content (`None` if missing)."""
+    if original is None and not patch.create:
+        raise PatchError(f"{patch.path}: file does not exist (use write to create files)")
+    if original is not None and patch.create:
+        raise PatchError(f"{patch.path}: diff creates the file but it already exists")
+    if patch.edits:
+        return _apply_edits(patch.path, original or "", patch.edits)
+    return _apply_hunks(patch.path, original or "", patch.hunks)
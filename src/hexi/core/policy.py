@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import shlex
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
 from .domain import Policy
 
 DISALLOWED_BASE_COMMANDS = {
@@ -18,13 +23,79 @@ DISALLOWED_BASE_COMMANDS = {
     "scp",
     "rsync",
 }
+_RULE = object()  # trie key marking the end of an allowlist entry
+_DECISION_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class PolicyDecision:
+    allowed: bool
+    rule: str | None
+    reason: str
+
+
+class CompiledPolicy:
+    """An allowlist compiled into a token-prefix trie.
+
+    A command is split with `shlex` (the same tokens `LocalExec` executes) and
+    allowed when an allowlist entry is a token prefix of it; the longest such
+    entry is reported as the matching rule. Decisions are memoized per command
+    string, so checking a command in the service and again in the executor costs
+    one parse.
+    """
+
+    def __init__(self, allow_commands: tuple[str, ...]) -> None:
+        self.allow_commands = allow_commands
+        self._trie: dict[Any, Any] = {}
+        for entry in allow_commands:
+            # Entries are tokenized like commands, so quoted arguments match; an
+            # entry shlex cannot parse (e.g. an unbalanced quote) falls back to
+            # whitespace splitting.
+            try:
+                tokens = shlex.split(entry)
+            except ValueError:
+                tokens = entry.split()
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_RULE, " ".join(entry.split()))
+        self.decide = lru_cache(maxsize=_DECISION_CACHE_SIZE)(self._decide)
+
+    def allows(self, command: str) -> bool:
+        return self.decide(command).allowed
+
+    def _decide(self, command: str) -> PolicyDecision:
+        try:
+            tokens = shlex.split(command)
+        except ValueError as exc:
+            return PolicyDecision(False, None, f"command cannot be parsed: {exc}")
+        if not tokens:
+            return PolicyDecision(False, None, "empty command")
+        if tokens[0].lower() in DISALLOWED_BASE_COMMANDS:
+            return PolicyDecision(False, None, f"'{tokens[0]}' is never allowed")
+        node = self._trie
+        rule: str | None = None
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                break
+            rule = node.get(_RULE, rule)
+        if rule is None:
+            return PolicyDecision(False, None, "no allowlist entry matches")
+        return PolicyDecision(True, rule, f"allowlisted by '{rule}'")
+
+
+@lru_cache(maxsize=32)
+def _compile(allow_commands: tuple[str, ...]) -> CompiledPolicy:
+    return CompiledPolicy(allow_commands)
+
+
+def compile_policy(policy: Policy) -> CompiledPolicy:
+    """The compiled form of `policy`, shared by every caller with the same allowlist."""
+    return _compile(tuple(policy.allow_commands))
 
 
 def command_allowed(command: str, policy: Policy) -> bool:
-    normalized = " ".join(command.strip().split())
-    if not normalized:
-        return False
-    base = normalized.split(" ", 1)[0].lower()
-    if base in DISALLOWED_BASE_COMMANDS:
-        return False
-    return any(normalized == allowed or normalized.startswith(f"{allowed} ") for allowed in policy.allow_commands)
+    return compile_policy(policy).allows(command)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Protocol
+from typing import Protocol, runtime_checkable
 
-from .domain import Event, ModelConfig, Policy
+from .domain import Event, ModelConfig, ModelResult, Policy
+from .patches import FilePatch
 
 
 class ModelPort(Protocol):
@@ -11,6 +12,23 @@ class ModelPort(Protocol):
         """Return raw model output text that should contain ActionPlan JSON."""
 
 
+class ModelResultPort(ModelPort, Protocol):
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        """Return model output text together with token usage and timing."""
+
+
+@runtime_checkable
+class AsyncModelPort(Protocol):
+    async def aplan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+        """Async variant of `ModelPort.plan_step`; detect with `isinstance(model, AsyncModelPort)`."""
+
+
+@runtime_checkable
+class AsyncModelResultPort(AsyncModelPort, Protocol):
+    async def aplan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        ...
+
+
 class WorkspacePort(Protocol):
     def repo_root(self) -> Path:
         ...
@@ -41,6 +59,34 @@ class WorkspacePort(Protocol):
         ...
 
 
+class LineReadWorkspacePort(WorkspacePort, Protocol):
+    def read_lines(self, path: str, start_line: int, end_line: int | None, max_chars: int) -> dict[str, object]:
+        """Lines `start_line..end_line` (1-based, inclusive) capped at `max_chars`.
+
+        Returns `path`, `start_line`, `end_line` (last line returned) and `content`,
+        plus `next_line` when the range was cut short by `max_chars`.
+        """
+
+
+class SymbolWorkspacePort(WorkspacePort, Protocol):
+    def find_symbols(self, query: str, path: str | None, limit: int) -> list[dict[str, object]]:
+        """Definitions whose name or qualname starts with `query`, exact matches first.
+
+        Each match has `name`, `qualname`, `kind` (class/function/method), `path`,
+        `line` and `end_line`.
+        """
+
+
+class RepoMapWorkspacePort(WorkspacePort, Protocol):
+    def repo_map(self, max_chars: int) -> str:
+        """A summary of the repository's layout and key symbols in at most `max_chars` characters."""
+
+
+class PatchableWorkspacePort(WorkspacePort, Protocol):
+    def apply_patch(self, patches: list[FilePatch]) -> list[dict[str, object]]:
+        """Apply every patch or none; return per-file `path`/`added`/`removed`/`bytes`/`created`."""
+
+
 class ExecPort(Protocol):
     def run(self, command: str, policy: Policy) -> tuple[int, str, str]:
         ...
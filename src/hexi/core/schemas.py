@@ -1,27 +1,88 @@
 from __future__ import annotations
 
+import copy
 import json
 from dataclasses import dataclass
+from functools import lru_cache
+from importlib.resources import files
 from typing import Any, Literal
 
 from .domain import Event
 
-ActionKind = Literal["read", "write", "run", "emit", "list", "search"]
+ActionKind = Literal["read", "write", "patch", "run", "emit", "list", "search", "symbols"]
+
+
+STRUCTURED_OUTPUT_MODES = ("json_object", "json_schema", "tools")
+ACTION_PLAN_TOOL_NAME = "emit_action_plan"
+
+# Keywords OpenAI strict structured outputs reject; parse_action_plan enforces them instead.
+_STRICT_UNSUPPORTED = ("$schema", "minLength", "maxLength", "minimum", "maximum", "minItems", "maxItems", "allOf")
 
 
 class ActionPlanError(ValueError):
     pass
 
 
+@lru_cache(maxsize=1)
+def load_action_plan_schema() -> dict[str, Any]:
+    """Return the packaged copy of docs/contracts/action_plan.schema.json."""
+    raw = files("hexi").joinpath("contracts").joinpath("action_plan.schema.json").read_text(encoding="utf-8")
+    return json.loads(raw)
+
+
+def _strip_unsupported(node: Any) -> Any:
+    if isinstance(node, dict):
+        return {k: _strip_unsupported(v) for k, v in node.items() if k not in _STRICT_UNSUPPORTED}
+    if isinstance(node, list):
+        return [_strip_unsupported(v) for v in node]
+    return node
+
+
+def _nullable(prop: dict[str, Any]) -> dict[str, Any]:
+    out = dict(prop)
+    out["type"] = [prop["type"], "null"]
+    if "enum" in out:
+        out["enum"] = [*out["enum"], None]
+    return out
+
+
+@lru_cache(maxsize=1)
+def strict_action_plan_schema() -> dict[str, Any]:
+    """Derive a strict-mode (OpenAI `json_schema` / strict tools) variant of the contract.
+
+    Strict mode requires every property to be listed in `required` and forbids
+    free-form objects, so optional action fields become nullable and the free-form
+    `emit.payload` is dropped. Per-kind requirements and bounds stay enforced by
+    `parse_action_plan`.
+    """
+    schema = _strip_unsupported(copy.deepcopy(load_action_plan_schema()))
+    item = schema["properties"]["actions"]["items"]
+    required = set(item.get("required", []))
+    props: dict[str, Any] = {}
+    for name, prop in item["properties"].items():
+        if prop.get("type") == "object" and prop.get("additionalProperties", True) is not False:
+            continue
+        props[name] = prop if name in required else _nullable(prop)
+    item["properties"] = props
+    item["required"] = list(props)
+    item["additionalProperties"] = False
+    return schema
+
+
 @dataclass(frozen=True)
 class Action:
     kind: ActionKind
     path: str | None = None
+    paths: list[str] | None = None
     content: str | None = None
+    diff: str | None = None
+    edits: list[dict[str, str]] | None = None
     command: str | None = None
     query: str | None = None
     glob: str | None = None
     limit: int | None = None
+    start_line: int | None = None
+    end_line: int | None = None
     event_type: str | None = None
     message: str | None = None
     blocking: bool | None = None
@@ -35,115 +96,247 @@ class ActionPlan:
 
 
 def event_to_dict(event: Event) -> dict[str, Any]:
-    return {
+    data: dict[str, Any] = {
         "type": event.type,
         "one_line_summary": event.one_line_summary,
         "blocking": event.blocking,
         "payload": event.payload,
     }
+    for key in ("run_id", "seq", "ts", "mono"):
+        value = getattr(event, key)
+        if value is not None:
+            data[key] = value
+    return data
+
+
+def event_from_dict(data: dict[str, Any]) -> Event:
+    """Rebuild an `Event` from a runlog record (the inverse of `event_to_dict`)."""
+    payload = data.get("payload")
+    return Event(
+        type=str(data.get("type", "progress")),
+        one_line_summary=str(data.get("one_line_summary", "")),
+        blocking=bool(data.get("blocking", False)),
+        payload=payload if isinstance(payload, dict) else {},
+        run_id=data.get("run_id"),
+        seq=data.get("seq"),
+        ts=data.get("ts"),
+        mono=data.get("mono"),
+    )
+
+
+try:
+    import orjson as _orjson
+except ImportError:  # optional: `pip install orjson` for faster plan decoding
+    _orjson = None
+
+
+def _loads(raw: str | bytes) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw)
+
+
+@dataclass(frozen=True)
+class _PlanRules:
+    summary_max: int
+    actions_min: int
+    actions_max: int
+    action_keys: frozenset[str]
+    kinds: frozenset[str]
+    event_types: frozenset[str]
+    limit_min: int
+    limit_max: int
+    edits_max: int
+    paths_max: int
+
+
+@lru_cache(maxsize=1)
+def _plan_rules() -> _PlanRules:
+    """Bounds and enums read once from the ActionPlan contract schema."""
+    schema = load_action_plan_schema()
+    actions = schema["properties"]["actions"]
+    props = actions["items"]["properties"]
+    return _PlanRules(
+        summary_max=schema["properties"]["summary"]["maxLength"],
+        actions_min=actions["minItems"],
+        actions_max=actions["maxItems"],
+        action_keys=frozenset(props),
+        kinds=frozenset(props["kind"]["enum"]),
+        event_types=frozenset(props["event_type"]["enum"]),
+        limit_min=props["limit"]["minimum"],
+        limit_max=props["limit"]["maximum"],
+        edits_max=props["edits"]["maxItems"],
+        paths_max=props["paths"]["maxItems"],
+    )
+
+
+def _optional_text(item: dict[str, Any], key: str) -> bool:
+    value = item.get(key)
+    return value is None or (isinstance(value, str) and bool(value.strip()))
 
 
-def parse_action_plan(raw: str) -> ActionPlan:
+def _check_limit(item: dict[str, Any], idx: int, kind: str, rules: _PlanRules) -> None:
+    limit = item.get("limit")
+    if limit is None:
+        return
+    if not isinstance(limit, int) or limit < rules.limit_min or limit > rules.limit_max:
+        raise ActionPlanError(f"actions[{idx}] {kind} limit must be integer in {rules.limit_min}..{rules.limit_max}")
+
+
+def _check_read(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    path, paths = item.get("path"), item.get("paths")
+    if paths is None:
+        if not isinstance(path, str) or not path:
+            raise ActionPlanError(f"actions[{idx}] read requires path or paths")
+    elif path is not None:
+        raise ActionPlanError(f"actions[{idx}] read takes path or paths, not both")
+    elif (
+        not isinstance(paths, list)
+        or not (1 <= len(paths) <= rules.paths_max)
+        or not all(isinstance(p, str) and p for p in paths)
+    ):
+        raise ActionPlanError(f"actions[{idx}] read paths must be an array of 1..{rules.paths_max} non-empty strings")
+    start, end = item.get("start_line"), item.get("end_line")
+    for key, value in (("start_line", start), ("end_line", end)):
+        if value is not None and (not isinstance(value, int) or value < 1):
+            raise ActionPlanError(f"actions[{idx}] read {key} must be integer >= 1")
+    if start is not None and end is not None and end < start:
+        raise ActionPlanError(f"actions[{idx}] read end_line must be >= start_line")
+
+
+def _check_write(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    path = item.get("path")
+    if not isinstance(path, str) or not path:
+        raise ActionPlanError(f"actions[{idx}] write requires path")
+    if not isinstance(item.get("content"), str):
+        raise ActionPlanError(f"actions[{idx}] write requires content")
+
+
+def _check_patch(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    diff, edits = item.get("diff"), item.get("edits")
+    if (diff is None) == (edits is None):
+        raise ActionPlanError(f"actions[{idx}] patch requires exactly one of diff or edits")
+    if diff is not None:
+        if not isinstance(diff, str) or not diff.strip():
+            raise ActionPlanError(f"actions[{idx}] patch diff must be non-empty string")
+        if item.get("path") is not None:
+            raise ActionPlanError(f"actions[{idx}] patch diff takes paths from its file headers, not path")
+        return
+    path = item.get("path")
+    if not isinstance(path, str) or not path:
+        raise ActionPlanError(f"actions[{idx}] patch edits require path")
+    if not isinstance(edits, list) or not (1 <= len(edits) <= rules.edits_max):
+        raise ActionPlanError(f"actions[{idx}] patch edits must be an array with 1..{rules.edits_max} items")
+    for edit in edits:
+        if (
+            not isinstance(edit, dict)
+            or edit.keys() != {"search", "replace"}
+            or not isinstance(edit["search"], str)
+            or not edit["search"]
+            or not isinstance(edit["replace"], str)
+        ):
+            raise ActionPlanError(
+                f"actions[{idx}] patch edits must be objects with non-empty search and string replace"
+            )
+
+
+def _check_run(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    command = item.get("command")
+    if not isinstance(command, str) or not command.strip():
+        raise ActionPlanError(f"actions[{idx}] run requires command")
+
+
+def _check_list(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    if not _optional_text(item, "path"):
+        raise ActionPlanError(f"actions[{idx}] list path must be non-empty string")
+    if not _optional_text(item, "glob"):
+        raise ActionPlanError(f"actions[{idx}] list glob must be non-empty string")
+    _check_limit(item, idx, "list", rules)
+
+
+def _check_search(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    query = item.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ActionPlanError(f"actions[{idx}] search requires query")
+    if not _optional_text(item, "path"):
+        raise ActionPlanError(f"actions[{idx}] search path must be non-empty string")
+    if not _optional_text(item, "glob"):
+        raise ActionPlanError(f"actions[{idx}] search glob must be non-empty string")
+    _check_limit(item, idx, "search", rules)
+
+
+def _check_symbols(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    query = item.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ActionPlanError(f"actions[{idx}] symbols requires query")
+    if not _optional_text(item, "path"):
+        raise ActionPlanError(f"actions[{idx}] symbols path must be non-empty string")
+    _check_limit(item, idx, "symbols", rules)
+
+
+def _check_emit(item: dict[str, Any], idx: int, rules: _PlanRules) -> None:
+    if item.get("event_type") not in rules.event_types:
+        raise ActionPlanError(f"actions[{idx}] emit requires valid event_type")
+    message = item.get("message")
+    if not isinstance(message, str) or not message.strip():
+        raise ActionPlanError(f"actions[{idx}] emit requires message")
+    if not isinstance(item.get("blocking"), bool):
+        raise ActionPlanError(f"actions[{idx}] emit requires blocking boolean")
+    payload = item.get("payload")
+    if payload is not None and not isinstance(payload, dict):
+        raise ActionPlanError(f"actions[{idx}] emit payload must be object")
+
+
+_TOP_LEVEL_KEYS = frozenset({"summary", "actions"})
+_KIND_CHECKS = {
+    "read": _check_read,
+    "write": _check_write,
+    "patch": _check_patch,
+    "run": _check_run,
+    "list": _check_list,
+    "search": _check_search,
+    "symbols": _check_symbols,
+    "emit": _check_emit,
+}
+
+
+def parse_action_plan(raw: str | bytes) -> ActionPlan:
+    """Decode and validate an ActionPlan in one pass over its actions.
+
+    Uses orjson when installed. Each decoded action dict is checked in place and
+    its values are handed straight to `Action` (large `content` strings are never
+    copied). Bounds and enums come from the contract schema.
+    """
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as exc:
+        data = _loads(raw)
+    except ValueError as exc:
         raise ActionPlanError(f"invalid JSON: {exc}") from exc
 
     if not isinstance(data, dict):
         raise ActionPlanError("top-level must be an object")
+    if not data.keys() <= _TOP_LEVEL_KEYS:
+        raise ActionPlanError(f"unexpected top-level keys: {sorted(set(data) - _TOP_LEVEL_KEYS)}")
 
-    allowed_top = {"summary", "actions"}
-    extra_top = set(data.keys()) - allowed_top
-    if extra_top:
-        raise ActionPlanError(f"unexpected top-level keys: {sorted(extra_top)}")
-
+    rules = _plan_rules()
     summary = data.get("summary")
-    if not isinstance(summary, str) or not summary.strip() or len(summary) > 400:
-        raise ActionPlanError("summary must be non-empty string up to 400 chars")
+    if not isinstance(summary, str) or not summary.strip() or len(summary) > rules.summary_max:
+        raise ActionPlanError(f"summary must be non-empty string up to {rules.summary_max} chars")
 
     actions_raw = data.get("actions")
-    if not isinstance(actions_raw, list) or not (1 <= len(actions_raw) <= 20):
-        raise ActionPlanError("actions must be an array with 1..20 items")
+    if not isinstance(actions_raw, list) or not (rules.actions_min <= len(actions_raw) <= rules.actions_max):
+        raise ActionPlanError(f"actions must be an array with {rules.actions_min}..{rules.actions_max} items")
 
     actions: list[Action] = []
-    allowed_action_keys = {
-        "kind",
-        "path",
-        "content",
-        "command",
-        "query",
-        "glob",
-        "limit",
-        "event_type",
-        "message",
-        "blocking",
-        "payload",
-    }
-    valid_event_types = {"progress", "question", "review", "artifact", "error", "done"}
-
     for idx, item in enumerate(actions_raw):
         if not isinstance(item, dict):
             raise ActionPlanError(f"actions[{idx}] must be object")
-        extra = set(item.keys()) - allowed_action_keys
-        if extra:
-            raise ActionPlanError(f"actions[{idx}] unexpected keys: {sorted(extra)}")
+        if not item.keys() <= rules.action_keys:
+            raise ActionPlanError(f"actions[{idx}] unexpected keys: {sorted(set(item) - rules.action_keys)}")
         kind = item.get("kind")
-        if kind not in {"read", "write", "run", "emit", "list", "search"}:
+        check = _KIND_CHECKS.get(kind) if kind in rules.kinds else None
+        if check is None:
             raise ActionPlanError(f"actions[{idx}] invalid kind")
-
-        action = Action(
-            kind=kind,
-            path=item.get("path"),
-            content=item.get("content"),
-            command=item.get("command"),
-            query=item.get("query"),
-            glob=item.get("glob"),
-            limit=item.get("limit"),
-            event_type=item.get("event_type"),
-            message=item.get("message"),
-            blocking=item.get("blocking"),
-            payload=item.get("payload"),
-        )
-
-        if kind == "read":
-            if not isinstance(action.path, str) or not action.path:
-                raise ActionPlanError(f"actions[{idx}] read requires path")
-        elif kind == "write":
-            if not isinstance(action.path, str) or not action.path:
-                raise ActionPlanError(f"actions[{idx}] write requires path")
-            if not isinstance(action.content, str):
-                raise ActionPlanError(f"actions[{idx}] write requires content")
-        elif kind == "run":
-            if not isinstance(action.command, str) or not action.command.strip():
-                raise ActionPlanError(f"actions[{idx}] run requires command")
-        elif kind == "list":
-            if action.path is not None and (not isinstance(action.path, str) or not action.path.strip()):
-                raise ActionPlanError(f"actions[{idx}] list path must be non-empty string")
-            if action.glob is not None and (not isinstance(action.glob, str) or not action.glob.strip()):
-                raise ActionPlanError(f"actions[{idx}] list glob must be non-empty string")
-            if action.limit is not None:
-                if not isinstance(action.limit, int) or action.limit < 1 or action.limit > 500:
-                    raise ActionPlanError(f"actions[{idx}] list limit must be integer in 1..500")
-        elif kind == "search":
-            if not isinstance(action.query, str) or not action.query.strip():
-                raise ActionPlanError(f"actions[{idx}] search requires query")
-            if action.path is not None and (not isinstance(action.path, str) or not action.path.strip()):
-                raise ActionPlanError(f"actions[{idx}] search path must be non-empty string")
-            if action.glob is not None and (not isinstance(action.glob, str) or not action.glob.strip()):
-                raise ActionPlanError(f"actions[{idx}] search glob must be non-empty string")
-            if action.limit is not None:
-                if not isinstance(action.limit, int) or action.limit < 1 or action.limit > 500:
-                    raise ActionPlanError(f"actions[{idx}] search limit must be integer in 1..500")
-        elif kind == "emit":
-            if action.event_type not in valid_event_types:
-                raise ActionPlanError(f"actions[{idx}] emit requires valid event_type")
-            if not isinstance(action.message, str) or not action.message.strip():
-                raise ActionPlanError(f"actions[{idx}] emit requires message")
-            if not isinstance(action.blocking, bool):
-                raise ActionPlanError(f"actions[{idx}] emit requires blocking boolean")
-            if action.payload is not None and not isinstance(action.payload, dict):
-                raise ActionPlanError(f"actions[{idx}] emit payload must be object")
-
-        actions.append(action)
+        check(item, idx, rules)
+        actions.append(Action(**item))
 
     return ActionPlan(summary=summary.strip(), actions=actions)
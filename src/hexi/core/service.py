@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from .domain import Event, StepResult, Thread
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any
+
+from .domain import Event, ModelConfig, ModelResult, Policy, StepResult, Thread
+from .events import EventBus, RunlogSink
+from .ids import new_run_id
+from .patches import FilePatch, parse_unified_diff
 from .ports import EventSinkPort, ExecPort, MemoryPort, ModelPort, WorkspacePort
-from .policy import command_allowed
+from .policy import compile_policy
 from .schemas import ActionPlan, parse_action_plan
 
 SYSTEM_PROMPT = """You are Hexi. Return only JSON matching this contract:
@@ -10,9 +17,14 @@ SYSTEM_PROMPT = """You are Hexi. Return only JSON matching this contract:
   \"summary\": string,
   \"actions\": [
     {\"kind\":\"read\",\"path\":\"...\"} |
+    {\"kind\":\"read\",\"path\":\"...\",\"start_line\":120,\"end_line\":180} |
+    {\"kind\":\"read\",\"paths\":[\"...\",\"...\"]} |
     {\"kind\":\"write\",\"path\":\"...\",\"content\":\"...\"} |
+    {\"kind\":\"patch\",\"path\":\"...\",\"edits\":[{\"search\":\"...\",\"replace\":\"...\"}]} |
+    {\"kind\":\"patch\",\"diff\":\"--- a/...\\n+++ b/...\\n@@ -1,3 +1,3 @@\\n...\"} |
     {\"kind\":\"list\",\"path\":\".\",\"glob\":\"**/*.py\",\"limit\":200} |
     {\"kind\":\"search\",\"query\":\"RunStepService\",\"path\":\"src\",\"glob\":\"**/*.py\",\"limit\":50} |
+    {\"kind\":\"symbols\",\"query\":\"RunStepService.run_once\",\"path\":\"src\",\"limit\":20} |
     {\"kind\":\"run\",\"command\":\"...\"} |
     {\"kind\":\"emit\",\"event_type\":\"progress|question|review|artifact|error|done\",\"message\":\"...\",\"blocking\":false,\"payload\":{}}
   ]
@@ -20,12 +32,21 @@ SYSTEM_PROMPT = """You are Hexi. Return only JSON matching this contract:
 Rules:
 - One step only.
 - Keep actions minimal.
-- Use write with full file content.
+- Read several files in one action with paths; read only the lines you need with start_line/end_line.
+- To find a Python class or function, use symbols, then read its line range.
+- To change an existing file, use patch: search text must match the file exactly and only once.
+- Use write with full file content only for new or very small files.
 - Never use network or destructive commands.
 - Output JSON only, no markdown.
 """
 
 
+@dataclass
+class _RunContext:
+    run_id: str
+    events: list[Event] = field(default_factory=list)
+
+
 class RunStepService:
     def __init__(
         self,
@@ -34,21 +55,102 @@ class RunStepService:
         executor: ExecPort,
         events: EventSinkPort,
         memory: MemoryPort,
+        bus: EventBus | None = None,
     ) -> None:
         self.model = model
         self.workspace = workspace
         self.executor = executor
         self.events = events
         self.memory = memory
+        # `events` and the runlog are delivered inline (both buffer internally); extra
+        # sinks can be subscribed to `bus` with their own filters and queues. A bus
+        # shared between services delivers to each sink once; `close` releases this
+        # service's references again.
+        self._owns_bus = bus is None
+        self.bus = bus if bus is not None else EventBus()
+        self._subscribed: list[EventSinkPort] = []
+        for sink, name in ((events, "events"), (RunlogSink(memory), "runlog")):
+            self.bus.subscribe(sink, name=name)
+            self._subscribed.append(sink)
+
+    def close(self) -> None:
+        """Detach this service's sinks from the bus, closing the bus if the service created it."""
+        if self._owns_bus:
+            self.bus.close()
+        else:
+            for sink in self._subscribed:
+                self.bus.unsubscribe(sink)
+        self._subscribed = []
+
+    def _emit(self, event: Event, run: _RunContext) -> None:
+        event = replace(
+            event,
+            run_id=run.run_id,
+            seq=len(run.events) + 1,
+            ts=round(time.time(), 6),
+            mono=round(time.monotonic(), 6),
+        )
+        self.bus.emit(event)
+        run.events.append(event)
+
+    def _flush_outputs(self) -> None:
+        """Step-end barrier: drain bus queues and flush sinks/memories that buffer writes."""
+        self.bus.flush()
+
+    def _call_model(self, config: ModelConfig, user_prompt: str) -> ModelResult:
+        if self.model is None:
+            raise RuntimeError("model adapter is required for run_once")
+        plan_step_result = getattr(self.model, "plan_step_result", None)
+        if callable(plan_step_result):
+            return plan_step_result(config, SYSTEM_PROMPT, user_prompt)
+        started = time.perf_counter()
+        text = self.model.plan_step(config, SYSTEM_PROMPT, user_prompt)
+        return ModelResult(
+            text=text,
+            provider=config.provider,
+            model=config.model,
+            latency_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+
+    @staticmethod
+    def _timing(kind: str, started: float) -> dict[str, Any]:
+        return {"action": kind, "duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+    def _repo_map(self, policy: Policy) -> str:
+        repo_map = getattr(self.workspace, "repo_map", None)
+        if not callable(repo_map) or policy.max_repo_map_chars <= 0:
+            return ""
+        try:
+            return repo_map(policy.max_repo_map_chars)
+        except Exception:  # the map is optional context; never fail the step over it
+            return ""
 
-    def _emit(self, event: Event, acc: list[Event]) -> None:
-        self.events.emit(event)
-        self.memory.append_runlog(event)
-        acc.append(event)
+    @staticmethod
+    def _describe_reads(files: list[dict[str, Any]]) -> str:
+        if len(files) > 1:
+            return f"{len(files)} files"
+        (only,) = files
+        return f"{only['path']}:{only['start_line']}-{only['end_line']}"
 
-    def _run_plan_internal(self, task: str, thread_id: str, plan: ActionPlan, source: str) -> StepResult:
+    @staticmethod
+    def _model_usage_payload(result: ModelResult, config: ModelConfig, plan_valid: bool) -> dict[str, Any]:
+        data = asdict(result)
+        data.pop("text")
+        data["response_chars"] = len(result.text)
+        data["structured_output"] = config.structured_output
+        data["plan_valid"] = plan_valid
+        return data
+
+    def _run_plan_internal(
+        self,
+        task: str,
+        thread_id: str,
+        plan: ActionPlan,
+        source: str,
+        model_usage: dict[str, Any] | None = None,
+    ) -> StepResult:
         policy = self.memory.load_policy()
-        out_events: list[Event] = []
+        run = _RunContext(run_id=thread_id)
 
         initial = Event(
             type="progress",
@@ -56,21 +158,42 @@ class RunStepService:
             blocking=False,
             payload={"task": task, "thread_id": thread_id, "source": source},
         )
-        self._emit(initial, out_events)
+        self._emit(initial, run)
         self._emit(
             Event(
                 type="progress",
                 one_line_summary=f"Action plan ready: {plan.summary}",
                 blocking=False,
-                payload={"actions": len(plan.actions)},
+                payload={"actions": len(plan.actions), **({"model": model_usage} if model_usage else {})},
             ),
-            out_events,
+            run,
         )
 
         success = True
         for action in plan.actions:
+            started = time.perf_counter()
             try:
-                if action.kind == "read":
+                if action.kind == "read" and (action.paths or action.start_line or action.end_line):
+                    read_lines = getattr(self.workspace, "read_lines", None)
+                    if not callable(read_lines):
+                        raise RuntimeError("workspace does not support line-ranged reads")
+                    start_line = action.start_line or 1
+                    # One budget for the whole batch; files past it come back empty with `next_line`.
+                    budget = policy.max_file_read_chars
+                    files = []
+                    for path in action.paths or [action.path]:
+                        files.append(read_lines(path, start_line, action.end_line, budget))
+                        budget = max(budget - len(str(files[-1]["content"])), 0)
+                    self._emit(
+                        Event(
+                            type="artifact",
+                            one_line_summary=f"Read {self._describe_reads(files)}",
+                            blocking=False,
+                            payload={"files": files, **self._timing(action.kind, started)},
+                        ),
+                        run,
+                    )
+                elif action.kind == "read":
                     assert action.path is not None
                     content = self.workspace.read_text(action.path, policy.max_file_read_chars)
                     self._emit(
@@ -78,9 +201,9 @@ class RunStepService:
                             type="artifact",
                             one_line_summary=f"Read {action.path}",
                             blocking=False,
-                            payload={"path": action.path, "content": content},
+                            payload={"path": action.path, "content": content, **self._timing(action.kind, started)},
                         ),
-                        out_events,
+                        run,
                     )
                 elif action.kind == "write":
                     assert action.path is not None
@@ -91,23 +214,55 @@ class RunStepService:
                             type="artifact",
                             one_line_summary=f"Wrote {action.path}",
                             blocking=False,
-                            payload={"path": action.path, "bytes": len(action.content.encode("utf-8"))},
+                            payload={
+                                "path": action.path,
+                                "bytes": len(action.content.encode("utf-8")),
+                                **self._timing(action.kind, started),
+                            },
                         ),
-                        out_events,
+                        run,
+                    )
+                elif action.kind == "patch":
+                    apply_patch = getattr(self.workspace, "apply_patch", None)
+                    if not callable(apply_patch):
+                        raise RuntimeError("workspace does not support patch actions")
+                    if action.diff is not None:
+                        patches = parse_unified_diff(action.diff)
+                    else:
+                        assert action.path is not None and action.edits is not None
+                        edits = tuple((edit["search"], edit["replace"]) for edit in action.edits)
+                        patches = [FilePatch(path=action.path, edits=edits)]
+                    files = apply_patch(patches)
+                    self._emit(
+                        Event(
+                            type="artifact",
+                            one_line_summary=f"Patched {', '.join(dict.fromkeys(str(f['path']) for f in files))}",
+                            blocking=False,
+                            payload={"files": files, **self._timing(action.kind, started)},
+                        ),
+                        run,
                     )
                 elif action.kind == "run":
                     assert action.command is not None
-                    if not command_allowed(action.command, policy):
-                        raise PermissionError(f"command not allowed: {action.command}")
+                    decision = compile_policy(policy).decide(action.command)
+                    if not decision.allowed:
+                        raise PermissionError(f"command not allowed: {action.command} ({decision.reason})")
                     code, stdout, stderr = self.executor.run(action.command, policy)
                     self._emit(
                         Event(
                             type="artifact",
                             one_line_summary=f"Ran command: {action.command}",
                             blocking=code != 0,
-                            payload={"command": action.command, "exit_code": code, "stdout": stdout, "stderr": stderr},
+                            payload={
+                                "command": action.command,
+                                "rule": decision.rule,
+                                "exit_code": code,
+                                "stdout": stdout,
+                                "stderr": stderr,
+                                **self._timing(action.kind, started),
+                            },
                         ),
-                        out_events,
+                        run,
                     )
                     if code != 0:
                         success = False
@@ -126,9 +281,10 @@ class RunStepService:
                                 "path": action.path or ".",
                                 "glob": action.glob or "**/*",
                                 "files": files,
+                                **self._timing(action.kind, started),
                             },
                         ),
-                        out_events,
+                        run,
                     )
                 elif action.kind == "search":
                     assert action.query is not None
@@ -149,9 +305,30 @@ class RunStepService:
                                 "path": action.path or ".",
                                 "glob": action.glob or "**/*",
                                 "matches": matches,
+                                **self._timing(action.kind, started),
+                            },
+                        ),
+                        run,
+                    )
+                elif action.kind == "symbols":
+                    assert action.query is not None
+                    find_symbols = getattr(self.workspace, "find_symbols", None)
+                    if not callable(find_symbols):
+                        raise RuntimeError("workspace does not support symbols actions")
+                    symbols = find_symbols(query=action.query, path=action.path, limit=action.limit or 50)
+                    self._emit(
+                        Event(
+                            type="artifact",
+                            one_line_summary=f"Symbols '{action.query}' ({len(symbols)} matches)",
+                            blocking=False,
+                            payload={
+                                "query": action.query,
+                                "path": action.path or ".",
+                                "symbols": symbols,
+                                **self._timing(action.kind, started),
                             },
                         ),
-                        out_events,
+                        run,
                     )
                 else:
                     self._emit(
@@ -161,7 +338,7 @@ class RunStepService:
                             blocking=bool(action.blocking),
                             payload=action.payload or {},
                         ),
-                        out_events,
+                        run,
                     )
             except Exception as exc:
                 success = False
@@ -170,9 +347,13 @@ class RunStepService:
                         type="error",
                         one_line_summary=f"Action failed: {action.kind}",
                         blocking=True,
-                        payload={"error": str(exc)},
+                        payload={
+                            "error": str(exc),
+                            **({"command": action.command} if action.command else {}),
+                            **self._timing(action.kind, started),
+                        },
                     ),
-                    out_events,
+                    run,
                 )
                 break
 
@@ -189,54 +370,74 @@ class RunStepService:
                     "suggestion": "Run tests next" if success else "Need user decision",
                 },
             ),
-            out_events,
+            run,
         )
         self._emit(
             Event(type="done", one_line_summary="Run completed", blocking=not success, payload={"success": success}),
-            out_events,
+            run,
         )
-        return StepResult(success=success, events=out_events)
+        return StepResult(success=success, events=run.events)
 
     def run_plan(self, task: str, plan: ActionPlan, source: str = "manual") -> StepResult:
         self.memory.ensure_initialized()
-        thread = Thread(id="single-step", task=task)
-        return self._run_plan_internal(task=task, thread_id=thread.id, plan=plan, source=source)
+        thread = Thread(id=new_run_id(), task=task)
+        try:
+            return self._run_plan_internal(task=task, thread_id=thread.id, plan=plan, source=source)
+        finally:
+            self._flush_outputs()
 
     def run_once(self, task: str) -> StepResult:
+        try:
+            return self._run_once(task)
+        finally:
+            self._flush_outputs()
+
+    def _run_once(self, task: str) -> StepResult:
         self.memory.ensure_initialized()
         model_config = self.memory.load_model_config()
-        thread = Thread(id="single-step", task=task)
+        thread = Thread(id=new_run_id(), task=task)
         policy = self.memory.load_policy()
         status = self.workspace.git_status()
         diff = self.workspace.git_diff(policy.max_diff_chars)
+        repo_map = self._repo_map(policy)
         user_prompt = (
             f"Task:\n{task}\n\n"
-            f"Repo status:\n{status}\n\n"
+            + (f"Repo map:\n{repo_map}\n\n" if repo_map else "")
+            + f"Repo status:\n{status}\n\n"
             f"Current diff (truncated):\n{diff}\n"
         )
 
+        model_result: ModelResult | None = None
         try:
-            if self.model is None:
-                raise RuntimeError("model adapter is required for run_once")
-            raw_plan = self.model.plan_step(model_config, SYSTEM_PROMPT, user_prompt)
-            plan = parse_action_plan(raw_plan)
+            model_result = self._call_model(model_config, user_prompt)
+            plan = parse_action_plan(model_result.text)
         except Exception as exc:
-            out_events: list[Event] = []
+            run = _RunContext(run_id=thread.id)
             initial = Event(
                 type="progress",
                 one_line_summary="Starting single-step run",
                 blocking=False,
                 payload={"task": task, "thread_id": thread.id, "source": "model"},
             )
-            self._emit(initial, out_events)
+            self._emit(initial, run)
+            error_payload: dict[str, Any] = {"error": str(exc)}
+            if model_result is not None:
+                error_payload["invalid_plan"] = True
+                error_payload["model"] = self._model_usage_payload(model_result, model_config, plan_valid=False)
             ev = Event(
                 type="error",
                 one_line_summary="Model output parsing failed",
                 blocking=True,
-                payload={"error": str(exc)},
+                payload=error_payload,
             )
-            self._emit(ev, out_events)
+            self._emit(ev, run)
             done = Event(type="done", one_line_summary="Run failed", blocking=True, payload={"success": False})
-            self._emit(done, out_events)
-            return StepResult(success=False, events=out_events)
-        return self._run_plan_internal(task=task, thread_id=thread.id, plan=plan, source="model")
+            self._emit(done, run)
+            return StepResult(success=False, events=run.events)
+        return self._run_plan_internal(
+            task=task,
+            thread_id=thread.id,
+            plan=plan,
+            source="model",
+            model_usage=self._model_usage_payload(model_result, model_config, plan_valid=True),
+        )
@@ -0,0 +1,10 @@
+from .bench import BenchResult, bench_adapters, run_load
+from .mock_llm import MockLLMConfig, MockLLMServer
+
+__all__ = [
+    "BenchResult",
+    "bench_adapters",
+    "run_load",
+    "MockLLMConfig",
+    "MockLLMServer",
+]
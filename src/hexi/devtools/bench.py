@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from hexi.core.domain import ModelConfig
+
+from .mock_llm import MockLLMServer
+
+BENCH_SYSTEM_PROMPT = "You are a benchmark stand-in. Return ActionPlan JSON."
+BENCH_USER_PROMPT = "Task:\nbenchmark\n\nRepo status:\n\n\nCurrent diff (truncated):\n\n"
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    concurrency: int
+    requests: int
+    errors: int
+    elapsed_s: float
+    rps: float
+    p50_ms: float
+    p99_ms: float
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_load(name: str, call: Callable[[], object], requests: int, concurrency: int) -> BenchResult:
+    latencies: list[float] = []
+    errors = 0
+
+    def one() -> float | None:
+        started = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency in pool.map(lambda _: one(), range(requests)):
+            if latency is None:
+                errors += 1
+            else:
+                latencies.append(latency)
+    elapsed = time.perf_counter() - started
+    return BenchResult(
+        name=name,
+        concurrency=concurrency,
+        requests=requests,
+        errors=errors,
+        elapsed_s=round(elapsed, 4),
+        rps=round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+        p50_ms=round(percentile(latencies, 50), 3),
+        p99_ms=round(percentile(latencies, 99), 3),
+    )
+
+
+def adapter_targets(server: MockLLMServer) -> dict[str, Callable[[], object]]:
+    """Build one zero-argument call per adapter, all pointed at `server`."""
+    from hexi.adapters.model_anthropic_compat import AnthropicCompatModel
+    from hexi.adapters.model_openai_compat import OpenAICompatModel
+    from hexi.adapters.model_openrouter_http import OpenRouterHTTPModel, requests_lib
+
+    for env_name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "OPENROUTER_API_KEY"):
+        os.environ.setdefault(env_name, "mock-key")
+
+    openai_cfg = ModelConfig(provider="openai_compat", model="mock-gpt", base_url=server.openai_base_url)
+    anthropic_cfg = ModelConfig(provider="anthropic_compat", model="mock-claude", base_url=server.anthropic_base_url)
+    openrouter_cfg = ModelConfig(
+        provider="openrouter_http",
+        model="mock/router",
+        base_url=server.openrouter_base_url,
+        api_style="openai",
+    )
+
+    openai_model = OpenAICompatModel()
+    anthropic_model = AnthropicCompatModel()
+    targets: dict[str, Callable[[], object]] = {
+        "openai_compat": lambda: openai_model.plan_step(openai_cfg, BENCH_SYSTEM_PROMPT, BENCH_USER_PROMPT),
+        "anthropic_compat": lambda: anthropic_model.plan_step(anthropic_cfg, BENCH_SYSTEM_PROMPT, BENCH_USER_PROMPT),
+    }
+    if requests_lib is not None:
+        openrouter_model = OpenRouterHTTPModel()
+        targets["openrouter_http"] = lambda: openrouter_model.plan_step(
+            openrouter_cfg, BENCH_SYSTEM_PROMPT, BENCH_USER_PROMPT
+        )
+    return targets
+
+
+def bench_adapters(
+    server: MockLLMServer,
+    concurrency_levels: list[int],
+    requests: int,
+    adapters: list[str] | None = None,
+) -> list[BenchResult]:
+    targets = adapter_targets(server)
+    results: list[BenchResult] = []
+    for name, call in targets.items():
+        if adapters and name not in adapters:
+            continue
+        for concurrency in concurrency_levels:
+            results.append(run_load(name, call, requests=requests, concurrency=concurrency))
+    return results
+
+
+def format_results(results: list[BenchResult]) -> str:
+    header = f"{'adapter':<18}{'conc':>6}{'reqs':>7}{'errs':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<18}{r.concurrency:>6}{r.requests:>7}{r.errors:>6}{r.rps:>10.1f}{r.p50_ms:>10.2f}{r.p99_ms:>10.2f}"
+        )
+    return "\n".join(lines)
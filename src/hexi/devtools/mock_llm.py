@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+DEFAULT_PLAN = json.dumps(
+    {
+        "summary": "mock plan",
+        "actions": [{"kind": "emit", "event_type": "done", "message": "mock response", "blocking": False}],
+    }
+)
+
+
+@dataclass
+class MockLLMConfig:
+    """Behaviour knobs for `MockLLMServer`.
+
+    `plans` are returned round-robin as the assistant text, so tests and benchmarks
+    can script a sequence of ActionPlan responses.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    plans: list[str] = field(default_factory=lambda: [DEFAULT_PLAN])
+    stream_chunk_chars: int = 24
+    seed: int | None = None
+
+
+@dataclass
+class MockLLMStats:
+    requests: int = 0
+    errors: int = 0
+    streamed: int = 0
+    by_shape: dict[str, int] = field(default_factory=dict)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_MockHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return None
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.endswith("/chat/completions"):
+            shape = "openai"
+        elif path.endswith("/messages"):
+            shape = "anthropic"
+        else:
+            self._send_json(404, {"error": {"message": f"unknown endpoint: {self.path}"}})
+            return
+
+        owner = self.server.owner
+        fail, delay = owner._next_behaviour(shape, bool(body.get("stream")))
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self._send_json(owner.config.error_status, {"error": {"type": "mock_error", "message": "injected failure"}})
+            return
+
+        owner.last_request = body
+        text = owner._next_plan()
+        tool = self._forced_tool(body)
+        prompt_tokens = _estimate_tokens(json.dumps(body.get("messages", [])) + str(body.get("system", "")))
+        completion_tokens = _estimate_tokens(text)
+        model = str(body.get("model") or "mock-model")
+
+        if body.get("stream"):
+            if shape == "openai":
+                self._stream_openai(model, text, prompt_tokens, completion_tokens)
+            else:
+                self._stream_anthropic(model, text, prompt_tokens, completion_tokens)
+            return
+
+        if shape == "openai":
+            message: dict[str, Any] = {"role": "assistant", "content": text}
+            if tool:
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": f"call_{uuid.uuid4().hex[:12]}",
+                            "type": "function",
+                            "function": {"name": tool, "arguments": text},
+                        }
+                    ],
+                }
+            payload: dict[str, Any] = {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool else "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": 0},
+                },
+            }
+        else:
+            payload = {
+                "id": f"msg_{uuid.uuid4().hex[:12]}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": (
+                    [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:12]}", "name": tool, "input": json.loads(text)}]
+                    if tool
+                    else [{"type": "text", "text": text}]
+                ),
+                "stop_reason": "tool_use" if tool else "end_turn",
+                "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "cache_read_input_tokens": 0},
+            }
+        self._send_json(200, payload, extra_headers={"openai-processing-ms": f"{delay * 1000:.0f}"})
+
+    @staticmethod
+    def _forced_tool(body: dict[str, Any]) -> str | None:
+        choice = body.get("tool_choice")
+        if not isinstance(choice, dict):
+            return None
+        function = choice.get("function")
+        if isinstance(function, dict):
+            return function.get("name")
+        return choice.get("name")
+
+    def _send_json(self, status: int, payload: dict[str, Any], extra_headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_sse(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def _sse(self, data: dict[str, Any] | str, event: str | None = None) -> None:
+        chunk = ""
+        if event:
+            chunk += f"event: {event}\n"
+        chunk += f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+        self.wfile.write(chunk.encode("utf-8"))
+        self.wfile.flush()
+
+    def _chunks(self, text: str) -> list[str]:
+        size = max(1, self.server.owner.config.stream_chunk_chars)
+        return [text[i : i + size] for i in range(0, len(text), size)] or [""]
+
+    def _stream_openai(self, model: str, text: str, prompt_tokens: int, completion_tokens: int) -> None:
+        self._start_sse()
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        for piece in self._chunks(text):
+            self._sse(
+                {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                }
+            )
+        self._sse(
+            {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
+        self._sse("[DONE]")
+
+    def _stream_anthropic(self, model: str, text: str, prompt_tokens: int, completion_tokens: int) -> None:
+        self._start_sse()
+        message_id = f"msg_{uuid.uuid4().hex[:12]}"
+        self._sse(
+            {
+                "type": "message_start",
+                "message": {
+                    "id": message_id,
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model,
+                    "content": [],
+                    "usage": {"input_tokens": prompt_tokens, "output_tokens": 0},
+                },
+            },
+            event="message_start",
+        )
+        self._sse(
+            {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+            event="content_block_start",
+        )
+        for piece in self._chunks(text):
+            self._sse(
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}},
+                event="content_block_delta",
+            )
+        self._sse({"type": "content_block_stop", "index": 0}, event="content_block_stop")
+        self._sse(
+            {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": completion_tokens}},
+            event="message_delta",
+        )
+        self._sse({"type": "message_stop"}, event="message_stop")
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], owner: "MockLLMServer") -> None:
+        self.owner = owner
+        super().__init__(address, _Handler)
+
+
+class MockLLMServer:
+    """Local stand-in for OpenAI, Anthropic and OpenRouter HTTP endpoints.
+
+    Serves `POST .../chat/completions` (OpenAI / OpenRouter openai-style) and
+    `POST .../messages` (Anthropic / OpenRouter anthropic-style), with or without
+    `"stream": true` (SSE). A forced `tool_choice` is answered with a tool call
+    carrying the scripted plan. Use `openai_base_url`, `anthropic_base_url` and
+    `openrouter_base_url` as `ModelConfig.base_url` values.
+    """
+
+    def __init__(self, config: MockLLMConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or MockLLMConfig()
+        self.stats = MockLLMStats()
+        self.last_request: dict[str, Any] | None = None
+        self._host = host
+        self._port = port
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._plans = itertools.cycle(self.config.plans or [DEFAULT_PLAN])
+        self._httpd: _MockHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self._httpd is None:
+            raise RuntimeError("mock server is not running")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def anthropic_base_url(self) -> str:
+        return self.base_url
+
+    @property
+    def openrouter_base_url(self) -> str:
+        return f"{self.base_url}/api/v1"
+
+    def start(self) -> "MockLLMServer":
+        if self._httpd is not None:
+            return self
+        self._httpd = _MockHTTPServer((self._host, self._port), self)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="hexi-mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _next_plan(self) -> str:
+        with self._lock:
+            return next(self._plans)
+
+    def _next_behaviour(self, shape: str, stream: bool) -> tuple[bool, float]:
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.by_shape[shape] = self.stats.by_shape.get(shape, 0) + 1
+            if stream:
+                self.stats.streamed += 1
+            fail = self.config.error_rate > 0 and self._rng.random() < self.config.error_rate
+            if fail:
+                self.stats.errors += 1
+            jitter = self._rng.uniform(0, self.config.jitter_ms) if self.config.jitter_ms > 0 else 0.0
+        return fail, max(0.0, self.config.latency_ms + jitter) / 1000
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock LLM server (OpenAI/Anthropic/OpenRouter shapes).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--plan-file", action="append", default=[], help="ActionPlan JSON file to serve (repeatable).")
+    args = parser.parse_args(argv)
+
+    plans = [open(path, encoding="utf-8").read() for path in args.plan_file] or [DEFAULT_PLAN]
+    config = MockLLMConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, plans=plans)
+    server = MockLLMServer(config, host=args.host, port=args.port).start()
+    print(f"mock LLM server listening on {server.base_url}")
+    print(f"  openai_compat    base_url = {server.openai_base_url}")
+    print(f"  anthropic_compat base_url = {server.anthropic_base_url}")
+    print(f"  openrouter_http  base_url = {server.openrouter_base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import json
+import re
+from dataclasses import fields
+
 import pytest
 
-from hexi.core.schemas import ActionPlanError, parse_action_plan
+from hexi.core import schemas
+from hexi.core.schemas import Action, ActionPlanError, load_action_plan_schema, parse_action_plan
 
 
 def test_parse_action_plan_valid() -> None:
@@ -40,3 +45,101 @@ def test_parse_action_plan_rejects_search_without_query() -> None:
     raw = '{"summary":"x","actions":[{"kind":"search","path":"src"}]}'
     with pytest.raises(ActionPlanError):
         parse_action_plan(raw)
+
+
+def test_parse_action_plan_accepts_line_ranges_and_paths() -> None:
+    raw = (
+        '{"summary":"read code","actions":['
+        '{"kind":"read","path":"a.py","start_line":40,"end_line":80},'
+        '{"kind":"read","paths":["a.py","b.py"],"end_line":20}'
+        "]}"
+    )
+    plan = parse_action_plan(raw)
+    assert (plan.actions[0].start_line, plan.actions[0].end_line) == (40, 80)
+    assert plan.actions[1].paths == ["a.py", "b.py"]
+
+
+def test_parse_action_plan_accepts_patch_diff_and_edits() -> None:
+    raw = json.dumps(
+        {
+            "summary": "edit code",
+            "actions": [
+                {"kind": "patch", "diff": "--- a/a.py\n+++ b/a.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"},
+                {"kind": "patch", "path": "b.py", "edits": [{"search": "y = 1", "replace": "y = 2"}]},
+                # Strict structured outputs send every field, unused ones as null.
+                {"kind": "patch", "path": None, "diff": "--- a/c.py\n+++ b/c.py\n@@ -1 +1 @@\n-a\n+b\n", "edits": None},
+            ],
+        }
+    )
+    plan = parse_action_plan(raw)
+    assert plan.actions[1].edits == [{"search": "y = 1", "replace": "y = 2"}]
+    assert plan.actions[2].diff is not None
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "json":
+        monkeypatch.setattr(schemas, "_orjson", None)
+    elif schemas._orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_parse_action_plan_backends_agree(json_backend: str) -> None:
+    big = "x" * 300_000
+    raw = json.dumps(
+        {
+            "summary": "  big write  ",
+            "actions": [
+                {"kind": "write", "path": "big.txt", "content": big},
+                {"kind": "emit", "event_type": "done", "message": "ok", "blocking": False, "payload": {"n": 1}},
+            ],
+        }
+    )
+    plan = parse_action_plan(raw)
+    assert plan.summary == "big write"
+    assert plan.actions[0].content == big
+    assert plan.actions[1].payload == {"n": 1}
+    assert parse_action_plan(raw.encode("utf-8")) == plan
+
+
+@pytest.mark.parametrize(
+    ("raw", "message"),
+    [
+        ("{not json", "invalid JSON"),
+        ("[]", "top-level must be an object"),
+        ('{"summary":"x","actions":[{"kind":"read","path":"a"}],"oops":1}', "unexpected top-level keys: ['oops']"),
+        ('{"summary":"x","actions":[]}', "actions must be an array with 1..20 items"),
+        ('{"summary":"x","actions":[{"kind":"read","path":"a","extra":1}]}', "actions[0] unexpected keys: ['extra']"),
+        ('{"summary":"x","actions":[{"kind":"delete"}]}', "actions[0] invalid kind"),
+        ('{"summary":"x","actions":[{"kind":"list","limit":501}]}', "actions[0] list limit must be integer in 1..500"),
+        ('{"summary":"x","actions":[{"kind":"run","command":" "}]}', "actions[0] run requires command"),
+        ('{"summary":"x","actions":[{"kind":"symbols","path":"src"}]}', "actions[0] symbols requires query"),
+        ('{"summary":"x","actions":[{"kind":"read"}]}', "actions[0] read requires path or paths"),
+        ('{"summary":"x","actions":[{"kind":"read","path":"a","paths":["b"]}]}', "actions[0] read takes path or paths, not both"),
+        ('{"summary":"x","actions":[{"kind":"read","paths":[]}]}', "actions[0] read paths must be an array of 1..20"),
+        ('{"summary":"x","actions":[{"kind":"read","path":"a","start_line":0}]}', "actions[0] read start_line must be integer >= 1"),
+        (
+            '{"summary":"x","actions":[{"kind":"read","path":"a","start_line":9,"end_line":3}]}',
+            "actions[0] read end_line must be >= start_line",
+        ),
+        ('{"summary":"x","actions":[{"kind":"patch","path":"a"}]}', "actions[0] patch requires exactly one of diff or edits"),
+        (
+            '{"summary":"x","actions":[{"kind":"patch","path":"a","diff":"--- a/a"}]}',
+            "actions[0] patch diff takes paths from its file headers, not path",
+        ),
+        (
+            '{"summary":"x","actions":[{"kind":"patch","path":"a","edits":[{"search":"","replace":"b"}]}]}',
+            "actions[0] patch edits must be objects with non-empty search and string replace",
+        ),
+        ('{"summary":"x","actions":[{"kind":"patch","edits":[{"search":"a","replace":"b"}]}]}', "actions[0] patch edits require path"),
+    ],
+)
+def test_parse_action_plan_error_messages(json_backend: str, raw: str, message: str) -> None:
+    with pytest.raises(ActionPlanError, match=re.escape(message)):
+        parse_action_plan(raw)
+
+
+def test_schema_action_properties_match_action_fields() -> None:
+    props = load_action_plan_schema()["properties"]["actions"]["items"]["properties"]
+    assert set(props) == {field.name for field in fields(Action)}
@@ -99,3 +99,19 @@ def test_example_action_plans_are_schema_valid() -> None:
         plan = parse_action_plan(raw)
         assert plan.summary
         assert len(plan.actions) >= 1
+
+
+def test_apply_ndjson_console_mode_prints_machine_readable_events(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _init_git_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text(json.dumps({"summary": "note", "actions": [{"kind": "emit", "event_type": "progress", "message": "hi", "blocking": False}]}), encoding="utf-8")
+
+    result = runner.invoke(app, ["--console", "ndjson", "apply", "--plan", str(plan_path)])
+
+    assert result.exit_code == 0
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [e["type"] for e in events][-2:] == ["review", "done"]
+    assert all(e["run_id"] == events[0]["run_id"] for e in events)
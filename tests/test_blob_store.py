@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters.blob_store import BlobStore, is_blob_reference, referenced_digests
+from hexi.adapters.memory_file import FileMemory, open_memory
+from hexi.core.domain import Event
+
+BIG = "x" * 5000
+
+
+def test_externalize_dedupes_and_resolve_round_trips(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path / "blobs", threshold=100)
+    record = {
+        "type": "artifact",
+        "payload": {"content": BIG, "small": "ok", "matches": [{"text": BIG}], "n": 3},
+    }
+
+    stored = store.externalize(record)
+
+    ref = stored["payload"]["content"]
+    assert ref == {"$blob": ref["$blob"], "bytes": 5000}
+    assert stored["payload"]["matches"][0]["text"] == ref
+    assert stored["payload"]["small"] == "ok"
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 1
+    assert store.resolve(stored) == record
+    assert referenced_digests([json.dumps(stored).encode()]) == {ref["$blob"].removeprefix("sha256:")}
+
+
+def test_missing_blob_leaves_reference_and_bad_digest_is_rejected(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path / "blobs")
+    ref = {"$blob": "sha256:" + "0" * 64, "bytes": 1}
+    assert store.resolve({"payload": {"content": ref}}) == {"payload": {"content": ref}}
+    with pytest.raises(ValueError):
+        store.get("md5:abc")
+
+
+def test_only_exact_references_are_resolved(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path / "blobs", threshold=100)
+    digest = store.externalize({"payload": {"content": BIG}})["payload"]["content"]["$blob"]
+    lookalikes = [
+        {"$blob": digest},
+        {"$blob": digest, "note": "x"},
+        {"$blob": digest, "bytes": "5000"},
+        {"$blob": digest, "bytes": True},
+        {"$blob": digest.upper(), "bytes": 5000},
+    ]
+    payload = {"items": lookalikes}
+    assert store.resolve({"payload": payload}) == {"payload": payload}
+    assert [is_blob_reference(value) for value in lookalikes] == [False] * len(lookalikes)
+    assert is_blob_reference({"$blob": digest, "bytes": 5000})
+
+
+def test_reused_blob_survives_gc_grace_window(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path / "blobs")
+    digest = store.put(b"y" * 5000)
+    path = next((tmp_path / "blobs").glob("*/*"))
+    os.utime(path, (0, 0))  # stored long ago
+
+    assert store.put(b"y" * 5000) == digest  # reused by a record not yet in the runlog
+    result = store.gc(referenced=[], grace_s=3600)
+
+    assert (result.removed, result.kept) == (0, 1)
+    assert store.get(digest) == b"y" * 5000
+
+
+def test_memory_stores_references_and_readers_resolve(tmp_path: Path) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    for _ in range(3):
+        mem.append_runlog(Event(type="artifact", one_line_summary="Read a.py", blocking=False, payload={"content": BIG}))
+    mem.flush_runlog()
+
+    raw = mem.runlog_path.read_text(encoding="utf-8")
+    assert BIG not in raw
+    assert raw.count('"$blob"') == 3
+    assert len(list(mem.hexi_dir.glob("blobs/*/*"))) == 1
+    assert [r["payload"]["content"] for r in mem.iter_runlog()] == [BIG] * 3
+    assert mem.query_runlog(types={"artifact"}, limit=1)[0].record["payload"]["content"] == BIG
+    mem.close()
+
+
+def test_threshold_zero_disables_blobs(tmp_path: Path) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    mem.local_config_path.write_text("[runlog]\nblob_threshold_bytes = 0\n", encoding="utf-8")
+    mem.append_runlog(Event(type="artifact", one_line_summary="Read", blocking=False, payload={"content": BIG}))
+    mem.flush_runlog()
+    assert BIG in mem.runlog_path.read_text(encoding="utf-8")
+    mem.close()
+
+
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+def test_gc_removes_only_unreferenced_blobs(tmp_path: Path, backend: str) -> None:
+    FileMemory(tmp_path).ensure_initialized()
+    (tmp_path / ".hexi/local.toml").write_text(f'[memory]\nbackend = "{backend}"\n', encoding="utf-8")
+    mem = open_memory(tmp_path)
+    mem.ensure_initialized()
+    mem.append_runlog(Event(type="artifact", one_line_summary="Read", blocking=False, payload={"content": BIG}))
+    orphan = BlobStore(mem.hexi_dir / "blobs").put(b"y" * 5000)
+
+    assert mem.gc_blobs(grace_s=3600).removed == 0
+    result = mem.gc_blobs(grace_s=0)
+
+    assert (result.removed, result.kept, result.freed_bytes) == (1, 1, 5000)
+    with pytest.raises(FileNotFoundError):
+        BlobStore(mem.hexi_dir / "blobs").get(orphan)
+    assert [r["payload"]["content"] for r in mem.iter_runlog()] == [BIG]
+    mem.close()
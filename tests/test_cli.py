@@ -5,7 +5,8 @@ from pathlib import Path
 import pytest
 from typer.testing import CliRunner
 
-from hexi.cli import _copy_template, app
+from hexi.cli import app
+from hexi.commands.scaffold import _copy_template
 from hexi.core.domain import ModelConfig, StepResult
 
 runner = CliRunner()
@@ -52,7 +53,7 @@ class FakeMemory:
 
 def test_cli_init_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     mem = FakeMemory(tmp_path)
-    monkeypatch.setattr("hexi.cli._bootstrap_memory", lambda: (mem, tmp_path, True))
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, True))
 
     result = runner.invoke(app, ["init"])
     assert result.exit_code == 0
@@ -62,7 +63,7 @@ def test_cli_init_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> No
 def test_cli_diff_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     ws = FakeWS(tmp_path)
     mem = FakeMemory(tmp_path)
-    monkeypatch.setattr("hexi.cli._workspace_and_memory", lambda: (ws, mem))
+    monkeypatch.setattr("hexi.cli_common.workspace_and_memory", lambda: (ws, mem))
 
     result = runner.invoke(app, ["diff"])
     assert result.exit_code == 0
@@ -71,7 +72,7 @@ def test_cli_diff_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> No
 
 def test_cli_doctor_warns_when_key_missing(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     mem = FakeMemory(tmp_path, provider="openrouter_http", key_source=None)
-    monkeypatch.setattr("hexi.cli._bootstrap_memory", lambda: (mem, tmp_path, True))
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, True))
 
     result = runner.invoke(app, ["doctor"])
     assert result.exit_code == 1
@@ -80,7 +81,7 @@ def test_cli_doctor_warns_when_key_missing(monkeypatch: pytest.MonkeyPatch, tmp_
 
 def test_cli_doctor_passes_with_local_key(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     mem = FakeMemory(tmp_path, provider="openrouter_http", key_source="local")
-    monkeypatch.setattr("hexi.cli._bootstrap_memory", lambda: (mem, tmp_path, True))
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, True))
 
     result = runner.invoke(app, ["doctor"])
     assert result.exit_code == 0
@@ -89,7 +90,7 @@ def test_cli_doctor_passes_with_local_key(monkeypatch: pytest.MonkeyPatch, tmp_p
 
 def test_cli_doctor_bootstrap_mode_without_git(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     mem = FakeMemory(tmp_path, provider="openrouter_http", key_source="local")
-    monkeypatch.setattr("hexi.cli._bootstrap_memory", lambda: (mem, tmp_path, False))
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, False))
 
     result = runner.invoke(app, ["doctor"])
     assert result.exit_code == 0
@@ -98,7 +99,7 @@ def test_cli_doctor_bootstrap_mode_without_git(monkeypatch: pytest.MonkeyPatch,
 
 def test_cli_onboard_writes_local_config(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     mem = FakeMemory(tmp_path)
-    monkeypatch.setattr("hexi.cli._bootstrap_memory", lambda: (mem, tmp_path, True))
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, True))
 
     user_input = "openrouter_http\nopenai/gpt-4o-mini\nopenai\ny\nabc123\n"
     result = runner.invoke(app, ["onboard"], input=user_input)
@@ -109,7 +110,7 @@ def test_cli_onboard_writes_local_config(monkeypatch: pytest.MonkeyPatch, tmp_pa
 
 def test_cli_init_bootstrap_mode_without_git(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     mem = FakeMemory(tmp_path)
-    monkeypatch.setattr("hexi.cli._bootstrap_memory", lambda: (mem, tmp_path, False))
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, False))
 
     result = runner.invoke(app, ["init"])
     assert result.exit_code == 0
@@ -139,7 +140,7 @@ def test_cli_plan_check_invalid_inline_json() -> None:
 def test_copy_template_uses_packaged_resources_when_local_roots_missing(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
-    monkeypatch.setattr("hexi.cli._local_template_roots", lambda: [])
+    monkeypatch.setattr("hexi.commands.scaffold._local_template_roots", lambda: [])
     destination = tmp_path / "out"
     _copy_template("hexi-python-lib", destination, force=False)
     assert (destination / "pyproject.toml").exists()
@@ -149,7 +150,7 @@ def test_copy_template_uses_packaged_resources_when_local_roots_missing(
 def test_cli_apply_executes_valid_plan(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     ws = FakeWS(tmp_path)
     mem = FakeMemory(tmp_path)
-    monkeypatch.setattr("hexi.cli._workspace_and_memory", lambda: (ws, mem))
+    monkeypatch.setattr("hexi.cli_common.workspace_and_memory", lambda: (ws, mem))
 
     captured: dict[str, object] = {}
 
@@ -165,7 +166,7 @@ def test_cli_apply_executes_valid_plan(monkeypatch: pytest.MonkeyPatch, tmp_path
             captured["source"] = source
             return StepResult(success=True, events=[])
 
-    monkeypatch.setattr("hexi.cli.RunStepService", FakeApplyService)
+    monkeypatch.setattr("hexi.commands.step.RunStepService", FakeApplyService)
 
     plan_file = tmp_path / "plan.json"
     plan_file.write_text(
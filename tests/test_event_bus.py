@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from hexi.core.domain import Event
+from hexi.core.events import EventBus
+
+
+def _event(event_type: str = "progress", n: int = 0) -> Event:
+    return Event(type=event_type, one_line_summary=f"event {n}", blocking=False, payload={"n": n})
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self.events: list[Event] = []
+        self.flushes = 0
+
+    def emit(self, event: Event) -> None:
+        self.events.append(event)
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+class GatedSink(ListSink):
+    """Blocks in `emit` until the gate opens, to fill the queue deterministically."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def emit(self, event: Event) -> None:
+        self.entered.set()
+        self.gate.wait()
+        super().emit(event)
+
+
+def test_bus_filters_by_type_and_flushes_sinks() -> None:
+    bus = EventBus()
+    everything, errors = ListSink(), ListSink()
+    bus.subscribe(everything, name="all")
+    bus.subscribe(errors, name="errors", types={"error"}, max_queue=8)
+
+    for n, event_type in enumerate(["progress", "error", "done", "error"]):
+        bus.emit(_event(event_type, n))
+    bus.flush()
+
+    assert [e.payload["n"] for e in everything.events] == [0, 1, 2, 3]
+    assert [e.payload["n"] for e in errors.events] == [1, 3]
+    assert everything.flushes == errors.flushes == 1
+    stats = {s.name: s for s in bus.stats()}
+    assert stats["all"].delivered == 4 and stats["all"].filtered == 0
+    assert stats["errors"].delivered == 2 and stats["errors"].filtered == 2
+    assert stats["errors"].queued == 0
+    bus.close()
+
+
+def _fill(overflow: str, emitted: int, max_queue: int = 2, sample_every: int = 3) -> tuple[GatedSink, EventBus]:
+    bus = EventBus()
+    sink = GatedSink()
+    bus.subscribe(sink, name="slow", max_queue=max_queue, overflow=overflow, sample_every=sample_every)
+    bus.emit(_event(n=0))
+    assert sink.entered.wait(5)  # event 0 is now held by the worker, outside the queue
+    for n in range(1, emitted):
+        bus.emit(_event(n=n))
+    sink.gate.set()
+    bus.flush()
+    return sink, bus
+
+
+def test_drop_policy_discards_new_events_when_queue_is_full() -> None:
+    sink, bus = _fill("drop", emitted=6)
+
+    assert [e.payload["n"] for e in sink.events] == [0, 1, 2]
+    (stats,) = bus.stats()
+    assert stats.delivered == 3
+    assert stats.dropped == 3
+    assert stats.max_queued == 2
+    assert stats.lag_ms_max >= stats.emit_ms_max >= 0
+    bus.close()
+
+
+def test_sample_policy_keeps_every_nth_overflowing_event() -> None:
+    sink, bus = _fill("sample", emitted=9, sample_every=3)
+
+    # Overflow events are 3..8; 5 and 8 are sampled in, each evicting the oldest queued event.
+    assert [e.payload["n"] for e in sink.events] == [0, 5, 8]
+    (stats,) = bus.stats()
+    assert stats.delivered == 3
+    assert stats.dropped == 6
+    bus.close()
+
+
+def test_block_policy_applies_backpressure_without_losing_events() -> None:
+    bus = EventBus()
+    sink = GatedSink()
+    bus.subscribe(sink, name="slow", max_queue=1, overflow="block")
+    producer = threading.Thread(target=lambda: [bus.emit(_event(n=n)) for n in range(4)])
+    producer.start()
+    assert sink.entered.wait(5)
+    producer.join(0.2)
+    assert producer.is_alive()  # blocked on the full queue
+
+    sink.gate.set()
+    producer.join(5)
+    bus.flush()
+
+    assert [e.payload["n"] for e in sink.events] == [0, 1, 2, 3]
+    assert bus.stats()[0].dropped == 0
+    bus.close()
+
+
+def test_inline_sink_errors_propagate_and_queued_sink_errors_are_counted() -> None:
+    class Broken:
+        def emit(self, event: Event) -> None:
+            raise RuntimeError("boom")
+
+    inline = EventBus()
+    inline.subscribe(Broken())
+    with pytest.raises(RuntimeError):
+        inline.emit(_event())
+
+    queued = EventBus()
+    queued.subscribe(Broken(), name="broken", max_queue=4)
+    queued.emit(_event())
+    queued.flush()
+    (stats,) = queued.stats()
+    assert stats.errors == 1 and stats.delivered == 0
+    queued.close()
+
+
+def test_subscribe_rejects_unknown_overflow_policy() -> None:
+    with pytest.raises(ValueError, match="overflow"):
+        EventBus().subscribe(ListSink(), overflow="spill")
+
+
+def test_sink_is_subscribed_once_until_every_reference_is_released() -> None:
+    bus = EventBus()
+    sink = ListSink()
+    bus.subscribe(sink, name="a", max_queue=4)
+    bus.subscribe(sink, name="b")
+    bus.emit(_event(n=1))
+    bus.unsubscribe(sink)
+    bus.emit(_event(n=2))
+    bus.unsubscribe(sink)
+    bus.emit(_event(n=3))
+
+    assert [e.payload["n"] for e in sink.events] == [1, 2]
+    assert bus.stats() == []
+    bus.close()
+
+
+def test_emit_after_close_raises_and_flush_is_a_noop() -> None:
+    bus = EventBus()
+    sink = ListSink()
+    bus.subscribe(sink, max_queue=1, overflow="block")
+    bus.emit(_event(n=1))
+    bus.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        bus.emit(_event(n=2))
+    bus.flush()  # must not wait on the exited drain thread
+    assert [e.payload["n"] for e in sink.events] == [1]
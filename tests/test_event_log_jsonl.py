@@ -13,6 +13,7 @@ def test_jsonl_event_sink_appends_line(tmp_path: Path) -> None:
 
     sink.emit(Event(type="progress", one_line_summary="line1", blocking=False, payload={"a": 1}))
     sink.emit(Event(type="done", one_line_summary="line2", blocking=False, payload={"b": 2}))
+    sink.flush()
 
     lines = path.read_text(encoding="utf-8").splitlines()
     assert len(lines) == 2
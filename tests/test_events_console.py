@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import json
+import time
+
+import pytest
+
+from hexi.adapters.events_console import ConsoleEventSink
+from hexi.core.domain import Event
+
+ERROR = Event(type="error", one_line_summary="Action failed: run", blocking=True, payload={"error": "boom"})
+READ = Event(type="artifact", one_line_summary="Read a.txt", blocking=False, payload={"content": "x" * 5000})
+
+
+def test_auto_mode_uses_plain_lines_when_not_a_terminal() -> None:
+    out = io.StringIO()
+    sink = ConsoleEventSink(mode="auto", stream=out)
+    assert sink.mode == "plain"
+
+    sink.emit(READ)
+    sink.emit(ERROR)
+
+    assert out.getvalue().splitlines() == [
+        "[ARTIFACT] Read a.txt",
+        "[ERROR] [blocking] Action failed: run",
+        '  payload: {"error": "boom"}',
+    ]
+
+
+def test_auto_mode_follows_stream_isatty_without_building_a_console() -> None:
+    class Tty(io.StringIO):
+        def isatty(self) -> bool:
+            return True
+
+    assert ConsoleEventSink(mode="auto", stream=Tty()).mode == "rich"
+    sink = ConsoleEventSink(mode="auto", stream=io.StringIO())
+    sink.emit(ERROR)
+    assert sink._console is None
+
+
+def test_ndjson_mode_writes_one_event_per_line() -> None:
+    out = io.StringIO()
+    sink = ConsoleEventSink(mode="ndjson", stream=out)
+    sink.emit(READ)
+    sink.emit(ERROR)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["type"] for r in records] == ["artifact", "error"]
+    assert records[0]["payload"]["content"] == "x" * 5000
+
+
+def test_rich_mode_renders_in_background_and_flush_waits(monkeypatch: pytest.MonkeyPatch) -> None:
+    out = io.StringIO()
+    sink = ConsoleEventSink(verbose=2, mode="rich", stream=out)
+    original = sink._render
+
+    def slow_render(event: Event) -> None:
+        time.sleep(0.1)
+        original(event)
+
+    monkeypatch.setattr(sink, "_render", slow_render)
+
+    started = time.perf_counter()
+    for _ in range(3):
+        sink.emit(READ)
+    assert time.perf_counter() - started < 0.1
+
+    sink.flush()
+    assert out.getvalue().count("Read a.txt") == 3
+    sink.close()
+
+
+def test_invalid_mode_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        ConsoleEventSink(mode="fancy")
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from hexi.core.ids import RunIdGenerator, new_run_id, run_id_time_ms
+
+
+def test_run_ids_are_ulids_that_sort_by_time() -> None:
+    gen = RunIdGenerator()
+    earlier = gen.new(now_ms=1_700_000_000_000)
+    later = gen.new(now_ms=1_700_000_000_001)
+
+    assert len(earlier) == 26
+    assert earlier < later
+    assert run_id_time_ms(earlier) == 1_700_000_000_000
+
+
+def test_run_ids_are_strictly_increasing_within_one_millisecond_and_clock_steps_back() -> None:
+    gen = RunIdGenerator()
+    ids = [gen.new(now_ms=1_800_000_000_000) for _ in range(1000)]
+    ids.append(gen.new(now_ms=1_799_999_999_000))
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_default_run_ids_encode_current_time() -> None:
+    before = int(time.time() * 1000)
+    assert before <= run_id_time_ms(new_run_id()) <= int(time.time() * 1000)
+
+
+def test_run_id_time_rejects_invalid_ids() -> None:
+    with pytest.raises(ValueError):
+        run_id_time_ms("not-a-ulid-at-all-0000000U")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 
 import pytest
@@ -66,6 +67,23 @@ openrouter_api_key = "abc"
     assert source == "local"
 
 
+def test_apply_api_key_to_env_refreshes_a_key_it_injected(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    mem.local_config_path.write_text('[secrets]\nopenai_api_key = "old"\n', encoding="utf-8")
+    assert mem.apply_api_key_to_env("openai_compat") == "local"
+    assert os.environ["OPENAI_API_KEY"] == "old"
+
+    mem.local_config_path.write_text('[secrets]\nopenai_api_key = "rotated"\n', encoding="utf-8")
+    assert mem.apply_api_key_to_env("openai_compat") == "local"
+    assert os.environ["OPENAI_API_KEY"] == "rotated"
+
+    monkeypatch.setenv("OPENAI_API_KEY", "from-shell")
+    assert mem.apply_api_key_to_env("openai_compat") == "env"
+    assert os.environ["OPENAI_API_KEY"] == "from-shell"
+
+
 def test_memory_rejects_invalid_allow_commands(tmp_path: Path) -> None:
     mem = FileMemory(tmp_path)
     mem.ensure_initialized()
@@ -86,9 +104,56 @@ def test_memory_append_runlog_writes_jsonl(tmp_path: Path) -> None:
 
     ev = Event(type="progress", one_line_summary="hello", blocking=False, payload={"n": 1})
     mem.append_runlog(ev)
+    mem.flush_runlog()
 
     lines = mem.runlog_path.read_text(encoding="utf-8").strip().splitlines()
     assert len(lines) == 1
     data = json.loads(lines[0])
     assert data["type"] == "progress"
     assert data["payload"]["n"] == 1
+
+
+def test_config_snapshot_parses_once_until_a_file_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    parsed: list[str] = []
+    original = FileMemory._load_toml
+
+    def counting(self: FileMemory, path: Path) -> dict:
+        parsed.append(path.name)
+        return original(self, path)
+
+    monkeypatch.setattr(FileMemory, "_load_toml", counting)
+    mem.load_model_config()
+    mem.load_policy()
+    FileMemory(tmp_path).resolve_api_key("openai_compat")
+    assert sorted(parsed) == ["config.toml", "local.toml"]
+
+    mem.local_config_path.write_text('[model]\nmodel = "gpt-4.1"\n', encoding="utf-8")
+    assert mem.load_model_config().model == "gpt-4.1"
+    assert len(parsed) == 4
+
+    mem.write_local_onboarding(provider="openai_compat", model="o3", api_style=None, api_key=None)
+    assert mem.load_model_config().model == "o3"
+
+
+def test_config_json_cache_is_opt_in_and_skips_toml_parsing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import hexi.adapters.memory_file as memory_file
+
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    mem.load_policy()
+    assert not mem.config_cache_path.exists()
+
+    monkeypatch.setenv("HEXI_CONFIG_CACHE", "1")
+    mem.invalidate_config()
+    mem.load_policy()
+    assert mem.config_cache_path.exists()
+    assert mem.config_cache_path.stat().st_mode & 0o777 == 0o600
+
+    monkeypatch.setattr(memory_file, "_SNAPSHOTS", {})  # a fresh process
+    monkeypatch.setattr(FileMemory, "_load_toml", lambda self, path: pytest.fail("TOML parsed despite cache"))
+    assert FileMemory(tmp_path).load_model_config().model == "gpt-4o-mini"
+
+    mem.write_local_onboarding(provider="openai_compat", model="o3", api_style=None, api_key=None)
+    assert not mem.config_cache_path.exists()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from hexi.adapters.memory_file import FileMemory, open_memory
+from hexi.adapters.memory_sqlite import RunlogImportResult, SqliteMemory
+from hexi.cli import app
+from hexi.core.domain import Event, Policy
+from hexi.core.schemas import parse_action_plan
+from hexi.core.service import RunStepService
+
+runner = CliRunner()
+
+
+class _Workspace:
+    def read_text(self, path: str, max_chars: int) -> str:
+        return "alpha"
+
+    def git_status(self) -> str:
+        return ""
+
+    def git_diff(self, max_chars: int) -> str:
+        return ""
+
+
+class _Events:
+    def emit(self, event: Event) -> None:
+        return None
+
+
+def _sqlite_memory(tmp_path: Path) -> SqliteMemory:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    mem.local_config_path.write_text('[memory]\nbackend = "sqlite"\n', encoding="utf-8")
+    selected = open_memory(tmp_path)
+    assert isinstance(selected, SqliteMemory)
+    selected.ensure_initialized()
+    return selected
+
+
+def test_file_backend_is_the_default(tmp_path: Path) -> None:
+    FileMemory(tmp_path).ensure_initialized()
+    assert type(open_memory(tmp_path)) is FileMemory
+
+    (tmp_path / ".hexi/local.toml").write_text('[memory]\nbackend = "redis"\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        open_memory(tmp_path)
+
+
+def test_sqlite_memory_uses_wal_and_indexes(tmp_path: Path) -> None:
+    mem = _sqlite_memory(tmp_path)
+    conn = sqlite3.connect(mem.db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"events_run", "events_type_ts", "events_ts"} <= indexes
+    conn.close()
+
+
+def test_service_runs_are_stored_and_queryable(tmp_path: Path) -> None:
+    mem = _sqlite_memory(tmp_path)
+    plan = parse_action_plan('{"summary":"s","actions":[{"kind":"read","path":"a.txt"}]}')
+    service = RunStepService(None, _Workspace(), None, _Events(), mem)  # type: ignore[arg-type]
+    mem.load_policy = lambda: Policy(allow_commands=[])  # type: ignore[method-assign]
+
+    first = service.run_plan("one", plan)
+    second = service.run_plan("two", plan)
+
+    records = list(mem.iter_runlog())
+    assert len(records) == len(first.events) + len(second.events)
+    assert records[0]["run_id"] == first.events[0].run_id
+    assert records[0]["payload"]["task"] == "one"
+    assert mem.runlog_path.read_text(encoding="utf-8") == ""
+
+    last = mem.query_runlog(last_runs=1)
+    assert {e.run_id for e in last} == {second.events[0].run_id}
+    reads = mem.query_runlog(types={"artifact"})
+    assert [e.record["one_line_summary"] for e in reads] == ["Read a.txt", "Read a.txt"]
+    assert [e.record["seq"] for e in mem.query_runlog(run_id=first.events[0].run_id, limit=2)] == [4, 5]
+    mem.close()
+
+
+def test_import_runlog_files_resumes_after_imported_records(tmp_path: Path) -> None:
+    mem = _sqlite_memory(tmp_path)
+    legacy = [
+        {"type": "progress", "one_line_summary": "Starting single-step run", "blocking": False, "payload": {}},
+        {"type": "error", "one_line_summary": "boom", "blocking": True, "payload": {"error": "x"}},
+        {"type": "progress", "one_line_summary": "Starting single-step run", "blocking": False, "payload": {}},
+    ]
+    mem.runlog_path.write_text("".join(json.dumps(r) + "\n" for r in legacy), encoding="utf-8")
+
+    assert mem.import_runlog_files() == RunlogImportResult(events=3, skipped=0)
+    assert mem.import_runlog_files() == RunlogImportResult(events=0, skipped=0)
+    errors = mem.query_runlog(types={"error"})
+    assert [(e.run_id, e.record["payload"]) for e in errors] == [("legacy-1", {"error": "x"})]
+    assert [e.run_id for e in mem.query_runlog(last_runs=1)] == ["legacy-2"]
+    run_id_pattern = json.loads(
+        (Path(__file__).resolve().parents[1] / "docs" / "contracts" / "event.schema.json").read_text(encoding="utf-8")
+    )["properties"]["run_id"]["pattern"]
+    assert all(re.match(run_id_pattern, record["run_id"]) for record in mem.iter_runlog())
+
+    # Records appended after the migration are picked up by the next one.
+    late = {"type": "error", "one_line_summary": "late", "blocking": True, "payload": {}}
+    with mem.runlog_path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(late) + "\n")
+    assert mem.import_runlog_files() == RunlogImportResult(events=1, skipped=0)
+    errors = mem.query_runlog(types={"error"})
+    assert [(e.run_id, e.record["one_line_summary"]) for e in errors] == [("legacy-1", "boom"), ("legacy-2", "late")]
+    mem.close()
+
+
+def test_import_runlog_files_skips_malformed_lines(tmp_path: Path) -> None:
+    mem = _sqlite_memory(tmp_path)
+    good = {"type": "error", "one_line_summary": "kept", "blocking": True, "payload": {}}
+    mem.runlog_path.write_text(
+        json.dumps(good) + "\n" + '{"type": "err\n' + "[1, 2]\n" + json.dumps(good) + "\n", encoding="utf-8"
+    )
+
+    assert mem.import_runlog_files() == RunlogImportResult(events=2, skipped=2)
+    assert [e.record["one_line_summary"] for e in mem.query_runlog(types={"error"})] == ["kept", "kept"]
+    mem.close()
+
+
+def test_import_runlog_files_resumes_schema_v1_imports(tmp_path: Path) -> None:
+    mem = _sqlite_memory(tmp_path)
+    record = {"type": "error", "one_line_summary": "boom", "blocking": True, "payload": {}}
+    mem.runlog_path.write_text(json.dumps(record) + "\n" + json.dumps(record) + "\n", encoding="utf-8")
+    conn = sqlite3.connect(mem.db_path)
+    with conn:
+        conn.executescript(
+            "DROP TABLE imports;"
+            " CREATE TABLE imports (source TEXT PRIMARY KEY, events INTEGER NOT NULL, imported_at REAL NOT NULL);"
+            " INSERT INTO imports VALUES ('runlog.jsonl', 1, 0);"
+            " PRAGMA user_version = 1;"
+        )
+    conn.close()
+
+    assert mem.import_runlog_files() == RunlogImportResult(events=1, skipped=0)
+    assert mem.import_runlog_files() == RunlogImportResult(events=0, skipped=0)
+    mem.close()
+
+
+def test_cli_migrate_runlog_and_log_use_sqlite(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    mem.runlog_path.write_text(
+        json.dumps({"type": "error", "one_line_summary": "old failure", "blocking": True, "payload": {}}) + "\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (open_memory(tmp_path), tmp_path, True))
+
+    result = runner.invoke(app, ["migrate-runlog"])
+    assert result.exit_code == 0
+    assert "Imported 1 events" in result.stdout
+    assert '[memory] backend = "sqlite"' in result.stdout
+
+    mem.local_config_path.write_text('[memory]\nbackend = "sqlite"\n', encoding="utf-8")
+    mem.runlog_path.write_text("", encoding="utf-8")
+    result = runner.invoke(app, ["log", "--type", "error", "--json"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["one_line_summary"] == "old failure"
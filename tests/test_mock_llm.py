@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from hexi.adapters.model_anthropic_compat import AnthropicCompatModel
+from hexi.adapters.model_openai_compat import OpenAICompatModel
+from hexi.core.domain import ModelConfig
+from hexi.core.schemas import parse_action_plan
+from hexi.devtools.bench import bench_adapters, percentile
+from hexi.devtools.mock_llm import MockLLMConfig, MockLLMServer
+
+PLAN_A = '{"summary":"a","actions":[{"kind":"read","path":"README.md"}]}'
+PLAN_B = '{"summary":"b","actions":[{"kind":"emit","event_type":"done","message":"m","blocking":false}]}'
+
+
+@pytest.fixture
+def server():
+    with MockLLMServer(MockLLMConfig(plans=[PLAN_A, PLAN_B], seed=1)) as srv:
+        yield srv
+
+
+def test_mock_server_scripts_plans_for_openai_adapter(server: MockLLMServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    cfg = ModelConfig(provider="openai_compat", model="gpt-mock", base_url=server.openai_base_url)
+    model = OpenAICompatModel()
+
+    first = model.plan_step_result(cfg, "sys", "usr")
+    second = model.plan_step_result(cfg, "sys", "usr")
+
+    assert parse_action_plan(first.text).summary == "a"
+    assert parse_action_plan(second.text).summary == "b"
+    assert first.model == "gpt-mock"
+    assert first.prompt_tokens and first.completion_tokens
+    assert first.ttfb_ms is not None and first.latency_ms is not None
+    assert server.stats.by_shape == {"openai": 2}
+
+
+def test_mock_server_speaks_anthropic_messages(server: MockLLMServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+    cfg = ModelConfig(provider="anthropic_compat", model="claude-mock", base_url=server.anthropic_base_url)
+
+    result = AnthropicCompatModel().plan_step_result(cfg, "sys", "usr")
+
+    assert parse_action_plan(result.text).summary == "a"
+    assert result.completion_tokens is not None
+
+
+def test_mock_server_streams_openai_and_anthropic_sse(server: MockLLMServer) -> None:
+    with httpx.Client(timeout=10) as client:
+        with client.stream(
+            "POST", f"{server.openai_base_url}/chat/completions", json={"model": "m", "stream": True, "messages": []}
+        ) as response:
+            lines = [line for line in response.iter_lines() if line.startswith("data: ")]
+        assert lines[-1] == "data: [DONE]"
+        text = "".join(
+            json.loads(line[6:])["choices"][0]["delta"].get("content", "") for line in lines[:-1]
+        )
+        assert text == PLAN_A
+
+        with client.stream(
+            "POST", f"{server.anthropic_base_url}/v1/messages", json={"model": "m", "stream": True, "messages": []}
+        ) as response:
+            events = [json.loads(line[6:]) for line in response.iter_lines() if line.startswith("data: ")]
+    deltas = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+    assert deltas == PLAN_B
+    assert events[-1]["type"] == "message_stop"
+    assert server.stats.streamed == 2
+
+
+def test_mock_server_injects_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    with MockLLMServer(MockLLMConfig(error_rate=1.0, error_status=429)) as srv:
+        cfg = ModelConfig(provider="openai_compat", model="m", base_url=srv.openai_base_url)
+        with pytest.raises(httpx.HTTPStatusError):
+            OpenAICompatModel().plan_step(cfg, "sys", "usr")
+        assert srv.stats.errors == 1
+
+
+def test_bench_adapters_reports_throughput_and_percentiles(server: MockLLMServer) -> None:
+    results = bench_adapters(server, concurrency_levels=[1, 4], requests=8)
+
+    names = {r.name for r in results}
+    assert {"openai_compat", "anthropic_compat"} <= names
+    for r in results:
+        assert r.errors == 0
+        assert r.rps > 0
+        assert 0 < r.p50_ms <= r.p99_ms
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = [float(x) for x in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 50) == 0.0
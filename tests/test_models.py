@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 
 from hexi.adapters.model_anthropic_compat import AnthropicCompatModel
+from hexi.adapters.model_http_common import HttpTiming
 from hexi.adapters.model_openai_compat import OpenAICompatModel
 from hexi.core.domain import ModelConfig
 
@@ -16,9 +17,9 @@ def test_openai_adapter_builds_expected_request(monkeypatch: pytest.MonkeyPatch)
         captured["url"] = url
         captured["headers"] = headers
         captured["payload"] = payload
-        return {"choices": [{"message": {"content": '{"summary":"x","actions":[{"kind":"emit","event_type":"done","message":"m","blocking":false}]}'}}]}
+        return {"choices": [{"message": {"content": '{"summary":"x","actions":[{"kind":"emit","event_type":"done","message":"m","blocking":false}]}'}}]}, HttpTiming(latency_ms=1.0)
 
-    monkeypatch.setattr("hexi.adapters.model_openai_compat.post_json", fake_post_json)
+    monkeypatch.setattr("hexi.adapters.model_openai_compat.post_json_timed", fake_post_json)
 
     cfg = ModelConfig(provider="openai_compat", model="gpt-4o-mini", base_url="https://api.example.com/v1")
     out = OpenAICompatModel().plan_step(cfg, "sys", "usr")
@@ -38,9 +39,9 @@ def test_anthropic_adapter_builds_expected_request(monkeypatch: pytest.MonkeyPat
         captured["url"] = url
         captured["headers"] = headers
         captured["payload"] = payload
-        return {"content": [{"text": '{"summary":"x","actions":[{"kind":"emit","event_type":"done","message":"m","blocking":false}]}' }]}
+        return {"content": [{"text": '{"summary":"x","actions":[{"kind":"emit","event_type":"done","message":"m","blocking":false}]}' }]}, HttpTiming(latency_ms=1.0)
 
-    monkeypatch.setattr("hexi.adapters.model_anthropic_compat.post_json", fake_post_json)
+    monkeypatch.setattr("hexi.adapters.model_anthropic_compat.post_json_timed", fake_post_json)
 
     cfg = ModelConfig(provider="anthropic_compat", model="claude-3-5-sonnet", base_url="https://anth.example.com")
     out = AnthropicCompatModel().plan_step(cfg, "sys", "usr")
@@ -55,10 +56,54 @@ def test_anthropic_adapter_requires_text_in_response(monkeypatch: pytest.MonkeyP
     monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
 
     def fake_post_json(url, headers, payload):
-        return {"content": []}
+        return {"content": []}, HttpTiming(latency_ms=1.0)
 
-    monkeypatch.setattr("hexi.adapters.model_anthropic_compat.post_json", fake_post_json)
+    monkeypatch.setattr("hexi.adapters.model_anthropic_compat.post_json_timed", fake_post_json)
 
     cfg = ModelConfig(provider="anthropic_compat", model="claude-3-5-sonnet", base_url=None)
     with pytest.raises(RuntimeError):
         AnthropicCompatModel().plan_step(cfg, "sys", "usr")
+
+
+def test_openai_adapter_reports_usage_and_timing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+
+    def fake_post_json(url, headers, payload):
+        data = {
+            "model": "gpt-4o-mini-2024-07-18",
+            "choices": [{"message": {"content": "{}"}}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 30, "prompt_tokens_details": {"cached_tokens": 64}},
+        }
+        return data, HttpTiming(latency_ms=250.0, ttfb_ms=200.0, provider_processing_ms=180.0)
+
+    monkeypatch.setattr("hexi.adapters.model_openai_compat.post_json_timed", fake_post_json)
+
+    cfg = ModelConfig(provider="openai_compat", model="gpt-4o-mini")
+    result = OpenAICompatModel().plan_step_result(cfg, "sys", "usr")
+
+    assert result.text == "{}"
+    assert result.model == "gpt-4o-mini-2024-07-18"
+    assert (result.prompt_tokens, result.completion_tokens, result.cached_tokens) == (120, 30, 64)
+    assert result.latency_ms == 250.0
+    assert result.ttfb_ms == 200.0
+    assert result.provider_processing_ms == 180.0
+
+
+def test_anthropic_adapter_reports_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+
+    def fake_post_json(url, headers, payload):
+        data = {
+            "content": [{"text": "{}"}],
+            "usage": {"input_tokens": 10, "output_tokens": 5, "cache_read_input_tokens": 3},
+        }
+        return data, HttpTiming(latency_ms=90.0, ttfb_ms=80.0)
+
+    monkeypatch.setattr("hexi.adapters.model_anthropic_compat.post_json_timed", fake_post_json)
+
+    cfg = ModelConfig(provider="anthropic_compat", model="claude-3-5-sonnet")
+    result = AnthropicCompatModel().plan_step_result(cfg, "sys", "usr")
+
+    assert result.model == "claude-3-5-sonnet"
+    assert (result.prompt_tokens, result.completion_tokens, result.cached_tokens) == (10, 5, 3)
+    assert result.ttfb_ms == 80.0
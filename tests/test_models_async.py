@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from hexi.adapters.model_anthropic_compat import AnthropicCompatModel
+from hexi.adapters.model_openai_compat import OpenAICompatModel
+from hexi.adapters.model_openrouter_http import OpenRouterHTTPModel
+from hexi.core.domain import ModelConfig
+from hexi.core.ports import AsyncModelPort, AsyncModelResultPort
+from hexi.core.schemas import parse_action_plan
+from hexi.devtools.mock_llm import MockLLMConfig, MockLLMServer
+
+
+@pytest.fixture
+def server():
+    with MockLLMServer(MockLLMConfig(latency_ms=20)) as srv:
+        yield srv
+
+
+@pytest.fixture(autouse=True)
+def _keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+
+
+def test_adapters_expose_async_protocol() -> None:
+    assert isinstance(OpenAICompatModel(), AsyncModelResultPort)
+    assert isinstance(AnthropicCompatModel(), AsyncModelResultPort)
+    assert isinstance(OpenRouterHTTPModel(), AsyncModelPort)
+
+    class SyncOnly:
+        def plan_step(self, config, system_prompt, user_prompt):  # type: ignore[no-untyped-def]
+            return "{}"
+
+    assert not isinstance(SyncOnly(), AsyncModelPort)
+
+
+@pytest.mark.parametrize(
+    ("model_cls", "provider", "base_attr"),
+    [
+        (OpenAICompatModel, "openai_compat", "openai_base_url"),
+        (AnthropicCompatModel, "anthropic_compat", "anthropic_base_url"),
+    ],
+)
+def test_many_concurrent_async_calls_share_one_client(server: MockLLMServer, model_cls, provider, base_attr) -> None:
+    model = model_cls()
+    cfg = ModelConfig(provider=provider, model="m", base_url=getattr(server, base_attr))
+    calls = 40
+
+    async def run():  # type: ignore[no-untyped-def]
+        client = model._async_clients.get()
+        results = await asyncio.gather(*(model.aplan_step_result(cfg, "sys", "usr") for _ in range(calls)))
+        same_client = model._async_clients.get() is client
+        await model.aclose()
+        return results, same_client
+
+    results, same_client = asyncio.run(run())
+
+    assert len(results) == calls
+    assert all(parse_action_plan(r.text).summary == "mock plan" for r in results)
+    assert all(r.ttfb_ms is not None and r.completion_tokens for r in results)
+    assert same_client
+    assert server.stats.requests == calls
+
+
+def test_async_adapter_uses_injected_client(server: MockLLMServer) -> None:
+    async def run() -> str:
+        async with httpx.AsyncClient() as client:
+            model = OpenAICompatModel(async_client=client)
+            cfg = ModelConfig(provider="openai_compat", model="m", base_url=server.openai_base_url)
+            out = await model.aplan_step(cfg, "sys", "usr")
+            assert model._async_clients.get() is client
+            return out
+
+    assert asyncio.run(run()).startswith('{"summary"')
+
+
+def test_async_adapter_recreates_client_for_new_event_loop(server: MockLLMServer) -> None:
+    model = AnthropicCompatModel()
+    cfg = ModelConfig(provider="anthropic_compat", model="m", base_url=server.anthropic_base_url)
+
+    async def call() -> tuple[str, httpx.AsyncClient]:
+        return await model.aplan_step(cfg, "sys", "usr"), model._async_clients.get()
+
+    first, first_client = asyncio.run(call())
+    second, second_client = asyncio.run(call())
+
+    assert first == second
+    assert first_client is not second_client
+    # Each loop's client is closed when that loop shuts down.
+    assert first_client.is_closed and second_client.is_closed
+    assert model._async_clients._clients == {}
+
+
+def test_async_adapter_raises_on_http_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    with MockLLMServer(MockLLMConfig(error_rate=1.0, error_status=503)) as srv:
+        cfg = ModelConfig(provider="openai_compat", model="m", base_url=srv.openai_base_url)
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(OpenAICompatModel().aplan_step(cfg, "sys", "usr"))
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from hexi.core.patches import FilePatch, PatchError, apply_file_patch, parse_unified_diff
+
+ORIGINAL = "".join(f"line {n}\n" for n in range(1, 11))
+
+
+def _apply(diff: str, original: str | None = ORIGINAL) -> str:
+    (patch,) = parse_unified_diff(diff)
+    return apply_file_patch(original, patch)
+
+
+def test_unified_diff_applies_with_wrong_header_counts_and_shifted_lines() -> None:
+    # Header says line 2 with bogus counts; the context actually sits at lines 5-7.
+    diff = "--- a/f.txt\n+++ b/f.txt\n@@ -2,9 +2,9 @@\n line 5\n-line 6\n+line six\n line 7\n"
+    assert _apply(diff) == ORIGINAL.replace("line 6\n", "line six\n")
+
+
+def test_multi_file_diff_parses_paths_and_creation() -> None:
+    diff = (
+        "diff --git a/x.py b/x.py\nindex 1..2 100644\n--- a/x.py\n+++ b/x.py\n@@ -1 +1 @@\n-a\n+b\n"
+        "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,2 @@\n+one\n+two\n"
+    )
+    first, second = parse_unified_diff(diff)
+    assert (first.path, first.create, second.path, second.create) == ("x.py", False, "new.py", True)
+    assert apply_file_patch(None, second) == "one\ntwo\n"
+    assert second.line_counts() == (2, 0)
+
+
+def test_hunk_mismatch_reports_first_differing_line() -> None:
+    diff = "--- a/f.txt\n+++ b/f.txt\n@@ -3,2 +3,2 @@\n line 3\n-line 4 typo\n+line four\n"
+    with pytest.raises(PatchError) as excinfo:
+        _apply(diff)
+    assert str(excinfo.value) == (
+        "f.txt: hunk 1 (@@ -3,2 +3,2 @@) does not apply: line 4 is 'line 4', expected 'line 4 typo'"
+    )
+
+
+def test_diff_preserves_crlf_and_missing_final_newline() -> None:
+    diff = "--- a/f.txt\n+++ b/f.txt\n@@ -1,2 +1,2 @@\n a\n-b\n+c\n\\ No newline at end of file\n"
+    assert _apply(diff, "a\r\nb") == "a\r\nc"
+
+
+def test_search_replace_edits_require_a_unique_match() -> None:
+    patch = FilePatch(path="f.txt", edits=(("line 2\nline 3\n", "middle\n"), ("line 10", "end")))
+    assert apply_file_patch(ORIGINAL, patch) == ORIGINAL.replace("line 2\nline 3\n", "middle\n").replace(
+        "line 10", "end"
+    )
+    with pytest.raises(PatchError, match="edit 1 search text matches 2 times"):
+        apply_file_patch(ORIGINAL, FilePatch(path="f.txt", edits=(("line 1", "x"),)))
+    with pytest.raises(PatchError, match="edit 1 search text not found"):
+        apply_file_patch(ORIGINAL, FilePatch(path="f.txt", edits=(("nope", "x"),)))
+    with pytest.raises(PatchError, match="file does not exist"):
+        apply_file_patch(None, FilePatch(path="f.txt", edits=(("a", "b"),)))
+
+
+def test_deleting_files_is_rejected() -> None:
+    with pytest.raises(PatchError, match="deleting files is not supported"):
+        parse_unified_diff("--- a/f.txt\n+++ /dev/null\n@@ -1 +0,0 @@\n-x\n")
@@ -1,5 +1,5 @@
 from hexi.core.domain import Policy
-from hexi.core.policy import command_allowed
+from hexi.core.policy import command_allowed, compile_policy
 
 
 def test_policy_allows_prefix_match() -> None:
@@ -15,3 +15,41 @@ def test_policy_rejects_non_allowlisted_command() -> None:
 def test_policy_rejects_disallowed_base_command_even_if_allowlisted() -> None:
     policy = Policy(allow_commands=["curl"])
     assert not command_allowed("curl https://example.com", policy)
+
+
+def test_compiled_policy_reports_longest_matching_rule() -> None:
+    compiled = compile_policy(Policy(allow_commands=["git", "git  status", "pytest"]))
+    decision = compiled.decide("git status --short")
+    assert decision.allowed and decision.rule == "git status"
+    assert compiled.decide("git log").rule == "git"
+    assert not compiled.decide("gitk").allowed
+    assert compiled.decide("pytest").rule == "pytest"
+
+
+def test_compiled_policy_matches_shlex_tokens() -> None:
+    compiled = compile_policy(Policy(allow_commands=["python -m pytest"]))
+    assert compiled.allows("python -m 'pytest' -q")
+    assert not compiled.allows("python -m pytest-xdist")
+    unparseable = compiled.decide("python -m pytest 'unterminated")
+    assert not unparseable.allowed and "cannot be parsed" in unparseable.reason
+    assert compiled.decide("   ").reason == "empty command"
+
+
+def test_quoted_allowlist_entry_matches_quoted_command() -> None:
+    policy = Policy(allow_commands=['echo "hello world"', "git log --format='%h %s'"])
+    assert command_allowed('echo "hello world"', policy)
+    assert command_allowed("echo 'hello world' again", policy)
+    assert not command_allowed("echo hello", policy)
+    assert compile_policy(policy).decide("git log '--format=%h %s' -3").rule == "git log --format='%h %s'"
+    # An entry shlex cannot parse still compiles, split on whitespace.
+    assert command_allowed("make x", Policy(allow_commands=["make", "say 'unterminated"]))
+
+
+def test_compiled_policy_is_shared_and_memoized() -> None:
+    first = compile_policy(Policy(allow_commands=["make test"]))
+    second = compile_policy(Policy(allow_commands=["make test"], max_diff_chars=10))
+    assert first is second
+    first.decide("make test")
+    second.decide("make test")
+    assert first.decide.cache_info().hits >= 1
+    assert compile_policy(Policy(allow_commands=["make"])) is not first
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from hexi.adapters import providers
+from hexi.adapters.memory_file import tomllib
+from hexi.adapters.model_openai_compat import OpenAICompatModel
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache() -> Iterator[None]:
+    providers.clear_cache()
+    yield
+    providers.clear_cache()
+
+
+def _fake_entry_points(monkeypatch: pytest.MonkeyPatch, *points: EntryPoint) -> None:
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points", lambda group: [ep for ep in points if ep.group == group]
+    )
+
+
+def test_builtin_provider_resolves_without_entry_point_scan(monkeypatch: pytest.MonkeyPatch) -> None:
+    def no_scan() -> dict[str, EntryPoint]:
+        raise AssertionError("built-in providers must not scan entry points")
+
+    monkeypatch.setattr(providers, "_plugin_entry_points", no_scan)
+    assert providers.load_provider("openai_compat") is OpenAICompatModel
+
+
+def test_get_model_caches_one_instance_per_provider() -> None:
+    first = providers.get_model("openai_compat")
+    assert isinstance(first, OpenAICompatModel)
+    assert providers.get_model("openai_compat") is first
+    providers.clear_cache()
+    assert providers.get_model("openai_compat") is not first
+
+
+def test_get_model_rebuilds_the_adapter_when_the_credential_changes() -> None:
+    providers.clear_cache()
+    first = providers.get_model("openai_compat", "key-1")
+    assert providers.get_model("openai_compat", "key-1") is first
+    assert providers.get_model("openai_compat", "key-2") is not first
+    providers.clear_cache()
+
+
+def test_plugin_provider_is_discovered_through_entry_points(monkeypatch: pytest.MonkeyPatch) -> None:
+    _fake_entry_points(
+        monkeypatch,
+        EntryPoint(name="acme", value="collections:OrderedDict", group=providers.ENTRY_POINT_GROUP),
+        EntryPoint(name="openai_compat", value="collections:Counter", group=providers.ENTRY_POINT_GROUP),
+        EntryPoint(name="other", value="collections:deque", group="other.group"),
+    )
+    assert providers.available_providers() == [*providers.BUILTIN_PROVIDERS, "acme"]
+    assert isinstance(providers.get_model("acme"), OrderedDict)
+    # A plugin cannot shadow a built-in provider name.
+    assert isinstance(providers.get_model("openai_compat"), OpenAICompatModel)
+
+
+def test_unknown_provider_lists_available(monkeypatch: pytest.MonkeyPatch) -> None:
+    _fake_entry_points(monkeypatch)
+    with pytest.raises(providers.UnknownProviderError, match="Available: openrouter_http"):
+        providers.get_model("nope")
+
+
+def test_pyproject_entry_points_match_builtin_map() -> None:
+    pyproject = tomllib.loads((Path(__file__).resolve().parents[1] / "pyproject.toml").read_text(encoding="utf-8"))
+    assert pyproject["project"]["entry-points"][providers.ENTRY_POINT_GROUP] == providers.BUILTIN_PROVIDERS
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.rate_limit import ProviderScheduler, RateLimitedModel, get_scheduler
+from hexi.core.domain import ModelConfig, ModelResult, RateLimits
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_requests_per_minute_bucket_delays_after_burst() -> None:
+    clock = FakeClock()
+    scheduler = ProviderScheduler("p", RateLimits(requests_per_minute=2), clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        scheduler.release(scheduler.acquire(estimated_tokens=1))
+
+    assert clock.sleeps == [pytest.approx(30.0)]
+
+
+def test_tokens_per_minute_reconciles_actual_usage() -> None:
+    clock = FakeClock()
+    scheduler = ProviderScheduler("p", RateLimits(tokens_per_minute=1000), clock=clock, sleep=clock.sleep)
+
+    lease = scheduler.acquire(estimated_tokens=900)
+    scheduler.release(lease, actual_tokens=100)
+    scheduler.release(scheduler.acquire(estimated_tokens=800))
+
+    assert clock.sleeps == []
+
+
+def test_max_in_flight_queues_callers_in_arrival_order() -> None:
+    scheduler = ProviderScheduler("p", RateLimits(max_in_flight=1))
+    first = scheduler.acquire(estimated_tokens=1)
+    order: list[int] = []
+
+    def worker(n: int) -> None:
+        lease = scheduler.acquire(estimated_tokens=1)
+        order.append(n)
+        scheduler.release(lease)
+
+    threads = []
+    for n in range(4):
+        t = threading.Thread(target=worker, args=(n,))
+        t.start()
+        threads.append(t)
+        while scheduler.queued < n + 1:
+            time.sleep(0.001)
+
+    assert scheduler.in_flight == 1
+    scheduler.release(first)
+    for t in threads:
+        t.join(timeout=5)
+
+    assert order == [0, 1, 2, 3]
+    assert scheduler.in_flight == 0
+
+
+def test_async_acquire_queues_in_order_and_leaves_queue_on_cancel() -> None:
+    scheduler = ProviderScheduler("p", RateLimits(max_in_flight=1))
+
+    async def scenario() -> list[int]:
+        first = await scheduler.aacquire(estimated_tokens=1)
+        order: list[int] = []
+
+        async def worker(n: int) -> None:
+            lease = await scheduler.aacquire(estimated_tokens=1)
+            order.append(n)
+            await asyncio.sleep(0)
+            scheduler.release(lease)
+
+        tasks = [asyncio.create_task(worker(n)) for n in range(3)]
+        while scheduler.queued < 3:
+            await asyncio.sleep(0)
+        tasks[1].cancel()
+        await asyncio.gather(tasks[1], return_exceptions=True)
+        assert scheduler.queued == 2
+
+        scheduler.release(first)
+        await asyncio.wait_for(asyncio.gather(tasks[0], tasks[2]), timeout=5)
+        return order
+
+    assert asyncio.run(scenario()) == [0, 2]
+    assert (scheduler.in_flight, scheduler.queued) == (0, 0)
+
+
+def test_async_acquire_is_woken_by_thread_release_and_sleeps_on_loop() -> None:
+    clock = FakeClock()
+    slept: list[float] = []
+
+    async def async_sleep(seconds: float) -> None:
+        slept.append(seconds)
+
+    scheduler = ProviderScheduler(
+        "p", RateLimits(max_in_flight=1, requests_per_minute=1), clock=clock, sleep=clock.sleep, async_sleep=async_sleep
+    )
+    held = scheduler.acquire(estimated_tokens=1)
+
+    async def scenario() -> None:
+        waiter = asyncio.create_task(scheduler.aacquire(estimated_tokens=1))
+        while scheduler.queued < 1:
+            await asyncio.sleep(0)
+        threading.Thread(target=scheduler.release, args=(held,)).start()
+        scheduler.release(await asyncio.wait_for(waiter, timeout=5))
+
+    asyncio.run(scenario())
+    assert clock.sleeps == []
+    assert slept == [pytest.approx(60.0)]
+    assert scheduler.in_flight == 0
+
+
+def test_shared_state_file_spans_scheduler_instances(tmp_path: Path) -> None:
+    clock = FakeClock()
+    limits = RateLimits(requests_per_minute=1, shared=True)
+    a = ProviderScheduler("p", limits, state_dir=tmp_path, clock=clock, sleep=clock.sleep)
+    b = ProviderScheduler("p", limits, state_dir=tmp_path, clock=clock, sleep=clock.sleep)
+
+    a.release(a.acquire(estimated_tokens=1))
+    b.release(b.acquire(estimated_tokens=1))
+
+    assert clock.sleeps == [pytest.approx(60.0)]
+    assert (tmp_path / "p.json").exists()
+
+
+def test_rate_limited_model_reports_queue_wait() -> None:
+    class Inner:
+        def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+            return ModelResult(text="{}", provider=config.provider, model=config.model, prompt_tokens=5, completion_tokens=5)
+
+    scheduler = ProviderScheduler("openai_compat", RateLimits(max_in_flight=2))
+    model = RateLimitedModel(Inner(), scheduler)
+    result = model.plan_step_result(ModelConfig(provider="openai_compat", model="m"), "sys", "usr")
+
+    assert result.text == "{}"
+    assert result.queue_wait_ms is not None and result.queue_wait_ms >= 0
+    assert scheduler.in_flight == 0
+
+
+def test_get_scheduler_is_process_wide_per_provider() -> None:
+    limits = RateLimits(max_in_flight=3)
+    assert get_scheduler("x-provider", limits) is get_scheduler("x-provider", limits)
+    assert get_scheduler("x-provider", RateLimits(max_in_flight=4)).limits.max_in_flight == 4
+
+
+def test_limits_change_keeps_open_leases_and_admits_queued_callers() -> None:
+    scheduler = get_scheduler("y-provider", RateLimits(max_in_flight=1))
+    held = scheduler.acquire(estimated_tokens=1)
+    admitted = threading.Event()
+
+    def worker() -> None:
+        lease = scheduler.acquire(estimated_tokens=1)
+        admitted.set()
+        scheduler.release(lease)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    while scheduler.queued < 1:
+        time.sleep(0.001)
+
+    assert get_scheduler("y-provider", RateLimits(max_in_flight=2)) is scheduler
+    assert admitted.wait(timeout=5)
+    t.join(timeout=5)
+    assert scheduler.in_flight == 1  # the lease taken under the old limits still counts
+    scheduler.release(held)
+    assert scheduler.in_flight == 0
+
+
+def test_async_acquire_reserves_shared_buckets_off_the_event_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = ProviderScheduler("p", RateLimits(requests_per_minute=10, shared=True), state_dir=tmp_path)
+    reserve = scheduler._store.reserve
+    threads: list[threading.Thread] = []
+
+    def record_thread(*args: object) -> float:
+        threads.append(threading.current_thread())
+        return reserve(*args)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(scheduler._store, "reserve", record_thread)
+
+    async def scenario() -> None:
+        scheduler.release(await scheduler.aacquire(estimated_tokens=1))
+
+    asyncio.run(scenario())
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+
+
+def test_memory_loads_rate_limits_from_provider_block(tmp_path: Path) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    assert mem.load_rate_limits("openai_compat").enabled is False
+
+    mem.local_config_path.write_text(
+        """
+[providers.openai_compat]
+requests_per_minute = 60
+tokens_per_minute = 90000
+max_in_flight = 2
+
+[ratelimit]
+shared = true
+""".strip(),
+        encoding="utf-8",
+    )
+    limits = mem.load_rate_limits("openai_compat")
+    assert limits == RateLimits(requests_per_minute=60.0, tokens_per_minute=90000.0, max_in_flight=2, shared=True)
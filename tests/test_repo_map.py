@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters.repo_map import RepoMap
+from hexi.adapters.symbol_index import SymbolIndex
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=path, check=True, capture_output=True)
+
+
+def _repo(tmp_path: Path) -> RepoMap:
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "Test")
+    for rel, text in {
+        "README.md": "# demo\n",
+        "src/app/core.py": "class Engine:\n    def start(self):\n        pass\n\n\ndef build():\n    pass\n\n\ndef _private():\n    pass\n",
+        "src/app/util.py": "def slugify(text):\n    return text\n",
+        "tests/test_core.py": "def test_build():\n    pass\n",
+    }.items():
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(text, encoding="utf-8")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    hexi_dir = tmp_path / ".hexi"
+    return RepoMap(hexi_dir, tmp_path, SymbolIndex(hexi_dir, tmp_path))
+
+
+def _spy_scans(monkeypatch: pytest.MonkeyPatch, repo_map: RepoMap) -> list[set[str] | None]:
+    scans: list[set[str] | None] = []
+    original = repo_map._scan
+
+    def spy(dirs: set[str] | None) -> dict:
+        scans.append(dirs)
+        return original(dirs)
+
+    monkeypatch.setattr(repo_map, "_scan", spy)
+    return scans
+
+
+def test_render_lists_directories_and_public_symbols(tmp_path: Path) -> None:
+    text = _repo(tmp_path).render(2000)
+
+    assert text.splitlines()[0] == "4 files; top level: src/ (2), tests/ (1), README.md"
+    assert "src/app/ 2 (.py 2)" in text
+    assert "src/app/core.py: Engine, build" in text
+    assert "_private" not in text and "start" not in text
+    # Application code ranks above tests.
+    assert text.index("src/app/core.py") < text.index("tests/test_core.py")
+
+
+def test_render_respects_the_char_budget(tmp_path: Path) -> None:
+    repo_map = _repo(tmp_path)
+    for budget in (20, 80, 150):
+        assert len(repo_map.render(budget)) <= budget
+
+
+def test_unchanged_snapshot_is_served_from_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    first = _repo(tmp_path).render(500)
+    # A new instance (the next `hexi run`) reuses the rendered map from disk.
+    hexi_dir = tmp_path / ".hexi"
+    repo_map = RepoMap(hexi_dir, tmp_path, SymbolIndex(hexi_dir, tmp_path))
+    scans = _spy_scans(monkeypatch, repo_map)
+    monkeypatch.setattr(repo_map.symbols, "definitions", lambda: pytest.fail("symbols must not be re-read"))
+
+    assert repo_map.render(500) == first
+    assert scans == []
+
+
+def test_changes_rescan_only_affected_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    repo_map = _repo(tmp_path)
+    repo_map.render(500)
+    scans = _spy_scans(monkeypatch, repo_map)
+
+    (tmp_path / "src" / "app" / "util.py").write_text("def slugify(text):\n    return text\n\n\ndef titleize():\n    pass\n")
+    assert "src/app/util.py: slugify, titleize" in repo_map.render(500)
+    assert scans == [{"src/app"}]
+
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("guide\n", encoding="utf-8")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "docs")
+    text = repo_map.render(500)
+    # Committing moves HEAD: paths from both the old status and the new commit are rescanned.
+    assert scans[-1] == {"src/app", "docs"}
+    assert text.splitlines()[0] == "5 files; top level: docs/ (1), src/ (2), tests/ (1), README.md"
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.memory_sqlite import SqliteMemory
+from hexi.adapters.runlog_follow import ChangeWatcher, RunlogFollower
+from hexi.adapters.runlog_store import SegmentedRunlogWriter, SegmentPolicy
+from hexi.adapters.runlog_writer import FlushPolicy
+from hexi.cli import app
+from hexi.core.domain import Event
+
+runner = CliRunner()
+
+
+def _record(n: int, event_type: str = "progress", run_id: str = "r1") -> dict:
+    return {"type": event_type, "one_line_summary": f"event {n}", "blocking": False, "payload": {}, "run_id": run_id, "seq": n}
+
+
+def _append(path: Path, data: str) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.write(data)
+
+
+def test_follower_reads_only_appended_complete_records(tmp_path: Path) -> None:
+    runlog = tmp_path / "runlog.jsonl"
+    runlog.write_text(json.dumps(_record(1)) + "\n" + '{"type": "partial', encoding="utf-8")
+    follower = RunlogFollower(tmp_path)
+    assert follower.poll() == []
+
+    _append(runlog, '", "one_line_summary": "p"}\n' + json.dumps(_record(2)) + "\n")
+    lines = follower.poll()
+    assert [json.loads(line).get("seq") for line in lines] == [None, 2]
+    assert follower.poll() == []
+
+
+def test_follower_continues_across_segment_rotation(tmp_path: Path) -> None:
+    hexi_dir = tmp_path / ".hexi"
+    writer = SegmentedRunlogWriter(hexi_dir / "runlog", FlushPolicy(every_events=1), SegmentPolicy(compression="gzip"))
+    writer.write(_record(1))
+    writer.flush()
+    follower = RunlogFollower(hexi_dir)
+
+    writer.write(_record(2))
+    writer.flush()
+    writer.rotate()
+    writer.write(_record(3))
+    writer.close()
+
+    assert [json.loads(line)["seq"] for line in follower.poll()] == [2, 3]
+    assert follower.poll() == []
+
+
+def test_change_watcher_wakes_on_append(tmp_path: Path) -> None:
+    with ChangeWatcher([tmp_path]) as watcher:
+        if not watcher.uses_inotify:
+            pytest.skip("inotify unavailable")
+        timer = threading.Timer(0.05, lambda: _append(tmp_path / "runlog.jsonl", "{}\n"))
+        timer.start()
+        started = time.monotonic()
+        watcher.wait(5.0)
+        timer.join()
+    assert time.monotonic() - started < 4.0
+
+
+def _collect(records, count: int) -> list[dict]:
+    out: list[dict] = []
+    for record in records:
+        out.append(record)
+        if len(out) == count:
+            break
+    return out
+
+
+@pytest.mark.parametrize("memory_cls", [FileMemory, SqliteMemory])
+def test_memory_follow_streams_new_filtered_events(tmp_path: Path, memory_cls: type[FileMemory]) -> None:
+    mem = memory_cls(tmp_path)
+    mem.ensure_initialized()
+    mem.append_runlog(Event(type="error", one_line_summary="old", blocking=True, payload={}, run_id="r1", seq=1))
+    cursor = mem.runlog_cursor()
+
+    def produce() -> None:
+        writer = memory_cls(tmp_path)
+        for seq, (event_type, run_id) in enumerate([("progress", "r1"), ("error", "r2"), ("error", "r1")], start=2):
+            writer.append_runlog(
+                Event(type=event_type, one_line_summary=f"new {seq}", blocking=False, payload={}, run_id=run_id, seq=seq)
+            )
+            writer.flush_runlog()
+        writer.close()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    followed = _collect(mem.follow_runlog(cursor, types={"error"}, run_id="r1", poll_interval=0.05), 1)
+    producer.join()
+    mem.close()
+
+    assert [(r["one_line_summary"], r["seq"]) for r in followed] == [("new 4", 4)]
+
+
+def test_cli_log_follow_prints_history_then_new_events_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    _append(mem.runlog_path, json.dumps(_record(1)) + "\n")
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, True))
+
+    original_query = mem.query_runlog
+    original_follow = mem.follow_runlog
+
+    seqs = iter(range(2, 100))
+
+    def query_then_append(**kwargs):
+        # The first record lands after the cursor but before the history query: it must print once.
+        _append(mem.runlog_path, json.dumps(_record(next(seqs))) + "\n")
+        events = original_query(**kwargs)
+        _append(mem.runlog_path, json.dumps(_record(next(seqs), "done")) + "\n")
+        return events
+
+    monkeypatch.setattr(mem, "query_runlog", query_then_append)
+    monkeypatch.setattr(mem, "follow_runlog", lambda *a, **kw: original_follow(*a, **kw, stop=lambda: True))
+
+    result = runner.invoke(app, ["log", "--follow", "--json"])
+    assert result.exit_code == 0
+    assert [json.loads(line)["seq"] for line in result.stdout.splitlines()] == [1, 2, 3]
+
+    result = runner.invoke(app, ["--console", "plain", "log", "--follow", "--type", "done"])
+    assert result.exit_code == 0
+    assert "Hexi Log" in result.stdout  # history: event 3
+    assert "[DONE] event 5" in result.stdout
+    assert "event 4" not in result.stdout
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.runlog_index import RunlogIndex
+from hexi.adapters.runlog_store import SegmentedRunlogWriter, SegmentPolicy
+from hexi.adapters.runlog_writer import FlushPolicy
+from hexi.cli import app
+
+runner = CliRunner()
+
+
+def _run(n: int, ts: float, fail: bool = False) -> list[dict]:
+    events = [
+        {"type": "progress", "one_line_summary": "Starting single-step run", "blocking": False, "payload": {"n": n}},
+        {"type": "artifact", "one_line_summary": f"Read file {n}", "blocking": False, "payload": {}},
+    ]
+    if fail:
+        events.append({"type": "error", "one_line_summary": f"Action failed {n}", "blocking": True, "payload": {}})
+    events.append({"type": "done", "one_line_summary": "Run completed", "blocking": fail, "payload": {}})
+    return [{**event, "ts": ts + i} for i, event in enumerate(events)]
+
+
+def _write(path: Path, records: list[dict], mode: str = "a") -> None:
+    with path.open(mode, encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+@pytest.fixture
+def hexi_dir(tmp_path: Path) -> Path:
+    d = tmp_path / ".hexi"
+    d.mkdir()
+    records: list[dict] = []
+    for n in range(1, 6):
+        records += _run(n, ts=1000.0 * n, fail=n in (2, 5))
+    _write(d / "runlog.jsonl", records, "w")
+    return d
+
+
+def test_index_groups_runs_and_filters(hexi_dir: Path) -> None:
+    index = RunlogIndex(hexi_dir)
+    assert index.refresh() == 17
+
+    assert [run.run_id for run in index.runs()] == ["1", "2", "3", "4", "5"]
+    errors = index.query(types={"error"})
+    assert [(e.run_id, e.record["one_line_summary"]) for e in errors] == [("2", "Action failed 2"), ("5", "Action failed 5")]
+    assert [e.record["type"] for e in index.query(run_id="3")] == ["progress", "artifact", "done"]
+    assert [e.run_id for e in index.query(last_runs=2, types={"done"})] == ["4", "5"]
+    assert [e.ts for e in index.query(since=4001.5)] == [4002.0, 5000.0, 5001.0, 5002.0, 5003.0]
+    assert len(index.query(limit=3)) == 3
+
+
+def test_refresh_is_incremental_and_rebuilds_after_truncation(hexi_dir: Path) -> None:
+    index = RunlogIndex(hexi_dir)
+    index.refresh()
+    _write(hexi_dir / "runlog.jsonl", _run(6, ts=6000.0))
+    assert index.refresh() == 3
+    assert index.refresh() == 0
+    assert index.runs()[-1].events == 3
+
+    _write(hexi_dir / "runlog.jsonl", _run(1, ts=1.0), "w")
+    assert index.refresh() == 3
+    assert [run.run_id for run in index.runs()] == ["1"]
+
+
+def test_queries_do_not_scan_the_whole_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    hexi_dir = tmp_path / ".hexi"
+    hexi_dir.mkdir()
+    records: list[dict] = []
+    for n in range(1, 701):  # enough runs to grow run_ids.idx past its initial size
+        records += [{**r, "run_id": f"R{n:05d}"} for r in _run(n, ts=10.0 * n, fail=n % 100 == 0)]
+    _write(hexi_dir / "runlog.jsonl", records, "w")
+    index = RunlogIndex(hexi_dir)
+    index.refresh()
+    monkeypatch.setattr(index, "runs", lambda: pytest.fail("queries must not load every run"))
+
+    reads: list[int] = []
+    original_open = Path.open
+
+    def counting_open(self: Path, *args, **kwargs):  # type: ignore[no-untyped-def]
+        handle = original_open(self, *args, **kwargs)
+        if self == index.events_path:
+            read = handle.read
+            handle.read = lambda size=-1: reads.append(size) or read(size)  # type: ignore[method-assign]
+        return handle
+
+    monkeypatch.setattr(Path, "open", counting_open)
+    assert [e.record["payload"] for e in index.query(run_id="R00350", types={"progress"})] == [{"n": 350}]
+    assert index.find_run("R99999") is None
+    assert [e.run_id for e in index.query(types={"error"}, limit=2)] == ["R00600", "R00700"]
+    assert [e.ts for e in index.query(since=6995.0, types={"done"})] == [7003.0]
+    # Each query touched only the chunks it needed, never the full events.idx.
+    assert max(reads) < (hexi_dir / "index" / "runlog" / "events.idx").stat().st_size
+
+
+def test_index_follows_segments_through_rotation(tmp_path: Path) -> None:
+    hexi_dir = tmp_path / ".hexi"
+    writer = SegmentedRunlogWriter(
+        hexi_dir / "runlog", FlushPolicy(every_events=1), SegmentPolicy(compression="gzip")
+    )
+    for record in _run(1, ts=10.0):
+        writer.write(record)
+    writer.flush()
+    index = RunlogIndex(hexi_dir)
+    assert index.refresh() == 3
+
+    writer.rotate()
+    for record in _run(2, ts=20.0, fail=True):
+        writer.write(record)
+    writer.close()
+
+    assert index.refresh() == 4
+    assert [e.record["one_line_summary"] for e in index.query(run_id="1")] == [
+        "Starting single-step run",
+        "Read file 1",
+        "Run completed",
+    ]
+    assert [e.run_id for e in index.query(types={"error"})] == ["2"]
+
+
+def test_index_rebuilds_when_an_indexed_source_is_removed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    hexi_dir = tmp_path / ".hexi"
+    hexi_dir.mkdir()
+    _write(hexi_dir / "runlog.jsonl", _run(1, ts=10.0))
+    writer = SegmentedRunlogWriter(hexi_dir / "runlog", FlushPolicy(every_events=1), SegmentPolicy())
+    for record in _run(2, ts=20.0, fail=True):
+        writer.write(record)
+    writer.close()
+    index = RunlogIndex(hexi_dir)
+    assert index.refresh() == 7
+
+    (hexi_dir / "runlog.jsonl").unlink()
+    assert [e.record["payload"] for e in index.query(types={"progress"})] == [{"n": 2}]
+
+    # Removed after the refresh that precedes the read: the query rebuilds and retries.
+    _write(hexi_dir / "runlog.jsonl", _run(3, ts=30.0))
+    assert index.refresh() == 3
+    refresh = RunlogIndex.refresh
+    calls = []
+
+    def delete_then_refresh(self: RunlogIndex) -> int:
+        calls.append(1)
+        added = refresh(self)
+        if len(calls) == 1:
+            (hexi_dir / "runlog.jsonl").unlink()
+        return added
+
+    monkeypatch.setattr(RunlogIndex, "refresh", delete_then_refresh)
+    assert [e.record["one_line_summary"] for e in index.query(types={"done"})] == ["Run completed"]
+    assert len(calls) == 2
+
+
+def test_query_without_hexi_dir_writes_nothing(tmp_path: Path) -> None:
+    assert RunlogIndex(tmp_path / ".hexi").query(types={"error"}) == []
+    assert not (tmp_path / ".hexi").exists()
+
+
+def test_cli_log_filters_and_json_output(hexi_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(hexi_dir.parent)
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, hexi_dir.parent, True))
+
+    result = runner.invoke(app, ["log", "--type", "error", "--json"])
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [line["one_line_summary"] for line in lines] == ["Action failed 2", "Action failed 5"]
+
+    result = runner.invoke(app, ["log", "--last", "1"])
+    assert result.exit_code == 0
+    assert "Action failed 5" in result.stdout
+    assert "Read file 4" not in result.stdout
+
+    result = runner.invoke(app, ["log", "--type", "oops"])
+    assert result.exit_code == 2
+
+
+def test_cli_log_in_uninitialized_dir_creates_no_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(tmp_path)
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, False))
+
+    result = runner.invoke(app, ["log"])
+
+    assert result.exit_code == 0
+    assert "no matching events" in result.stdout
+    assert not (tmp_path / ".hexi").exists()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.runlog_stats import LogHistogram, RunlogStats, payload_bytes
+from hexi.cli import app
+
+runner = CliRunner()
+DAY = 1_767_225_600.0  # 2026-01-01T00:00:00Z
+
+
+def _run(
+    run_id: str,
+    start: float,
+    duration_s: float,
+    latency_ms: float,
+    command_rc: int | None = None,
+    model_name: str = "gpt-4o-mini",
+) -> list[dict]:
+    model = {"provider": "openai_compat", "model": model_name, "latency_ms": latency_ms}
+    events = [
+        {"type": "progress", "one_line_summary": "Starting single-step run", "payload": {}},
+        {"type": "progress", "one_line_summary": "Action plan ready: s", "payload": {"actions": 1, "model": model}},
+        {"type": "artifact", "one_line_summary": "Read a.py", "payload": {"content": "x" * 10, "action": "read", "duration_ms": 2.0}},
+    ]
+    if command_rc is not None:
+        events.append(
+            {
+                "type": "artifact",
+                "one_line_summary": "Ran command: pytest",
+                "payload": {"command": "pytest", "exit_code": command_rc, "action": "run", "duration_ms": 500.0},
+            }
+        )
+    success = command_rc in (None, 0)
+    events.append({"type": "done", "one_line_summary": "Run completed", "payload": {"success": success}})
+    out = []
+    for i, event in enumerate(events):
+        at = start + duration_s * i / (len(events) - 1)
+        out.append({**event, "blocking": False, "run_id": run_id, "seq": i + 1, "ts": at, "mono": at - DAY})
+    return out
+
+
+def test_log_histogram_quantiles_are_within_relative_accuracy() -> None:
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(20000)]
+    hist = LogHistogram(relative_accuracy=0.01)
+    for value in values:
+        hist.add(value)
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert hist.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert len(hist.buckets) < 1200
+    assert hist.max == values[-1]
+
+
+def test_payload_bytes_counts_blob_references_at_blob_size() -> None:
+    assert payload_bytes({"stdout": {"$blob": "sha256:" + "0" * 64, "bytes": 9000}}) == len("stdout") + 9000
+    # Payload data that merely has a `$blob` key is counted as data.
+    assert payload_bytes({"$blob": "user text", "bytes": 9000}) == len("$blob") + len("user text") + len("bytes") + 4
+
+
+def test_stats_group_steps_latency_actions_and_commands() -> None:
+    records = (
+        _run("r1", DAY + 10, 2.0, 100.0, command_rc=0)
+        + _run("r2", DAY + 20, 4.0, 300.0, command_rc=1)
+        + _run("r3", DAY + 86400 + 5, 1.0, 200.0)
+        + _run("r4", DAY + 30, 1.0, 50.0, model_name="gpt-4o")
+    )
+    data = RunlogStats().add_all(records).to_dict()
+
+    assert data["runs"] == 4 and data["failed_runs"] == 1
+    steps = {row["day"]: row for row in data["step_duration_ms"] if row["model"] == "gpt-4o-mini"}
+    assert steps["2026-01-01"]["count"] == 2
+    assert steps["2026-01-01"]["max"] == pytest.approx(4000.0)
+    assert steps["2026-01-02"]["p50"] == pytest.approx(1000.0, rel=0.01)
+    latency = {row["day"]: row for row in data["model_latency_ms"] if row["model"] == "gpt-4o-mini"}
+    assert latency["2026-01-01"]["mean"] == pytest.approx(200.0)
+    assert {(row["model"], row["action"], row["day"], row["count"], row["failures"]) for row in data["actions"]} == {
+        ("gpt-4o-mini", "read", "2026-01-01", 2, 0),
+        ("gpt-4o-mini", "read", "2026-01-02", 1, 0),
+        ("gpt-4o-mini", "run", "2026-01-01", 2, 1),
+        ("gpt-4o", "read", "2026-01-01", 1, 0),
+    }
+    assert {row["provider"] for row in data["actions"]} == {"openai_compat"}
+    assert data["commands"] == [{"command": "pytest", "runs": 2, "failures": 1, "failure_rate": 0.5}]
+    sizes = {row["type"]: row for row in data["payload_bytes"]}
+    assert sizes["done"]["events"] == 4
+
+    recent = RunlogStats(since=DAY + 86400).add_all(records).to_dict()
+    assert recent["runs"] == 1 and recent["commands"] == []
+
+
+def test_evicted_open_runs_are_not_counted_again(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("hexi.adapters.runlog_stats.MAX_OPEN_RUNS", 2)
+    runs = [_run(f"r{n}", DAY + n, 1.0, 100.0) for n in range(3)]
+    # Interleave: every run starts before any finishes, so r0 is evicted first.
+    records = [event for step in zip(*runs) for event in step]
+
+    data = RunlogStats().add_all(records).to_dict()
+
+    assert data["runs"] == 3
+    assert sum(row["count"] for row in data["step_duration_ms"]) == 2
+
+
+def test_cli_stats_json_and_table(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    with mem.runlog_path.open("a", encoding="utf-8") as f:
+        for record in _run("r1", DAY, 1.0, 150.0, command_rc=2):
+            f.write(json.dumps(record) + "\n")
+    monkeypatch.setattr("hexi.cli_common.bootstrap_memory", lambda: (mem, tmp_path, True))
+
+    result = runner.invoke(app, ["stats", "--json"])
+    assert result.exit_code == 0
+    data = json.loads(result.stdout)
+    assert data["commands"][0]["failure_rate"] == 1.0
+
+    result = runner.invoke(app, ["stats"])
+    assert result.exit_code == 0
+    assert "Step duration" in result.stdout
+    assert "pytest" in result.stdout
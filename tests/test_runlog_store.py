@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.runlog_store import SegmentedRunlogWriter, SegmentPolicy, iter_runlog, read_manifest
+from hexi.adapters.runlog_writer import FlushPolicy
+from hexi.core.domain import Event
+
+EAGER = FlushPolicy(every_events=1, interval_ms=60_000)
+
+
+def test_size_rotation_compresses_closed_segments_and_lists_them(tmp_path: Path) -> None:
+    seg_dir = tmp_path / ".hexi/runlog"
+    with SegmentedRunlogWriter(seg_dir, EAGER, SegmentPolicy(max_bytes=200, compression="gzip")) as writer:
+        for n in range(20):
+            writer.write({"n": n, "pad": "x" * 40})
+        writer.flush()
+
+    manifest = read_manifest(seg_dir)
+    assert len(manifest["segments"]) >= 3
+    first = manifest["segments"][0]
+    assert first["name"] == "000001.jsonl.gz" and first["codec"] == "gzip"
+    with gzip.open(seg_dir / first["name"], "rb") as f:
+        assert len(f.read().splitlines()) == first["events"]
+    assert sum(s["events"] for s in manifest["segments"]) <= 20
+    assert [r["n"] for r in iter_runlog(tmp_path / ".hexi")] == list(range(20))
+
+
+def test_age_rotation_uses_segment_start_time(tmp_path: Path) -> None:
+    now = [1000.0]
+    seg_dir = tmp_path / "runlog"
+    writer = SegmentedRunlogWriter(
+        seg_dir, EAGER, SegmentPolicy(max_age_s=60, compression="none"), clock=lambda: now[0]
+    )
+    writer.write({"n": 1})
+    writer.flush()
+    now[0] += 61
+    writer.write({"n": 2})
+    writer.close()
+
+    manifest = read_manifest(seg_dir)
+    assert [s["name"] for s in manifest["segments"]] == ["000001.jsonl"]
+    assert manifest["active"]["name"] == "000002.jsonl"
+    assert [r["n"] for r in iter_runlog(tmp_path)] == [1, 2]
+
+
+def test_zstd_segments_round_trip(tmp_path: Path) -> None:
+    pytest.importorskip("zstandard")
+    with SegmentedRunlogWriter(tmp_path / "runlog", EAGER, SegmentPolicy(compression="zstd")) as writer:
+        writer.write({"n": 1})
+        writer.rotate()
+    assert read_manifest(tmp_path / "runlog")["segments"][0]["name"].endswith(".zst")
+    assert list(iter_runlog(tmp_path)) == [{"n": 1}]
+
+
+def test_reader_combines_legacy_plain_file_and_skips_partial_tail(tmp_path: Path) -> None:
+    (tmp_path / "runlog.jsonl").write_text('{"n": 0}\n{"n": 1}\n{"n": 2', encoding="utf-8")
+    with SegmentedRunlogWriter(tmp_path / "runlog", EAGER, SegmentPolicy(compression="gzip")) as writer:
+        writer.write({"n": 3})
+    assert [r["n"] for r in iter_runlog(tmp_path)] == [0, 1, 3]
+
+
+def test_memory_segmented_storage_is_opt_in(tmp_path: Path) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    assert mem.load_segment_policy() is None
+
+    mem.local_config_path.write_text('[runlog]\nstorage = "segmented"\nsegment_max_mb = 1\n', encoding="utf-8")
+    assert mem.load_segment_policy() == SegmentPolicy(max_bytes=1024 * 1024, compression="auto")
+
+    mem.append_runlog(Event(type="progress", one_line_summary="hello", blocking=False, payload={}))
+    assert [r["one_line_summary"] for r in mem.iter_runlog()] == ["hello"]
+    assert mem.runlog_path.read_text(encoding="utf-8") == ""
+    assert (mem.runlog_dir / "manifest.json").exists()
+    mem.close()
+
+    mem.local_config_path.write_text('[runlog]\nstorage = "sharded"\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        mem.load_segment_policy()
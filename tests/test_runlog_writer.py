@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.runlog_writer import BufferedRunlogWriter, FlushPolicy
+from hexi.core.domain import Event, ModelConfig, Policy
+from hexi.core.schemas import parse_action_plan
+from hexi.core.service import RunStepService
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _wait_for(path: Path, count: int, timeout: float = 2.0) -> list[dict]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists() and len(_lines(path)) >= count:
+            break
+        time.sleep(0.01)
+    return _lines(path)
+
+
+def test_writer_flushes_every_n_events_without_explicit_flush(tmp_path: Path) -> None:
+    path = tmp_path / "runlog.jsonl"
+    with BufferedRunlogWriter(path, FlushPolicy(every_events=2, interval_ms=60_000)) as writer:
+        writer.write({"n": 1})
+        writer.write({"n": 2})
+        assert [r["n"] for r in _wait_for(path, 2)] == [1, 2]
+
+
+def test_writer_flushes_after_interval(tmp_path: Path) -> None:
+    path = tmp_path / "runlog.jsonl"
+    with BufferedRunlogWriter(path, FlushPolicy(every_events=1000, interval_ms=20)) as writer:
+        writer.write({"n": 1})
+        assert _wait_for(path, 1) == [{"n": 1}]
+
+
+def test_flush_is_a_barrier_and_close_drains_queue(tmp_path: Path) -> None:
+    path = tmp_path / "runlog.jsonl"
+    writer = BufferedRunlogWriter(path, FlushPolicy(every_events=1000, interval_ms=60_000))
+    for n in range(100):
+        writer.write({"n": n})
+    writer.flush(fsync=True)
+    assert len(_lines(path)) == 100
+
+    writer.write({"n": 100})
+    writer.close()
+    assert _lines(path)[-1] == {"n": 100}
+    with pytest.raises(RuntimeError):
+        writer.write({"n": 101})
+
+
+def test_failed_record_is_reported_once_and_later_records_are_written(tmp_path: Path) -> None:
+    path = tmp_path / "runlog.jsonl"
+    writer = BufferedRunlogWriter(path, FlushPolicy(every_events=1000, interval_ms=60_000))
+    writer.write({"bad": object()})
+    writer.write({"n": 1})
+    with pytest.raises(RuntimeError, match="not JSON serializable"):
+        writer.flush()
+
+    writer.write({"n": 2})
+    writer.flush()
+    writer.close()
+    assert _lines(path) == [{"n": 1}, {"n": 2}]
+
+
+def test_memory_reads_flush_policy_from_config(tmp_path: Path) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    assert mem.load_flush_policy() == FlushPolicy(every_events=64, interval_ms=200.0, fsync_on_step_end=False)
+
+    mem.local_config_path.write_text("[runlog]\nflush_every_events = 0\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        mem.load_flush_policy()
+
+
+class _ExplodingWorkspace:
+    def read_text(self, path: str, max_chars: int) -> str:
+        return "x"
+
+    def git_status(self) -> str:
+        raise OSError("git unavailable")
+
+    def git_diff(self, max_chars: int) -> str:
+        return ""
+
+
+class _Memory(FileMemory):
+    def load_policy(self) -> Policy:
+        return Policy(allow_commands=[])
+
+    def load_model_config(self) -> ModelConfig:
+        return ModelConfig(provider="openai_compat", model="m")
+
+
+class _NullEvents:
+    def emit(self, event: Event) -> None:
+        return None
+
+
+def test_service_flushes_runlog_even_when_step_raises(tmp_path: Path) -> None:
+    mem = _Memory(tmp_path)
+    mem.ensure_initialized()
+    mem.local_config_path.write_text("[runlog]\nflush_every_events = 1000\nflush_interval_ms = 60000\n", encoding="utf-8")
+    service = RunStepService(None, _ExplodingWorkspace(), None, _NullEvents(), mem)  # type: ignore[arg-type]
+    plan = parse_action_plan('{"summary":"s","actions":[{"kind":"read","path":"a.txt"}]}')
+
+    with pytest.raises(OSError):
+        service.run_plan("task", plan)
+
+    assert [r["one_line_summary"] for r in _lines(mem.runlog_path)] == [
+        "Starting single-step run",
+        "Action plan ready: s",
+        "Read a.txt",
+    ]
+    mem.close()
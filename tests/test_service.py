@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import json
 
-from hexi.core.domain import Event, ModelConfig, Policy
+from hexi.core.domain import Event, ModelConfig, ModelResult, Policy
+from hexi.core.patches import FilePatch, apply_file_patch
 from hexi.core.schemas import parse_action_plan
 from hexi.core.service import RunStepService
 
@@ -42,9 +43,18 @@ class FakeWorkspace:
     def read_text(self, path: str, max_chars: int) -> str:
         return self.files[path][:max_chars]
 
+    def read_lines(self, path: str, start_line: int, end_line: int | None, max_chars: int) -> dict[str, object]:
+        lines = self.files[path].splitlines(keepends=True)[start_line - 1 : end_line]
+        return {"path": path, "start_line": start_line, "end_line": start_line + len(lines) - 1, "content": "".join(lines)}
+
     def write_text(self, path: str, content: str) -> None:
         self.files[path] = content
 
+    def apply_patch(self, patches: list[FilePatch]) -> list[dict[str, object]]:
+        updated = {patch.path: apply_file_patch(self.files.get(patch.path), patch) for patch in patches}
+        self.files.update(updated)
+        return [{"path": path} for path in updated]
+
     def list_files(self, path: str | None, glob_pattern: str | None, limit: int) -> list[str]:
         return sorted(list(self.files.keys()))[:limit]
 
@@ -222,3 +232,267 @@ def test_service_executes_list_and_search_actions() -> None:
     summaries = [e.one_line_summary for e in events.emitted if e.type == "artifact"]
     assert any(s.startswith("Listed files") for s in summaries)
     assert any(s.startswith("Searched 'alpha'") for s in summaries)
+
+
+def test_service_adds_repo_map_to_prompt_within_policy_budget() -> None:
+    class PromptModel(StaticModel):
+        def __init__(self, plan: str) -> None:
+            super().__init__(plan)
+            self.prompts: list[str] = []
+
+        def plan_step(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> str:
+            self.prompts.append(user_prompt)
+            return self.plan
+
+    class MapWorkspace(FakeWorkspace):
+        def __init__(self) -> None:
+            super().__init__()
+            self.budgets: list[int] = []
+
+        def repo_map(self, max_chars: int) -> str:
+            self.budgets.append(max_chars)
+            if max_chars == 13:
+                raise RuntimeError("git status failed")
+            return "1 files; top level: a.txt"
+
+    class MapMemory(FakeMemory):
+        def __init__(self, budget: int) -> None:
+            super().__init__()
+            self.budget = budget
+
+        def load_policy(self) -> Policy:
+            return Policy(allow_commands=["python"], max_repo_map_chars=self.budget)
+
+    plan = json.dumps(
+        {"summary": "noop", "actions": [{"kind": "emit", "event_type": "done", "message": "ok", "blocking": False}]}
+    )
+    model, workspace = PromptModel(plan), MapWorkspace()
+    for budget in (300, 0, 13):
+        RunStepService(model, workspace, FakeExec(), FakeEvents(), MapMemory(budget)).run_once("task")
+
+    assert workspace.budgets == [300, 13]
+    assert "Repo map:\n1 files; top level: a.txt\n\nRepo status:" in model.prompts[0]
+    # Disabled, or failing: the prompt simply has no map.
+    assert all("Repo map:" not in prompt for prompt in model.prompts[1:])
+
+
+def test_service_symbols_action_uses_workspace_index() -> None:
+    class SymbolWorkspace(FakeWorkspace):
+        def find_symbols(self, query: str, path: str | None, limit: int) -> list[dict[str, object]]:
+            return [{"name": "run_once", "qualname": "RunStepService.run_once", "path": "service.py", "line": 90}]
+
+    plan = {"summary": "find", "actions": [{"kind": "symbols", "query": "RunStepService.run"}]}
+    events = FakeEvents()
+
+    result = RunStepService(StaticModel(json.dumps(plan)), SymbolWorkspace(), FakeExec(), events, FakeMemory()).run_once(
+        "find"
+    )
+
+    assert result.success is True
+    found = next(e for e in events.emitted if e.one_line_summary.startswith("Symbols"))
+    assert found.one_line_summary == "Symbols 'RunStepService.run' (1 matches)"
+    assert found.payload["symbols"][0]["line"] == 90
+
+    events = FakeEvents()
+    RunStepService(StaticModel(json.dumps(plan)), FakeWorkspace(), FakeExec(), events, FakeMemory()).run_once("find")
+    error = next(e for e in events.emitted if e.type == "error")
+    assert error.payload["error"] == "workspace does not support symbols actions"
+
+
+def test_service_batched_and_ranged_reads_emit_one_artifact() -> None:
+    plan = {
+        "summary": "read code",
+        "actions": [
+            {"kind": "read", "paths": ["a.txt", "b.txt"]},
+            {"kind": "read", "path": "b.txt", "start_line": 2, "end_line": 3},
+        ],
+    }
+    events = FakeEvents()
+    workspace = FakeWorkspace()
+    workspace.files["b.txt"] = "one\ntwo\nthree\nfour\n"
+
+    result = RunStepService(StaticModel(json.dumps(plan)), workspace, FakeExec(), events, FakeMemory()).run_once("read")
+
+    assert result.success is True
+    batch, ranged = [e for e in events.emitted if e.one_line_summary.startswith("Read ")]
+    assert batch.one_line_summary == "Read 2 files"
+    assert [f["path"] for f in batch.payload["files"]] == ["a.txt", "b.txt"]
+    assert ranged.one_line_summary == "Read b.txt:2-3"
+    assert ranged.payload["files"][0]["content"] == "two\nthree\n"
+
+
+def test_service_batched_reads_share_one_char_budget() -> None:
+    class BudgetWorkspace(FakeWorkspace):
+        def __init__(self) -> None:
+            super().__init__()
+            self.budgets: list[int] = []
+
+        def read_lines(self, path: str, start_line: int, end_line: int | None, max_chars: int) -> dict[str, object]:
+            self.budgets.append(max_chars)
+            return {"path": path, "start_line": 1, "end_line": 1, "content": self.files[path][:max_chars]}
+
+    workspace = BudgetWorkspace()
+    workspace.files.update({"a.txt": "a" * 600, "b.txt": "b" * 600, "c.txt": "c" * 600})
+    plan = {"summary": "read", "actions": [{"kind": "read", "paths": ["a.txt", "b.txt", "c.txt"]}]}
+
+    RunStepService(StaticModel(json.dumps(plan)), workspace, FakeExec(), FakeEvents(), FakeMemory()).run_once("read")
+
+    assert workspace.budgets == [1000, 400, 0]
+
+
+def test_service_patch_action_applies_edits_and_reports_failing_hunk() -> None:
+    plan = {
+        "summary": "patch files",
+        "actions": [
+            {"kind": "patch", "path": "a.txt", "edits": [{"search": "alpha", "replace": "beta"}]},
+            {"kind": "patch", "diff": "--- a/a.txt\n+++ b/a.txt\n@@ -1 +1 @@\n-gamma\n+delta\n"},
+            {"kind": "write", "path": "not_reached.txt", "content": "x"},
+        ],
+    }
+    events = FakeEvents()
+    workspace = FakeWorkspace()
+
+    result = RunStepService(StaticModel(json.dumps(plan)), workspace, FakeExec(), events, FakeMemory()).run_once("edit")
+
+    assert result.success is False
+    assert workspace.files["a.txt"] == "beta"
+    assert "not_reached.txt" not in workspace.files
+    patched = next(e for e in events.emitted if e.one_line_summary == "Patched a.txt")
+    assert patched.payload["files"] == [{"path": "a.txt"}]
+    error = next(e for e in events.emitted if e.type == "error")
+    assert error.payload["error"] == (
+        "a.txt: hunk 1 (@@ -1,1 +1,1 @@) does not apply: line 1 is 'beta', expected 'gamma'"
+    )
+
+
+class UsageModel(StaticModel):
+    def plan_step_result(self, config: ModelConfig, system_prompt: str, user_prompt: str) -> ModelResult:
+        return ModelResult(
+            text=self.plan,
+            provider=config.provider,
+            model="gpt-4o-mini-2024-07-18",
+            prompt_tokens=100,
+            completion_tokens=20,
+            cached_tokens=0,
+            latency_ms=320.0,
+            ttfb_ms=300.0,
+        )
+
+
+def test_service_attaches_model_usage_to_plan_progress_event() -> None:
+    plan = {"summary": "noop", "actions": [{"kind": "read", "path": "a.txt"}]}
+    events = FakeEvents()
+    model = UsageModel(json.dumps(plan))
+
+    RunStepService(model, FakeWorkspace(), FakeExec(), events, FakeMemory()).run_once("do work")
+
+    ready = next(e for e in events.emitted if e.one_line_summary.startswith("Action plan ready"))
+    usage = ready.payload["model"]
+    assert usage["model"] == "gpt-4o-mini-2024-07-18"
+    assert usage["prompt_tokens"] == 100
+    assert usage["completion_tokens"] == 20
+    assert usage["ttfb_ms"] == 300.0
+    assert usage["plan_valid"] is True
+    assert "text" not in usage
+
+
+def test_service_measures_latency_for_plain_model_and_reports_on_parse_failure() -> None:
+    events = FakeEvents()
+
+    RunStepService(StaticModel("not-json"), FakeWorkspace(), FakeExec(), events, FakeMemory()).run_once("do work")
+
+    error = next(e for e in events.emitted if e.type == "error")
+    assert error.payload["invalid_plan"] is True
+    assert error.payload["model"]["plan_valid"] is False
+    assert error.payload["model"]["provider"] == "openai_compat"
+    assert error.payload["model"]["latency_ms"] >= 0
+    assert error.payload["model"]["prompt_tokens"] is None
+
+
+def test_service_stamps_run_id_sequence_and_timestamps() -> None:
+    plan = parse_action_plan('{"summary":"s","actions":[{"kind":"read","path":"a.txt"}]}')
+    memory = FakeMemory()
+    events = FakeEvents()
+    service = RunStepService(None, FakeWorkspace(), FakeExec(), events, memory)
+
+    first = service.run_plan(task="one", plan=plan)
+    second = service.run_plan(task="two", plan=plan)
+
+    run_ids = {e.run_id for e in first.events}
+    assert len(run_ids) == 1
+    run_id = run_ids.pop()
+    assert run_id is not None and len(run_id) == 26
+    assert first.events[0].payload["thread_id"] == run_id
+    assert [e.seq for e in first.events] == list(range(1, len(first.events) + 1))
+    assert all(e.ts is not None and e.mono is not None for e in first.events)
+    monos = [e.mono for e in first.events]
+    assert monos == sorted(monos)
+    assert memory.logged[: len(first.events)] == first.events
+
+    assert second.events[0].run_id != run_id
+    assert second.events[0].run_id > run_id
+    assert second.events[0].seq == 1
+
+
+def test_service_delivers_to_extra_bus_sinks_and_flushes_at_step_end() -> None:
+    from hexi.core.events import EventBus
+
+    class QueuedSink:
+        def __init__(self) -> None:
+            self.events: list[Event] = []
+            self.flushed = False
+
+        def emit(self, event: Event) -> None:
+            self.events.append(event)
+
+        def flush(self) -> None:
+            self.flushed = True
+
+    bus = EventBus()
+    done_only = QueuedSink()
+    bus.subscribe(done_only, name="done", types={"done"}, max_queue=16, overflow="drop")
+    plan = parse_action_plan('{"summary":"s","actions":[{"kind":"read","path":"a.txt"}]}')
+    service = RunStepService(None, FakeWorkspace(), FakeExec(), FakeEvents(), FakeMemory(), bus=bus)
+
+    result = service.run_plan(task="t", plan=plan)
+
+    assert done_only.flushed
+    assert done_only.events == [result.events[-1]]
+    stats = {s.name: s for s in service.bus.stats()}
+    assert set(stats) == {"done", "events", "runlog"}
+    assert stats["events"].delivered == stats["runlog"].delivered == len(result.events)
+    bus.close()
+
+
+def test_services_sharing_a_bus_deliver_each_event_once() -> None:
+    from hexi.core.events import EventBus
+
+    bus = EventBus()
+    events, memory = FakeEvents(), FakeMemory()
+    plan = parse_action_plan('{"summary":"s","actions":[{"kind":"read","path":"a.txt"}]}')
+    first = RunStepService(None, FakeWorkspace(), FakeExec(), events, memory, bus=bus)
+    second = RunStepService(None, FakeWorkspace(), FakeExec(), events, memory, bus=bus)
+
+    result = second.run_plan(task="t", plan=plan)
+    assert {s.name: s.delivered for s in bus.stats()} == {"events": len(result.events), "runlog": len(result.events)}
+
+    first.close()
+    second.run_plan(task="t", plan=plan)
+    assert {s.name: s.delivered for s in bus.stats()} == {"events": 2 * len(result.events), "runlog": 2 * len(result.events)}
+    second.close()
+    assert bus.stats() == []
+    bus.close()
+
+
+def test_service_records_action_kind_and_duration() -> None:
+    plan = parse_action_plan(
+        '{"summary":"s","actions":[{"kind":"read","path":"a.txt"},{"kind":"run","command":"rm -rf /"}]}'
+    )
+    service = RunStepService(None, FakeWorkspace(), FakeExec(), FakeEvents(), FakeMemory())
+
+    result = service.run_plan(task="t", plan=plan)
+
+    read, error = result.events[2], result.events[3]
+    assert read.payload["action"] == "read" and read.payload["duration_ms"] >= 0
+    assert error.type == "error"
+    assert error.payload["action"] == "run" and error.payload["command"] == "rm -rf /"
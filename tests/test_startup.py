@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+# Cumulative `import hexi.cli` time measured by `python -X importtime`; generous
+# enough for slow CI machines, far below the eager-import cost it guards against.
+BUDGET_MS = float(os.environ.get("HEXI_STARTUP_BUDGET_MS", "250"))
+HEAVY_MODULES = (
+    "rich",
+    "httpx",
+    "requests",
+    "sqlite3",
+    "hexi.adapters.model_openai_compat",
+    "hexi.adapters.model_anthropic_compat",
+    "hexi.adapters.model_openrouter_http",
+    "hexi.adapters.model_openrouter_sdk",
+    "hexi.commands",
+)
+
+
+def _importtime(code: str) -> dict[str, int]:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def test_cli_import_skips_heavy_modules() -> None:
+    imported = _importtime("import hexi.cli")
+    assert "hexi.cli" in imported
+    assert not [name for name in HEAVY_MODULES if name in imported]
+
+
+def test_version_command_skips_heavy_modules() -> None:
+    imported = _importtime(
+        "import sys; sys.argv = ['hexi', 'version']\n"
+        "from hexi.cli import app\n"
+        "try:\n    app()\nexcept SystemExit:\n    pass\n"
+    )
+    assert not [name for name in HEAVY_MODULES if name in imported]
+
+
+# Read-only commands must not pull in the step machinery (service, executor, worker client).
+STEP_MODULES = (
+    "hexi.commands.step",
+    "hexi.core.service",
+    "hexi.adapters.exec_local",
+    "hexi.adapters.worker_socket",
+)
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["hexi", "diff"],
+        ["hexi", "plan-check", "--json", '{"summary": "s", "actions": []}'],
+    ],
+)
+def test_read_only_commands_skip_step_machinery(argv: list[str]) -> None:
+    imported = _importtime(
+        f"import sys; sys.argv = {argv!r}\n"
+        "from hexi.cli import app\n"
+        "try:\n    app()\nexcept SystemExit:\n    pass\n"
+    )
+    assert "hexi.cli" in imported
+    # These commands render with rich and live in `hexi.commands`; everything else stays unloaded.
+    unwanted = [name for name in (*HEAVY_MODULES, *STEP_MODULES) if name not in ("rich", "hexi.commands")]
+    assert not [name for name in unwanted if name in imported]
+
+
+@pytest.mark.skipif(BUDGET_MS <= 0, reason="startup budget disabled")
+def test_cli_import_time_budget() -> None:
+    # Best of three runs to keep a noisy machine from failing the check.
+    best_ms = min(_importtime("import hexi.cli")["hexi.cli"] for _ in range(3)) / 1000
+    assert best_ms < BUDGET_MS, f"import hexi.cli took {best_ms:.1f} ms (budget {BUDGET_MS:.0f} ms)"
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters.memory_file import FileMemory
+from hexi.adapters.model_anthropic_compat import AnthropicCompatModel
+from hexi.adapters.model_openai_compat import OpenAICompatModel
+from hexi.core.domain import ModelConfig
+from hexi.core.schemas import load_action_plan_schema, parse_action_plan, strict_action_plan_schema
+from hexi.devtools.mock_llm import MockLLMConfig, MockLLMServer
+
+PLAN = '{"summary":"s","actions":[{"kind":"read","path":"README.md"}]}'
+
+
+def test_packaged_contract_matches_docs_contract() -> None:
+    docs = Path(__file__).resolve().parents[1] / "docs" / "contracts" / "action_plan.schema.json"
+    assert load_action_plan_schema() == json.loads(docs.read_text(encoding="utf-8"))
+
+
+def test_strict_schema_requires_every_property_and_drops_free_form_payload() -> None:
+    schema = strict_action_plan_schema()
+    item = schema["properties"]["actions"]["items"]
+
+    assert item["additionalProperties"] is False
+    assert set(item["required"]) == set(item["properties"])
+    assert "payload" not in item["properties"]
+    assert item["properties"]["kind"]["type"] == "string"
+    assert item["properties"]["path"]["type"] == ["string", "null"]
+    assert None in item["properties"]["event_type"]["enum"]
+    assert "$schema" not in schema
+
+
+def test_strict_plan_with_nulls_still_parses() -> None:
+    item = {name: None for name in strict_action_plan_schema()["properties"]["actions"]["items"]["properties"]}
+    item.update({"kind": "read", "path": "a.txt"})
+    plan = parse_action_plan(json.dumps({"summary": "s", "actions": [item]}))
+    assert plan.actions[0].path == "a.txt"
+
+
+@pytest.fixture
+def server():
+    with MockLLMServer(MockLLMConfig(plans=[PLAN])) as srv:
+        yield srv
+
+
+def test_openai_json_schema_mode_sends_strict_response_format(server: MockLLMServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    cfg = ModelConfig(provider="openai_compat", model="m", base_url=server.openai_base_url, structured_output="json_schema")
+
+    OpenAICompatModel().plan_step(cfg, "sys", "usr")
+
+    response_format = server.last_request["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["strict"] is True
+    assert response_format["json_schema"]["schema"] == strict_action_plan_schema()
+
+
+def test_openai_tools_mode_reads_function_arguments(server: MockLLMServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    cfg = ModelConfig(provider="openai_compat", model="m", base_url=server.openai_base_url, structured_output="tools")
+
+    out = OpenAICompatModel().plan_step(cfg, "sys", "usr")
+
+    assert "response_format" not in server.last_request
+    assert server.last_request["tool_choice"]["function"]["name"] == "emit_action_plan"
+    assert parse_action_plan(out).actions[0].path == "README.md"
+
+
+def test_anthropic_constrained_mode_forces_tool_use(server: MockLLMServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+    cfg = ModelConfig(
+        provider="anthropic_compat", model="m", base_url=server.anthropic_base_url, structured_output="json_schema"
+    )
+
+    out = AnthropicCompatModel().plan_step(cfg, "sys", "usr")
+
+    tool = server.last_request["tools"][0]
+    assert tool["input_schema"]["properties"]["actions"]["maxItems"] == 20
+    assert server.last_request["tool_choice"] == {"type": "tool", "name": "emit_action_plan"}
+    assert parse_action_plan(out).summary == "s"
+
+
+def test_default_mode_keeps_json_object(server: MockLLMServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+
+    OpenAICompatModel().plan_step(ModelConfig(provider="openai_compat", model="m", base_url=server.openai_base_url), "s", "u")
+    assert server.last_request["response_format"] == {"type": "json_object"}
+
+    AnthropicCompatModel().plan_step(
+        ModelConfig(provider="anthropic_compat", model="m", base_url=server.anthropic_base_url), "s", "u"
+    )
+    assert "tools" not in server.last_request
+
+
+def test_memory_loads_and_validates_structured_output(tmp_path: Path) -> None:
+    mem = FileMemory(tmp_path)
+    mem.ensure_initialized()
+    assert mem.load_model_config().structured_output is None
+
+    mem.local_config_path.write_text('[model]\nstructured_output = "tools"\n', encoding="utf-8")
+    assert mem.load_model_config().structured_output == "tools"
+
+    mem.local_config_path.write_text('[model]\nstructured_output = "xml"\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        mem.load_model_config()
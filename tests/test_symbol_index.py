@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from hexi.adapters import symbol_index
+from hexi.adapters.symbol_index import SymbolIndex
+
+SOURCE = '''\
+import functools
+
+
+class Service:
+    def run_once(self):
+        return 1
+
+    @functools.cache
+    def run_plan(self):
+        def helper():
+            pass
+        return helper
+
+    class Config:
+        pass
+
+
+async def run_async():
+    pass
+'''
+
+
+def _repo(tmp_path: Path) -> SymbolIndex:
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text(".hexi/\nbuild/\n", encoding="utf-8")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "service.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "ignored.py").write_text("def run_ignored():\n    pass\n", encoding="utf-8")
+    return SymbolIndex(tmp_path / ".hexi", tmp_path)
+
+
+def test_query_by_name_prefix_and_qualname(tmp_path: Path) -> None:
+    index = _repo(tmp_path)
+
+    assert [(s["qualname"], s["kind"]) for s in index.query("run")] == [
+        ("Service.run_once", "method"),
+        ("Service.run_plan", "method"),
+        ("run_async", "function"),
+    ]
+    (match,) = index.query("Service.run_plan")
+    # The span starts at the decorator so a ranged read covers the whole definition.
+    assert (match["path"], match["line"], match["end_line"]) == ("pkg/service.py", 8, 12)
+    assert [s["qualname"] for s in index.query("Service")] == [
+        "Service",
+        "Service.run_once",
+        "Service.run_plan",
+        "Service.Config",
+    ]
+    assert index.query("Config")[0]["kind"] == "class"
+    assert index.query("helper") == []
+    assert index.query("run", path="other") == []
+
+
+def test_refresh_reparses_only_changed_files(tmp_path: Path) -> None:
+    index = _repo(tmp_path)
+    (tmp_path / "pkg" / "broken.py").write_text("def broken(:\n", encoding="utf-8")
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    target = tmp_path / "pkg" / "service.py"
+    target.write_text(SOURCE + "\n\ndef run_later():\n    pass\n", encoding="utf-8")
+    os.utime(target, ns=(1, 1))
+    (tmp_path / "pkg" / "broken.py").unlink()
+    assert index.refresh() == 1
+
+    state = json.loads(index.state_path.read_text(encoding="utf-8"))
+    assert sorted(state["files"]) == ["pkg/service.py"]
+    # A fresh instance (another process) starts from the saved state.
+    fresh = SymbolIndex(tmp_path / ".hexi", tmp_path)
+    assert fresh.refresh() == 0
+    assert fresh.query("run_later")[0]["line"] == 22
+
+
+def test_large_batches_parse_in_a_process_pool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    index = _repo(tmp_path)
+    for n in range(3):
+        (tmp_path / "pkg" / f"mod_{n}.py").write_text(f"def func_{n}():\n    pass\n", encoding="utf-8")
+    monkeypatch.setattr(symbol_index, "POOL_THRESHOLD", 2)
+
+    assert index.refresh() == 4
+    assert [s["path"] for s in index.query("func_")] == ["pkg/mod_0.py", "pkg/mod_1.py", "pkg/mod_2.py"]
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from typer.testing import CliRunner
+
+from hexi.adapters.worker_socket import (
+    INVALID_PARAMS,
+    METHOD_NOT_FOUND,
+    WorkerClient,
+    WorkerError,
+    WorkerRequestError,
+    WorkerServer,
+    WorkerUnavailable,
+    clear_socket_path,
+    record_socket_path,
+    socket_path,
+    worker_socket_path,
+)
+from hexi.cli import app
+from hexi.core.domain import Event, ModelConfig
+
+runner = CliRunner()
+
+
+def _start(server: WorkerServer) -> threading.Thread:
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def _stop(server: WorkerServer, thread: threading.Thread) -> None:
+    server.shutdown()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def _echo_handler(method: str, params: dict[str, Any], events: Any) -> dict[str, Any]:
+    if "task" not in params:
+        raise WorkerRequestError("params.task is required")
+    summary = f"{method}: {params['task']}"
+    events.emit(Event(type="progress", one_line_summary=summary, payload={"n": 1}, blocking=False))
+    events.emit(Event(type="done", one_line_summary="finished", payload={"success": True}, blocking=False))
+    return {"success": True}
+
+
+def test_worker_streams_events_then_result(tmp_path: Path) -> None:
+    path = socket_path(tmp_path)
+    server = WorkerServer(path, _echo_handler)
+    thread = _start(server)
+    try:
+        events: list[dict[str, Any]] = []
+        result = WorkerClient(path).call("run", {"task": "hello"}, on_event=events.append)
+        assert result == {"success": True}
+        assert [e["one_line_summary"] for e in events] == ["run: hello", "finished"]
+        assert events[0]["payload"] == {"n": 1}
+        assert (path.stat().st_mode & 0o777) == 0o600
+    finally:
+        _stop(server, thread)
+    assert not path.exists()
+
+
+def test_worker_reports_request_errors(tmp_path: Path) -> None:
+    path = socket_path(tmp_path)
+    server = WorkerServer(path, _echo_handler)
+    thread = _start(server)
+    try:
+        with pytest.raises(WorkerError) as invalid:
+            WorkerClient(path).call("run", {})
+        assert invalid.value.code == INVALID_PARAMS
+        with pytest.raises(WorkerError) as unknown:
+            WorkerClient(path).call("nope", {})
+        assert unknown.value.code == METHOD_NOT_FOUND
+        assert WorkerClient(path).ping()["completed"] == 1
+    finally:
+        _stop(server, thread)
+
+
+def test_worker_queues_concurrent_requests_in_order(tmp_path: Path) -> None:
+    release = threading.Event()
+    started: list[str] = []
+
+    def handler(method: str, params: dict[str, Any], events: Any) -> dict[str, Any]:
+        started.append(params["task"])
+        if params["task"] == "first":
+            release.wait(timeout=5)
+        return {"success": True, "task": params["task"]}
+
+    path = socket_path(tmp_path)
+    server = WorkerServer(path, handler)
+    thread = _start(server)
+    results: dict[str, Any] = {}
+    positions: dict[str, int] = {}
+
+    def call(task: str) -> None:
+        results[task] = WorkerClient(path).call(
+            "run", {"task": task}, on_queued=lambda position: positions.__setitem__(task, position)
+        )
+
+    try:
+        first = threading.Thread(target=call, args=("first",))
+        first.start()
+        while started != ["first"]:
+            threading.Event().wait(0.01)
+        second = threading.Thread(target=call, args=("second",))
+        second.start()
+        while "second" not in positions:
+            threading.Event().wait(0.01)
+        assert started == ["first"]
+        release.set()
+        first.join(timeout=5)
+        second.join(timeout=5)
+    finally:
+        release.set()
+        _stop(server, thread)
+    assert started == ["first", "second"]
+    assert positions == {"first": 0, "second": 1}
+    assert results["second"] == {"success": True, "task": "second"}
+
+
+def test_worker_refuses_second_server_and_replaces_stale_socket(tmp_path: Path) -> None:
+    path = socket_path(tmp_path)
+    server = WorkerServer(path, _echo_handler)
+    thread = _start(server)
+    try:
+        with pytest.raises(WorkerError, match="already listening"):
+            WorkerServer(path, _echo_handler).bind()
+    finally:
+        _stop(server, thread)
+
+    path.write_text("stale", encoding="utf-8")
+    with pytest.raises(WorkerUnavailable):
+        WorkerClient(path).ping()
+    server = WorkerServer(path, _echo_handler)
+    thread = _start(server)
+    try:
+        assert WorkerClient(path).ping()["queued"] == 0
+    finally:
+        _stop(server, thread)
+
+
+def test_client_without_worker_is_unavailable(tmp_path: Path) -> None:
+    with pytest.raises(WorkerUnavailable):
+        WorkerClient(socket_path(tmp_path)).call("run", {"task": "x"})
+
+
+class _FakeWS:
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    def repo_root(self) -> Path:
+        return self._root
+
+
+class _FakeMemory:
+    def __init__(self, root: Path) -> None:
+        self.hexi_dir = root / ".hexi"
+
+    def ensure_initialized(self) -> None:
+        return None
+
+    def load_model_config(self) -> ModelConfig:
+        return ModelConfig(provider="openai_compat", model="m")
+
+    def apply_api_key_to_env(self, provider: str) -> str | None:
+        return None
+
+
+def test_cli_run_forwards_to_running_worker(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    mem = _FakeMemory(tmp_path)
+    monkeypatch.setattr("hexi.cli_common.workspace_and_memory", lambda: (_FakeWS(tmp_path), mem))
+
+    def in_process(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("step should run on the worker")
+
+    monkeypatch.setattr("hexi.commands.step.RunStepService", in_process)
+    server = WorkerServer(socket_path(mem.hexi_dir), _echo_handler)
+    thread = _start(server)
+    try:
+        result = runner.invoke(app, ["--console", "plain", "run", "add tests"])
+    finally:
+        _stop(server, thread)
+    assert result.exit_code == 0, result.stdout
+    assert "[PROGRESS] run: add tests" in result.stdout
+    assert "[DONE] finished" in result.stdout
+
+
+def test_cli_run_finds_worker_on_recorded_custom_socket(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    mem = _FakeMemory(tmp_path)
+    mem.hexi_dir.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr("hexi.cli_common.workspace_and_memory", lambda: (_FakeWS(tmp_path), mem))
+    custom = tmp_path / "custom.sock"
+    server = WorkerServer(custom, _echo_handler)
+    thread = _start(server)
+    record_socket_path(mem.hexi_dir, custom)
+    try:
+        assert worker_socket_path(mem.hexi_dir) == custom
+        result = runner.invoke(app, ["--console", "plain", "run", "add tests"])
+    finally:
+        _stop(server, thread)
+    assert result.exit_code == 0, result.stdout
+    assert server.completed == 1
+
+    clear_socket_path(mem.hexi_dir, custom)
+    assert worker_socket_path(mem.hexi_dir) == socket_path(mem.hexi_dir)
+
+
+def test_cli_no_worker_runs_in_process(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    mem = _FakeMemory(tmp_path)
+    monkeypatch.setattr("hexi.cli_common.workspace_and_memory", lambda: (_FakeWS(tmp_path), mem))
+    monkeypatch.setattr("hexi.cli_common.governed_model", lambda model, memory, provider: model)
+
+    class FakeService:
+        def __init__(self, **kwargs: Any) -> None:
+            return None
+
+        def run_once(self, task: str) -> Any:
+            raise SystemExit(7)
+
+    monkeypatch.setattr("hexi.commands.step.RunStepService", FakeService)
+    server = WorkerServer(socket_path(mem.hexi_dir), _echo_handler)
+    thread = _start(server)
+    try:
+        result = runner.invoke(app, ["run", "--no-worker", "add tests"])
+    finally:
+        _stop(server, thread)
+    assert result.exit_code == 7
+    assert server.completed == 0
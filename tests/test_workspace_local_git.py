@@ -6,6 +6,7 @@ from pathlib import Path
 import pytest
 
 from hexi.adapters.workspace_local_git import LocalGitWorkspace
+from hexi.core.patches import FilePatch, PatchError, parse_unified_diff
 
 
 def _init_repo(path: Path) -> None:
@@ -65,3 +66,72 @@ def test_workspace_list_files_and_search_text(tmp_path: Path) -> None:
     paths = {str(m["path"]) for m in matches}
     assert "src/b.py" in paths
     assert "notes.txt" in paths
+
+
+def test_workspace_apply_patch_is_all_or_nothing(tmp_path: Path) -> None:
+    _init_repo(tmp_path)
+    ws = LocalGitWorkspace(tmp_path)
+    ws.write_text("a.py", "x = 1\n")
+
+    with pytest.raises(PatchError, match="b.py: file does not exist"):
+        ws.apply_patch(
+            [
+                FilePatch(path="a.py", edits=(("x = 1", "x = 2"),)),
+                FilePatch(path="b.py", edits=(("y", "z"),)),
+            ]
+        )
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "x = 1\n"
+
+    diff = "--- a/a.py\n+++ b/a.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n--- /dev/null\n+++ b/pkg/new.py\n@@ -0,0 +1 @@\n+y = 1\n"
+    results = ws.apply_patch(parse_unified_diff(diff))
+    assert [(r["path"], r["created"]) for r in results] == [("a.py", False), ("pkg/new.py", True)]
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "x = 2\n"
+    assert (tmp_path / "pkg" / "new.py").read_text(encoding="utf-8") == "y = 1\n"
+    assert not [p for p in tmp_path.rglob("*.tmp")]
+
+
+def test_workspace_read_lines_streams_ranges_within_budget(tmp_path: Path) -> None:
+    _init_repo(tmp_path)
+    ws = LocalGitWorkspace(tmp_path)
+    ws.write_text("big.txt", "".join(f"{n:04d}\n" for n in range(1, 2001)))
+
+    tail = ws.read_lines("big.txt", start_line=1999, end_line=None, max_chars=100)
+    assert tail == {"path": "big.txt", "start_line": 1999, "end_line": 2000, "content": "1999\n2000\n"}
+
+    # 5 chars per line: a 12-char budget stops after two lines and says where to resume.
+    capped = ws.read_lines("big.txt", start_line=10, end_line=20, max_chars=12)
+    assert capped["content"] == "0010\n0011\n"
+    assert (capped["end_line"], capped["next_line"]) == (11, 12)
+
+    ws.write_text("wide.txt", "x" * 50 + "\nshort\n")
+    wide = ws.read_lines("wide.txt", start_line=1, end_line=None, max_chars=10)
+    assert (wide["content"], wide["end_line"], wide["next_line"]) == ("x" * 10, 1, 2)
+
+    with pytest.raises(FileNotFoundError):
+        ws.read_lines("missing.txt", start_line=1, end_line=None, max_chars=10)
+
+
+def test_workspace_read_lines_reads_long_lines_in_capped_chunks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("hexi.adapters.workspace_local_git._LINE_CHUNK", 4)
+    _init_repo(tmp_path)
+    ws = LocalGitWorkspace(tmp_path)
+    (tmp_path / "mixed.txt").write_bytes(b"x" * 50 + b"\nab\r\ncd\r\nlast\n")
+
+    # Skipped lines are consumed in 4-char chunks; a split `\r\n` still ends one line.
+    assert ws.read_lines("mixed.txt", start_line=3, end_line=None, max_chars=100)["content"] == "cd\r\nlast\n"
+    crlf = ws.read_lines("mixed.txt", start_line=2, end_line=3, max_chars=3)
+    assert (crlf["content"], crlf["end_line"], crlf["next_line"]) == ("ab\r", 2, 3)
+
+    empty = ws.read_lines("mixed.txt", start_line=2, end_line=None, max_chars=0)
+    assert (empty["content"], empty["end_line"], empty["next_line"]) == ("", 1, 2)
+
+
+def test_workspace_find_symbols_indexes_under_hexi_dir(tmp_path: Path) -> None:
+    _init_repo(tmp_path)
+    ws = LocalGitWorkspace(tmp_path)
+    ws.write_text("src/app.py", "class App:\n    def start(self):\n        pass\n")
+
+    assert ws.find_symbols("App.st", path="src", limit=10) == [
+        {"name": "start", "qualname": "App.start", "kind": "method", "path": "src/app.py", "line": 2, "end_line": 3}
+    ]
+    assert (tmp_path / ".hexi" / "index" / "symbols" / "state.json").is_file()